@@ -0,0 +1,73 @@
+"""
+Bullet-vs-aircraft sweep cost as bullet and enemy counts grow: every bullet path against
+every aircraft box against the per-frame DynamicSpatialHash used by BulletManager.sweep_hits.
+
+Run from the repository root:
+    python benchmarks/aircraft_hash_bench.py
+"""
+from time import perf_counter
+
+import numpy as np
+
+from common import *
+from bullet import segment_box_hit_times, segment_box_pair_times
+from spatial_grid import DynamicSpatialHash
+
+
+SEED = 40
+SCENARIOS = [(500, 18), (5000, 200), (20000, 1000)]  # (bullets, enemies)
+FRAMES = 20
+ENEMY_HALF_SIZE = 6.0
+BULLET_STEP = 140.0 / FPS  # rapid bullet travel per frame
+
+
+def make_frame(rng, bullet_count, enemy_count):
+    starts = rng.uniform(-CITY_RADIUS, CITY_RADIUS, (bullet_count, 3)).astype(np.float32)
+    starts[:, 1] = rng.uniform(20, 120, bullet_count)
+    directions = rng.normal(size=(bullet_count, 3)).astype(np.float32)
+    directions /= np.linalg.norm(directions, axis=1)[:, None]
+    ends = starts + directions * np.float32(BULLET_STEP)
+
+    centres = rng.uniform(-CITY_RADIUS, CITY_RADIUS, (enemy_count, 3)).astype(np.float32)
+    centres[:, 1] = rng.uniform(40, 100, enemy_count)
+    return starts, ends, centres - ENEMY_HALF_SIZE, centres + ENEMY_HALF_SIZE
+
+
+def all_pairs(starts, ends, box_mins, box_maxs, half_extents, spatial_hash):
+    return np.count_nonzero(np.isfinite(segment_box_hit_times(starts, ends, box_mins, box_maxs, half_extents)))
+
+
+def hashed(starts, ends, box_mins, box_maxs, half_extents, spatial_hash):
+    spatial_hash.rebuild(box_mins, box_maxs)
+    grow = half_extents[:, None]
+    rows, cols = spatial_hash.query_pairs(np.minimum(starts, ends) - grow, np.maximum(starts, ends) + grow)
+    times = segment_box_pair_times(starts[rows], ends[rows], box_mins[cols], box_maxs[cols], half_extents[rows])
+    return np.count_nonzero(np.isfinite(times))
+
+
+def measure(sweep, frames, spatial_hash):
+    hits = 0
+    start = perf_counter()
+    for frame in frames:
+        hits += sweep(*frame, spatial_hash)
+    return (perf_counter() - start) / len(frames), hits
+
+
+def main():
+    spatial_hash = DynamicSpatialHash(AIRCRAFT_GRID_CELL_SIZE)
+    print(f"{'bullets':>8} {'enemies':>8} {'all pairs ms/frame':>19} {'hashed ms/frame':>16} {'hits match':>11}")
+    for bullet_count, enemy_count in SCENARIOS:
+        rng = np.random.default_rng(SEED)
+        frames = []
+        for _ in range(FRAMES):
+            starts, ends, box_mins, box_maxs = make_frame(rng, bullet_count, enemy_count)
+            frames.append((starts, ends, box_mins, box_maxs, np.full(bullet_count, 0.1, dtype=np.float32)))
+
+        dense, dense_hits = measure(all_pairs, frames, spatial_hash)
+        sparse, sparse_hits = measure(hashed, frames, spatial_hash)
+        print(f"{bullet_count:>8} {enemy_count:>8} {dense * 1000:>19.3f} {sparse * 1000:>16.3f} "
+              f"{str(dense_hits == sparse_hits):>11}")
+
+
+if __name__ == '__main__':
+    main()
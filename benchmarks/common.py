@@ -0,0 +1,46 @@
+"""Shared helpers for the benchmark scripts: import path setup and a seeded city without any GPU resources."""
+import sys
+from os.path import dirname, join, abspath
+
+sys.path.insert(0, join(dirname(dirname(abspath(__file__))), "src"))
+
+from settings import *
+from models import SkyscraperSimple, SkycraperMultipleLayer
+from city_layout import poisson_disk_points
+import numpy as np
+
+
+def build_city(rng, count, radius, cache_bounds=False):
+    """Places `count` buildings on Poisson-disk sites like the city layout, using `rng` for reproducibility."""
+    site_rng = np.random.default_rng(rng.getrandbits(32))
+    sites = poisson_disk_points((-radius, -radius, radius, radius), MIN_BUILDING_DISTANCE, site_rng,
+                                MIN_DISTANCE_FROM_CENTER, target=count)
+    sites = sites[site_rng.permutation(len(sites))[:count]]
+    return [make_building(rng, x, z, cache_bounds) for x, z in sites.tolist()]
+
+
+def build_lattice_city(rng, count, spacing=50.0, cache_bounds=True):
+    """Places `count` buildings on a jittered square lattice; cheap enough for very large cities."""
+    side = int(sqrt(count)) + 1
+    jitter = (spacing - MIN_BUILDING_DISTANCE) / 2
+    origin = -side * spacing / 2
+
+    buildings = []
+    for i in range(count):
+        x = origin + (i % side) * spacing + rng.uniform(-jitter, jitter)
+        z = origin + (i // side) * spacing + rng.uniform(-jitter, jitter)
+        buildings.append(make_building(rng, x, z, cache_bounds))
+
+    return buildings
+
+
+def make_building(rng, x, z, cache_bounds=False):
+    rotation = rng.choice([0, 90, 180, 270])
+    if rng.randint(1, 10) <= 4:
+        building = SkycraperMultipleLayer(None, Vector3(x, -10, z), rotation_angle=rotation)
+    else:
+        building = SkyscraperSimple(None, Vector3(x, -14.8, z), rotation_angle=rotation)
+
+    if cache_bounds:
+        building.cache_world_bounds()
+    return building
@@ -0,0 +1,65 @@
+"""
+Player-vs-building collision cost as the city grows: the old linear scan over every
+building against the spatial-grid broadphase used by Game.check_collisions.
+
+Run from the repository root:
+    python benchmarks/player_collision_bench.py
+"""
+from random import Random
+from time import perf_counter
+
+from common import build_lattice_city
+from settings import *
+from models import check_box_against_model
+from spatial_grid import SpatialGrid
+
+
+SEED = 40
+CITY_SIZES = [100, 1000, 10000]
+FRAMES = 200
+
+
+def linear_scan(player_box, buildings, grid):
+    for obj in buildings:
+        if check_box_against_model(player_box, obj):
+            return obj
+    return None
+
+
+def broadphase(player_box, buildings, grid):
+    for obj in grid.query_aabb(player_box.min, player_box.max):
+        if check_box_against_model(player_box, obj):
+            return obj
+    return None
+
+
+def measure(check, player_boxes, buildings, grid):
+    start = perf_counter()
+    for player_box in player_boxes:
+        check(player_box, buildings, grid)
+    return (perf_counter() - start) / len(player_boxes)
+
+
+def main():
+    print(f"{'buildings':>10} {'linear ms/frame':>16} {'broadphase ms/frame':>20}")
+    for count in CITY_SIZES:
+        rng = Random(SEED)
+        buildings = build_lattice_city(rng, count)
+
+        grid = SpatialGrid(cell_size=GRID_CELL_SIZE)
+        for obj in buildings:
+            grid.add_object(obj)
+
+        extent = max(abs(obj.position.x) for obj in buildings)
+        player_boxes = []
+        for _ in range(FRAMES):
+            x, y, z = rng.uniform(-extent, extent), rng.uniform(20, 100), rng.uniform(-extent, extent)
+            player_boxes.append(BoundingBox(Vector3(x - 3.4, y - 1.0, z - 3.4), Vector3(x + 3.4, y + 1.0, z + 3.4)))
+
+        linear = measure(linear_scan, player_boxes, buildings, grid)
+        broad = measure(broadphase, player_boxes, buildings, grid)
+        print(f"{count:>10} {linear * 1000:>16.4f} {broad * 1000:>20.4f}")
+
+
+if __name__ == '__main__':
+    main()
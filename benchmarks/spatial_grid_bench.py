@@ -0,0 +1,73 @@
+"""
+Compares SpatialGrid query cost and recall: the single-cell point lookup used so far
+against the multi-cell radius and AABB queries.
+
+Recall is measured against a brute-force scan of every building footprint, which is the
+ground truth for "which buildings are within range of this point".
+
+Run from the repository root:
+    python benchmarks/spatial_grid_bench.py
+"""
+from random import Random
+from time import perf_counter
+
+from common import build_city
+from settings import *
+from spatial_grid import SpatialGrid
+
+
+SEED = 40
+QUERY_COUNT = 2000
+QUERY_RADIUS = 100.0  # Enemy.avoidance_range
+
+
+def brute_force(buildings, point, radius):
+    hits = set()
+    for obj in buildings:
+        box = obj.get_world_bounding_box()
+        dx = max(box.min.x - point.x, 0.0, point.x - box.max.x)
+        dz = max(box.min.z - point.z, 0.0, point.z - box.max.z)
+        if dx * dx + dz * dz <= radius * radius:
+            hits.add(id(obj))
+    return hits
+
+
+def measure(name, query, points, truths):
+    found = 0
+    expected = 0
+    start = perf_counter()
+    results = [query(point) for point in points]
+    elapsed = perf_counter() - start
+
+    for result, truth in zip(results, truths):
+        ids = {id(obj) for obj in result}
+        found += len(ids & truth)
+        expected += len(truth)
+
+    recall = found / expected if expected else 1.0
+    print(f"  {name:<14} {elapsed / len(points) * 1e6:8.2f} us/query   recall {recall * 100:6.2f}%")
+
+
+def main():
+    rng = Random(SEED)
+    buildings = build_city(rng, BUILDING_COUNT, CITY_RADIUS)
+
+    grid = SpatialGrid(cell_size=GRID_CELL_SIZE)
+    for obj in buildings:
+        grid.add_object(obj)
+
+    points = [Vector3(rng.uniform(-CITY_RADIUS, CITY_RADIUS), rng.uniform(20, 120),
+                      rng.uniform(-CITY_RADIUS, CITY_RADIUS)) for _ in range(QUERY_COUNT)]
+    truths = [brute_force(buildings, point, QUERY_RADIUS) for point in points]
+
+    print(f"{len(buildings)} buildings, cell size {GRID_CELL_SIZE}, query radius {QUERY_RADIUS}, "
+          f"{QUERY_COUNT} queries")
+    measure("point lookup", grid.get_potential_colliders, points, truths)
+    measure("radius query", lambda p: grid.query_radius(p, QUERY_RADIUS), points, truths)
+    measure("aabb query", lambda p: grid.query_aabb(
+        Vector3(p.x - QUERY_RADIUS, p.y, p.z - QUERY_RADIUS),
+        Vector3(p.x + QUERY_RADIUS, p.y, p.z + QUERY_RADIUS)), points, truths)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,230 @@
+"""
+Scripted stress scenarios for the headless simulation, reported as JSON so runs can be
+compared between builds.
+
+Every scenario starts from a fixed seed. Its ticks are driven by the ScriptedPilot, and
+stray bullets are topped up between ticks so the bullet count stays at the scenario's target.
+Scenarios marked whole_city load every chunk of the city up front and never evict one, the
+others stream chunks around the player like the game. A scenario's "pilot" options go to its
+ScriptedPilot: the streamed city tours it without stopping to fight, so chunks come and go.
+Each scenario reports:
+  - setup: city generation and enemy spawning, timed once
+  - tick_ms: p50/p95/p99/max/mean latency of Simulation.step
+  - subsystems_ms_per_tick: mean time per tick spent in each instrumented subsystem.
+    Timings are inclusive, so enemy_bullet_hits and player_collisions contain the
+    bullet_sweeps they run: rebuilding the aircraft hash and sweeping the bullets against it.
+  - allocations: a second run of the same ticks under tracemalloc, kept apart so tracing
+    does not distort the timings above
+
+Run from the repository root:
+    python benchmarks/suite.py
+    python benchmarks/suite.py --scenario "18 enemies / 500 bullets" --output results.json
+"""
+import gc
+import json
+import random
+import tracemalloc
+from argparse import ArgumentParser
+from collections import defaultdict
+from time import perf_counter
+
+import numpy as np
+
+from common import *
+from bullet import BulletManager, BULLET_TYPE_NAMES
+from simulation import Simulation, ScriptedPilot
+
+
+SEED = 40
+
+SCENARIOS = {
+    "18 enemies / 500 bullets": {"enemies": 18, "bullets": 500, "buildings": BUILDING_COUNT,
+                                 "radius": CITY_RADIUS, "ticks": 600},
+    "200 enemies / 5k bullets": {"enemies": 200, "bullets": 5000, "buildings": BUILDING_COUNT,
+                                 "radius": CITY_RADIUS, "ticks": 300},
+    "10k-building city": {"enemies": 18, "bullets": 500, "buildings": 10000,
+                          "radius": 3000.0, "ticks": 300, "whole_city": True},
+    "10k-building city, streamed": {"enemies": 18, "bullets": 500, "buildings": 10000,
+                                    "radius": 3000.0, "ticks": 1800, "pilot": {"hunt": False}},
+}
+
+ALLOCATION_TICKS = 120
+
+
+class SubsystemTimers:
+    """Replaces methods on live objects with wrappers that add their run time to a named total."""
+
+    def __init__(self):
+        self.totals = defaultdict(float)
+
+    def wrap(self, name, owner, method_name):
+        method = getattr(owner, method_name)
+        totals = self.totals
+
+        def timed(*args, **kwargs):
+            start = perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                totals[name] += perf_counter() - start
+
+        setattr(owner, method_name, timed)
+
+    def instrument(self, simulation):
+        self.wrap("player", simulation.player, "update")
+        self.wrap("bullets", simulation.bullet_manager, "update")
+        self.wrap("enemies", simulation.enemy_manager, "update")
+        self.wrap("enemy_bullet_hits", simulation.enemy_manager, "check_bullet_collisions")
+        self.wrap("player_collisions", simulation, "check_player_bullet_collisions")
+        self.wrap("player_collisions", simulation, "check_collisions")
+        self.wrap("bullet_sweeps", simulation.enemy_manager.spatial_hash, "rebuild")
+        self.wrap("bullet_sweeps", simulation.player_hash, "rebuild")
+        self.wrap("bullet_sweeps", simulation.bullet_manager, "sweep_hits")
+        self.wrap("nav_field", simulation.building_manager.get_nav_field(), "sample")
+
+    def reset(self):
+        self.totals.clear()
+
+
+def build_scenario(config, seed):
+    random.seed(seed)
+    simulation = Simulation(headless=True)
+    simulation.bullet_manager = BulletManager(max_bullets=config["bullets"], headless=True)
+    simulation.building_count = config["buildings"]
+    simulation.city_radius = config["radius"]
+    if config.get("whole_city"):
+        # from anywhere in the city, this reaches its farthest corner
+        building_manager = simulation.building_manager
+        building_manager.stream_radius = building_manager.evict_radius = 4 * config["radius"]
+
+    start = perf_counter()
+    simulation.reset_game()
+    generate_ms = (perf_counter() - start) * 1000
+
+    enemy_manager = simulation.enemy_manager
+    enemy_manager.max_enemies = config["enemies"]
+    start = perf_counter()
+    while enemy_manager.get_enemy_count() < config["enemies"]:
+        enemy_manager.spawn_enemy()
+    spawn_ms = (perf_counter() - start) * 1000
+
+    return simulation, {"generate_city_ms": generate_ms, "city_cached": simulation.building_manager.city_cached,
+                        "spawn_enemies_ms": spawn_ms}
+
+
+def top_up_bullets(simulation, target, rng):
+    """
+    Fires stray bullets from around the player until `target` of them are alive.
+
+    They start within CITY_RADIUS of the player whatever the city's size, so every scenario
+    keeps the same density of bullets near the fight instead of spreading them over the map.
+    """
+    bullet_manager = simulation.bullet_manager
+    missing = target - bullet_manager.get_bullet_count()
+    if missing <= 0:
+        return
+
+    origins = rng.uniform(-CITY_RADIUS, CITY_RADIUS, (missing, 3))
+    origins[:, 0] += simulation.player.position.x
+    origins[:, 2] += simulation.player.position.z
+    origins[:, 1] = rng.uniform(20, 120, missing)
+    directions = rng.normal(size=(missing, 3))
+    directions /= np.linalg.norm(directions, axis=1)[:, None]
+    types = rng.integers(0, len(BULLET_TYPE_NAMES), missing)
+
+    for (x, y, z), (dx, dy, dz), type_index in zip(origins.tolist(), directions.tolist(), types.tolist()):
+        bullet_manager.add_bullet(Vector3(x, y, z), Vector3(dx, dy, dz), BULLET_TYPE_NAMES[type_index])
+
+
+def run_ticks(simulation, config, ticks, seed, on_tick=None):
+    rng = np.random.default_rng(seed)
+    pilot = ScriptedPilot(**config.get("pilot", {}))
+    for tick in range(ticks):
+        top_up_bullets(simulation, config["bullets"], rng)
+        controls = pilot.controls(tick, simulation)
+
+        start = perf_counter()
+        simulation.step(SIM_DT, controls)
+        if on_tick:
+            on_tick(perf_counter() - start)
+
+
+def measure_timings(config, ticks, seed):
+    simulation, setup = build_scenario(config, seed)
+    timers = SubsystemTimers()
+    timers.instrument(simulation)
+
+    latencies = []
+    gc_before = sum(stats["collections"] for stats in gc.get_stats())
+    run_ticks(simulation, config, ticks, seed, on_tick=latencies.append)
+    gc_after = sum(stats["collections"] for stats in gc.get_stats())
+
+    latencies_ms = np.array(latencies) * 1000
+    p50, p95, p99 = np.percentile(latencies_ms, [50, 95, 99]).tolist()
+    return {
+        "setup": setup,
+        "tick_ms": {"p50": p50, "p95": p95, "p99": p99, "max": float(latencies_ms.max()),
+                    "mean": float(latencies_ms.mean())},
+        "subsystems_ms_per_tick": {name: total * 1000 / ticks for name, total in sorted(timers.totals.items())},
+        "gc_collections": gc_after - gc_before,
+        "final_state": {"enemies": simulation.enemy_manager.get_enemy_count(),
+                        "bullets": simulation.bullet_manager.get_bullet_count(),
+                        "buildings": simulation.building_manager.get_building_count(),
+                        "city_chunks": simulation.building_manager.get_chunk_stats(),
+                        "score": simulation.score,
+                        "ai_lod": simulation.enemy_manager.get_lod_stats(),
+                        "enemy_pool": simulation.enemy_manager.get_pool_stats(),
+                        "bullet_pool": simulation.bullet_manager.get_pool_stats()},
+    }
+
+
+def measure_allocations(config, ticks, seed):
+    simulation, _ = build_scenario(config, seed)
+
+    tracemalloc.start()
+    start_current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.reset_peak()
+    run_ticks(simulation, config, ticks, seed)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "ticks": ticks,
+        "peak_kib": (peak - start_current) / 1024,
+        "net_kib": (current - start_current) / 1024,
+    }
+
+
+def run_scenario(name, config, ticks=None, seed=SEED):
+    ticks = ticks or config["ticks"]
+    print(f"[*] {name}: {ticks} ticks", flush=True)
+    result = {"scenario": name, "seed": seed, "ticks": ticks, "config": config}
+    result.update(measure_timings(config, ticks, seed))
+    result["allocations"] = measure_allocations(config, min(ticks, ALLOCATION_TICKS), seed)
+    return result
+
+
+def main():
+    parser = ArgumentParser(description="Run the headless stress scenarios and report JSON.")
+    parser.add_argument("--scenario", action="append", choices=list(SCENARIOS),
+                        help="scenario to run, repeat for several (default: all)")
+    parser.add_argument("--ticks", type=int, help="override the tick count of every scenario")
+    parser.add_argument("--seed", type=int, default=SEED)
+    parser.add_argument("--output", help="write the JSON report to this file instead of stdout")
+    args = parser.parse_args()
+
+    names = args.scenario or list(SCENARIOS)
+    report = {"sim_hz": SIM_HZ,
+              "results": [run_scenario(name, SCENARIOS[name], args.ticks, args.seed) for name in names]}
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text)
+        print(f"[*] Report written to {args.output}")
+    else:
+        print(text)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+"""
+Micro-benchmark for building world bounding boxes: how many box lookups a typical frame
+performs and what they cost when recomputed on every call versus cached at placement.
+
+The frame mirrors the collision work done by the game: the player is tested against every
+building and each live bullet against the buildings registered in its grid cell.
+
+Run from the repository root:
+    python benchmarks/world_bounds_bench.py
+"""
+from random import Random
+from time import perf_counter
+
+from common import build_city
+from settings import *
+from spatial_grid import SpatialGrid
+
+
+SEED = 40
+BULLET_COUNT = 500
+FRAMES = 30
+
+
+def frame_lookups(buildings, grid, bullet_positions):
+    """The buildings whose boxes are looked up during one frame, in call order."""
+    lookups = list(buildings)
+    for position in bullet_positions:
+        lookups.extend(grid.get_potential_colliders(position))
+    return lookups
+
+
+def run_frame(lookups, cached):
+    for obj in lookups:
+        if obj.has_multiple_collision_boxes:
+            obj.get_world_bounding_boxes() if cached else obj.compute_world_bounding_boxes()
+        else:
+            obj.get_world_bounding_box() if cached else obj.compute_world_bounding_box()
+
+
+def measure(name, lookups, cached):
+    start = perf_counter()
+    for _ in range(FRAMES):
+        run_frame(lookups, cached)
+    frame_time = (perf_counter() - start) / FRAMES
+
+    print(f"  {name:<8} {len(lookups):6d} calls/frame   {frame_time * 1000:8.3f} ms/frame   "
+          f"{frame_time / len(lookups) * 1e6:6.2f} us/call")
+    return frame_time
+
+
+def main():
+    rng = Random(SEED)
+    buildings = build_city(rng, BUILDING_COUNT, CITY_RADIUS, cache_bounds=True)
+
+    grid = SpatialGrid(cell_size=GRID_CELL_SIZE)
+    for obj in buildings:
+        grid.add_object(obj)
+
+    bullet_positions = [Vector3(rng.uniform(-CITY_RADIUS, CITY_RADIUS), rng.uniform(10, 120),
+                                rng.uniform(-CITY_RADIUS, CITY_RADIUS)) for _ in range(BULLET_COUNT)]
+    lookups = frame_lookups(buildings, grid, bullet_positions)
+
+    print(f"{len(buildings)} buildings, {BULLET_COUNT} bullets, averaged over {FRAMES} frames")
+    before = measure("before", lookups, cached=False)
+    after = measure("after", lookups, cached=True)
+    print(f"  speedup  {before / after:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,4 +1,5 @@
 from settings import *
+from custom_timer import ui_timers
 
 
 class AudioManager:
@@ -14,7 +15,7 @@ class AudioManager:
         self.sounds = {}
         self.music = {}
         self.current_game_music = None
-        self.warning_sound_timer = Timer(1.0)  
+        self.warning_sound_timer = Timer(1.0, scheduler=ui_timers)
         self.warning_sound_instance = None  
         
         self.load_assets()
@@ -85,8 +86,6 @@ class AudioManager:
             self.warning_sound_timer.deactivate()
             return
 
-        self.warning_sound_timer.update()
-        
         if (show_altitude_warning or show_boundary_warning) and not self.warning_sound_timer:
             self.warning_sound_instance = self.play_sound_ui("warning")
             self.warning_sound_timer.activate()
@@ -1,6 +1,14 @@
 from settings import *
 from models import SkyscraperSimple, SkycraperMultipleLayer
 from spatial_grid import SpatialGrid
+from nav_field import NavigationField, ChunkedNavigationField
+from frustum import frustum_planes, boxes_in_frustum
+from render_lod import RENDER_LOD_TIERS, IMPOSTOR, select_lod_tiers, make_box_impostor
+from city_layout import load_chunk_layout, chunk_bounds, chunk_distance, chunk_in_city, chunks_near, record_boxes
+import numpy as np
+from random import getrandbits
+from functools import partial
+from time import perf_counter
 
 
 class BuildingData:
@@ -10,29 +18,102 @@ class BuildingData:
         self.position = position
         self.rotation_angle = rotation_angle
         self.building_type = building_type  # "simple" or "complex"
-        self.transform_matrix = self.calculate_transform_matrix()
 
-    def calculate_transform_matrix(self):
-        rotation_matrix = matrix_rotate_y(radians(self.rotation_angle))
-        translation_matrix = matrix_translate(self.position.x, self.position.y, self.position.z)
 
-        return matrix_multiply(rotation_matrix, translation_matrix)
+class CityChunk:
+    """The buildings of one CITY_CHUNK_SIZE square of the city, loaded, drawn and evicted together"""
+
+    def __init__(self, coords):
+        self.coords = coords
+        self.bounds = chunk_bounds(coords)  # (min_x, min_z, max_x, max_z)
+        self.records = None  # the chunk's CITY_RECORD layout
+        self.collision_objects = []
+        self.building_data = {
+            "simple": [],
+            "complex": []
+        }
+        self.matrices = {}  # building type -> (N, 16) float32 instance transforms, laid out like Matrix
+        self.building_bounds = {}  # building type -> (N, 3) mins and maxs of each building's boxes
+        self.building_centers = {}  # building type -> (N, 3) centres of those boxes, for LOD distances
+        self.lod_tiers = {}  # building type -> render LOD tier of each building at its last draw
+        self.box = None  # (mins, maxs) of every building of the chunk, None while it has none
+
+    def pack_bounds(self):
+        """Merges each building's boxes from the layout into one AABB per building, for culling."""
+        used = (np.arange(3) < self.records["box_count"][:, None])[..., None]
+        mins = np.where(used, self.records["box_mins"], np.inf).min(axis=1)
+        maxs = np.where(used, self.records["box_maxs"], -np.inf).max(axis=1)
+        for building_type, layered in (("simple", False), ("complex", True)):
+            rows = self.records["layered"] == layered
+            self.building_bounds[building_type] = (mins[rows], maxs[rows])
+            self.building_centers[building_type] = (mins[rows] + maxs[rows]) / 2
+            self.lod_tiers[building_type] = np.zeros(np.count_nonzero(rows), dtype=np.int8)
+        if len(mins):
+            self.box = (mins.min(axis=0), maxs.max(axis=0))
+
+    def pack_transforms(self):
+        """Packs the instance transforms from the layout once, a chunk never changes while it is loaded."""
+        angles = np.radians(self.records["rotation"].astype(np.float64))
+        matrices = np.zeros((len(self.records), 16), dtype=np.float32)
+        # Matrix fields run m0, m4, m8, m12, m1, ...: the rotation about Y, then the translation
+        matrices[:, 0] = matrices[:, 10] = np.cos(angles)
+        matrices[:, 2] = np.sin(angles)
+        matrices[:, 8] = -np.sin(angles)
+        matrices[:, 5] = matrices[:, 15] = 1.0
+        matrices[:, [3, 7, 11]] = self.records["position"]
+        for building_type, layered in (("simple", False), ("complex", True)):
+            self.matrices[building_type] = matrices[self.records["layered"] == layered]
+
+    def get_building_count(self):
+        return len(self.collision_objects)
 
 
 class BuildingManager:
-    """Manages building rendering with instancing and collision detection"""
+    """
+    Manages building rendering with instancing and collision detection
+
+    The city is split into CITY_CHUNK_SIZE squares. update_streaming() loads the chunks near the
+    player from the city cache, laying out the ones never seen before, and evicts the far ones,
+    so only the neighbourhood of the player is ever in memory, in the spatial grid or drawn.
+    Each chunk bakes its own navigation field on first use, so loading one never rebakes the others.
 
-    def __init__(self, models):
+    Drawing culls the loaded buildings against the view frustum, then draws the visible ones in
+    one instanced batch per building type and render LOD tier, full meshes near the camera and
+    box impostors beyond BUILDING_LOD_DISTANCES.
+    """
+
+    def __init__(self, models, headless=False):
         self.models = models
 
-        self.building_data = {
-            "simple": [],
-            "complex": []
-        }
-        self.collision_objects = []
+        self.chunks = {}  # (chunk_x, chunk_z) -> CityChunk, each holding its own buildings
 
         self.spatial_grid = SpatialGrid(cell_size=GRID_CELL_SIZE)
-        self.setup_instancing()
+        self.nav_field = ChunkedNavigationField(CITY_CHUNK_SIZE)
+
+        self.city_count = BUILDING_COUNT
+        self.city_radius = CITY_RADIUS
+        self.city_seed = None
+        self.city_cached = False
+        self.stream_radius = CITY_STREAM_RADIUS
+        self.evict_radius = CITY_EVICT_RADIUS
+        self.stream_center = None  # chunk the player was in at the last streaming pass
+        self.pending_chunks = []  # chunks to load, the nearest last
+        self.chunk_stats = dict.fromkeys(("cached", "generated", "evicted"), 0)  # chunk loads by source, evictions
+        self.layouts_generated = 0  # layouts generated rather than read from the cache, for loads and neighbours
+        self.laid_out_unloaded = set()  # chunks laid out for a neighbour's navigation field, not yet loaded
+
+        # (building type, LOD tier) -> (Matrix[] buffer, (capacity, 16) float32 view of it), the
+        # visible instances of every chunk are gathered here each frame and drawn in one call per batch
+        self.instance_buffers = {}
+        self.lod_meshes = {}  # building type -> mesh per LOD tier
+        self.lod_counts = {building_type: [0] * len(RENDER_LOD_TIERS) for building_type in ("simple", "complex")}
+
+        self.camera_position = ffi.new('float[3]')
+
+        self.instancing_enabled = False
+        self.shader = None
+        if not headless:
+            self.setup_instancing()
 
     def setup_instancing(self):
         vs_path = join("shaders", "buildings", "building_instancing.vs")
@@ -99,129 +180,240 @@ class BuildingManager:
         material_complex.maps[MATERIAL_MAP_DIFFUSE].color = Color(180, 180, 180, 255)  # darker gray
         self.materials["complex"] = material_complex
 
-    def add_building(self, position, rotation_angle, building_type_model):
+        # far buildings are drawn as their bounding box, one mesh per building type
+        for building_type, model_key in (("simple", "skyscraper02"), ("complex", "skyscraper01")):
+            mesh = self.models[model_key].meshes[0]
+            self.lod_meshes[building_type] = [mesh, make_box_impostor(get_mesh_bounding_box(mesh))]
+
+    def add_building(self, chunk, position, rotation_angle, building_type_model, world_boxes=None):
         if building_type_model == "skyscraper01":
             building_type = "complex"
             collision_obj = SkycraperMultipleLayer(
-                self.models["skyscraper01"],
+                self.models.get("skyscraper01"),
                 position,
                 rotation_angle=rotation_angle
             )
         else:
             building_type = "simple"
             collision_obj = SkyscraperSimple(
-                self.models["skyscraper02"],
+                self.models.get("skyscraper02"),
                 position,
                 rotation_angle=rotation_angle
             )
 
-        self.collision_objects.append(collision_obj)
+        # buildings never move, so their world boxes are computed once here, or come with the city layout
+        if world_boxes:
+            collision_obj.restore_world_bounds(world_boxes)
+        else:
+            collision_obj.cache_world_bounds()
+        chunk.collision_objects.append(collision_obj)
         self.spatial_grid.add_object(collision_obj)
 
         building_data = BuildingData(position, rotation_angle, building_type)
-        self.building_data[building_type].append(building_data)
+        chunk.building_data[building_type].append(building_data)
 
         return collision_obj
 
-    def generate_city(self, count=BUILDING_COUNT):
-        print(f"Generating {count} buildings with instancing in a radius of {CITY_RADIUS}m.")
-
-        self.building_data = {"simple": [], "complex": []}
-        self.collision_objects.clear()
-        self.spatial_grid.clear()
-
-        max_attempts_per_building = 100
+    def generate_city(self, count=BUILDING_COUNT, radius=CITY_RADIUS, seed=None, center=None):
+        """Starts the city laid out from `seed` and loads every chunk near `center`; None draws a seed from `random`."""
+        print(f"Generating {count} buildings with instancing in a radius of {radius}m, "
+              f"in chunks of {CITY_CHUNK_SIZE:g}m.")
+
+        self.clear_all()
+        self.city_count = count
+        self.city_radius = radius
+        self.city_seed = getrandbits(32) if seed is None else seed
+
+        start = perf_counter()
+        layouts_generated = self.layouts_generated
+        self.update_streaming(center or Vector3(0, 0, 0), max_loads=None)
+        self.city_cached = self.layouts_generated == layouts_generated
+
+        simple_count = sum(len(chunk.building_data["simple"]) for chunk in self.chunks.values())
+        complex_count = sum(len(chunk.building_data["complex"]) for chunk in self.chunks.values())
+        print(f"Generated {simple_count} simple buildings and {complex_count} complex buildings in "
+              f"{len(self.chunks)} chunks from seed {self.city_seed} ({'cached' if self.city_cached else 'laid out'}, "
+              f"{(perf_counter() - start) * 1000:.0f} ms)")
+        print(f"Navigation field: {len(self.chunks)} chunks, each baked the first time something flies over it")
+        print(f"Instancing: {'ENABLED' if self.instancing_enabled else 'DISABLED'}")
 
-        for _ in range(count):
-            for attempt in range(max_attempts_per_building):
-                x = uniform(-CITY_RADIUS, CITY_RADIUS)
-                z = uniform(-CITY_RADIUS, CITY_RADIUS)
+    def update_streaming(self, position, max_loads=CITY_CHUNK_LOADS_PER_STEP):
+        """
+        Brings the loaded chunks in line with `position`: chunks within stream_radius are
+        queued and loaded nearest first, at most `max_loads` per call (None for all), and chunks
+        beyond evict_radius are evicted. Nothing streams before generate_city() picks a city.
+        """
+        if self.city_seed is None:
+            return
 
-                if sqrt(x * x + z * z) < MIN_DISTANCE_FROM_CENTER:
-                    continue
+        center = (int(position.x // CITY_CHUNK_SIZE), int(position.z // CITY_CHUNK_SIZE))
+        if center != self.stream_center:
+            self.stream_center = center
+            far = [coords for coords, chunk in self.chunks.items()
+                   if chunk_distance(chunk.bounds, position.x, position.z) > self.evict_radius]
+            for coords in far:
+                self.evict_chunk(coords)
+
+            near = chunks_near(position.x, position.z, self.stream_radius, self.city_radius)
+            self.pending_chunks = [coords for coords in reversed(near) if coords not in self.chunks]
+
+        loads = 0
+        while self.pending_chunks and (max_loads is None or loads < max_loads):
+            self.load_chunk(self.pending_chunks.pop())
+            loads += 1
+
+    def load_chunk(self, coords):
+        records, cached = load_chunk_layout(coords, self.city_count, self.city_radius, self.city_seed)
+        if not cached:
+            self.layouts_generated += 1
+        # a layout generated for a neighbour's navigation field counts as generated at its first load
+        generated = not cached or coords in self.laid_out_unloaded
+        self.laid_out_unloaded.discard(coords)
+        chunk = CityChunk(coords)
+        chunk.records = records
+        chunk.pack_bounds()
+
+        for position, rotation, layered, box_count, box_mins, box_maxs in zip(
+                records["position"].tolist(), records["rotation"].tolist(), records["layered"].tolist(),
+                records["box_count"].tolist(), records["box_mins"].tolist(), records["box_maxs"].tolist()):
+            world_boxes = [BoundingBox(Vector3(*box_min), Vector3(*box_max))
+                           for box_min, box_max in zip(box_mins[:box_count], box_maxs[:box_count])]
+            self.add_building(chunk, Vector3(*position), rotation, "skyscraper01" if layered else "skyscraper02",
+                              world_boxes)
 
-                is_overlapping = False
-                new_pos = Vector3(x, 0, z)
-                for existing_building in self.collision_objects:
-                    existing_pos = existing_building.position
-                    distance = sqrt((new_pos.x - existing_pos.x) ** 2 + (new_pos.z - existing_pos.z) ** 2)
-
-                    if distance < MIN_BUILDING_DISTANCE:
-                        is_overlapping = True
-                        break
-
-                if not is_overlapping:
-                    rotation = choice([0, 90, 180, 270])
-
-                    if randint(1, 10) <= 4:
-                        building_model = "skyscraper01"
-                        position = Vector3(x, -10, z)
-                    else:
-                        building_model = "skyscraper02"
-                        position = Vector3(x, -14.8, z)
-
-                    self.add_building(position, rotation, building_model)
-                    break
-            else:
-                print(f"[WARNING]: Could not find a position for a building after {max_attempts_per_building} attempts.")
-
-        simple_count = len(self.building_data["simple"])
-        complex_count = len(self.building_data["complex"])
-        print(f"Generated {simple_count} simple buildings and {complex_count} complex buildings")
-        print(f"Instancing: {'ENABLED' if self.instancing_enabled else 'DISABLED'}")
+        if self.instancing_enabled:
+            chunk.pack_transforms()
+        self.chunks[coords] = chunk
+        self.chunk_stats["generated" if generated else "cached"] += 1
+        self.nav_field.add_chunk(coords, partial(self.bake_chunk_nav_field, chunk))
+        return chunk
+
+    def evict_chunk(self, coords):
+        chunk = self.chunks.pop(coords)
+        for obj in chunk.collision_objects:
+            self.spatial_grid.remove_object(obj)
+        self.nav_field.remove_chunk(coords)
+        self.chunk_stats["evicted"] += 1
+
+    def bake_chunk_nav_field(self, chunk):
+        """Bakes the chunk's navigation field from its buildings and those of its neighbours within reach."""
+        neighbour_records = []
+        chunk_x, chunk_z = chunk.coords
+        for coords in [(chunk_x + dx, chunk_z + dz) for dx in (-1, 0, 1) for dz in (-1, 0, 1)]:
+            if coords in self.chunks:
+                neighbour_records.append(self.chunks[coords].records)
+            elif chunk_in_city(coords, self.city_radius):
+                records, cached = load_chunk_layout(coords, self.city_count, self.city_radius, self.city_seed)
+                neighbour_records.append(records)
+                if not cached:
+                    self.layouts_generated += 1
+                    self.laid_out_unloaded.add(coords)
+
+        box_mins, box_maxs = record_boxes(np.concatenate(neighbour_records))
+        return NavigationField.bake(box_mins, box_maxs, chunk.bounds)
 
     def update_shader_uniforms(self, camera):
         if not self.instancing_enabled or not camera:
             return
 
-        camera_pos = ffi.new('float[3]', [camera.position.x, camera.position.y, camera.position.z])
+        self.camera_position[0:3] = [camera.position.x, camera.position.y, camera.position.z]
         set_shader_value(self.shader, self.shader.locs[SHADER_LOC_VECTOR_VIEW],
-                         camera_pos, SHADER_UNIFORM_VEC3)
+                         self.camera_position, SHADER_UNIFORM_VEC3)
 
     def draw(self, camera=None):
         if self.instancing_enabled and camera:
             self.update_shader_uniforms(camera)
-            self.draw_instanced()
+            self.draw_instanced(camera)
         else:
             self.draw_individual()
 
-    def draw_instanced(self):
-        if self.building_data["simple"]:
-            transforms = [building.transform_matrix for building in self.building_data["simple"]]
-            if transforms:
-                try:
-                    simple_mesh = self.models["skyscraper02"].meshes[0]
-                    transforms_ptr = ffi.new('Matrix[]', transforms)
-                    draw_mesh_instanced(
-                        simple_mesh,
-                        self.materials["simple"],
-                        transforms_ptr,
-                        len(transforms)
-                    )
-                except Exception:
-                    self.draw_individual_type("simple")
+    def cull(self, camera):
+        """
+        Returns building type -> [(chunk, rows)] of the buildings in the camera's view, rows None
+        for a whole chunk. Chunks are tested first; only those cut by the frustum test their
+        buildings one by one.
+        """
+        planes = frustum_planes(camera, get_screen_width() / max(get_screen_height(), 1))
+        visible = {"simple": [], "complex": []}
+        for chunk in self.chunks.values():
+            if chunk.box is None:
+                continue
+
+            chunk_visible, chunk_contained = boxes_in_frustum(planes, chunk.box[0][None], chunk.box[1][None])
+            if not chunk_visible[0]:
+                continue
+
+            for building_type, (mins, maxs) in chunk.building_bounds.items():
+                if len(mins) == 0:
+                    continue
+                if chunk_contained[0]:
+                    visible[building_type].append((chunk, None))
+                    continue
+
+                rows = np.flatnonzero(boxes_in_frustum(planes, mins, maxs)[0])
+                if len(rows):
+                    visible[building_type].append((chunk, rows))
+        return visible
+
+    def get_instance_buffer(self, batch, count):
+        buffer, view = self.instance_buffers.get(batch, (None, None))
+        if view is None or len(view) < count:
+            capacity = max(count, 2 * len(view) if view is not None else 256)
+            buffer = ffi.new('Matrix[]', capacity)
+            view = np.frombuffer(ffi.buffer(buffer), dtype=np.float32).reshape(capacity, 16)
+            self.instance_buffers[batch] = (buffer, view)
+        return buffer, view
+
+    def split_lod_tiers(self, camera, visible):
+        """Updates the LOD tier of every visible building and returns building type -> [(chunk, rows)] per tier."""
+        camera_position = np.array([camera.position.x, camera.position.y, camera.position.z], dtype=np.float32)
+        batches = {}
+        for building_type, parts in visible.items():
+            batches[building_type] = [[] for _ in RENDER_LOD_TIERS]
+            for chunk, rows in parts:
+                if rows is None:
+                    rows = np.arange(len(chunk.lod_tiers[building_type]))
+
+                tiers = chunk.lod_tiers[building_type]
+                distances = np.linalg.norm(chunk.building_centers[building_type][rows] - camera_position, axis=1)
+                tiers[rows] = select_lod_tiers(distances, tiers[rows], BUILDING_LOD_DISTANCES)
+                for tier, tier_rows in enumerate(batches[building_type]):
+                    in_tier = rows[tiers[rows] == tier]
+                    if len(in_tier):
+                        tier_rows.append((chunk, in_tier))
+        return batches
+
+    def draw_instanced(self, camera):
+        batches = self.split_lod_tiers(camera, self.cull(camera))
+        for building_type, tier_parts in batches.items():
+            for tier, parts in enumerate(tier_parts):
+                count = sum(len(rows) for _, rows in parts)
+                self.lod_counts[building_type][tier] = count
+                if count == 0:
+                    continue
+
+                # the matrices are copied straight into the persistent buffer, nothing is allocated per frame
+                buffer, view = self.get_instance_buffer((building_type, tier), count)
+                start = 0
+                for chunk, rows in parts:
+                    np.take(chunk.matrices[building_type], rows, axis=0, out=view[start:start + len(rows)])
+                    start += len(rows)
 
-        if self.building_data["complex"]:
-            transforms = [building.transform_matrix for building in self.building_data["complex"]]
-            if transforms:
                 try:
-                    complex_mesh = self.models["skyscraper01"].meshes[0]
-                    transforms_ptr = ffi.new('Matrix[]', transforms)
-                    draw_mesh_instanced(
-                        complex_mesh,
-                        self.materials["complex"],
-                        transforms_ptr,
-                        len(transforms)
-                    )
+                    mesh = self.lod_meshes[building_type][tier]
+                    draw_mesh_instanced(mesh, self.materials[building_type], buffer, count)
                 except Exception:
-                    self.draw_individual_type("complex")
+                    for chunk, rows in parts:
+                        self.draw_individual_type(chunk, building_type, rows)
 
-    def draw_individual_type(self, building_type):
+    def draw_individual_type(self, chunk, building_type, rows=None):
         model_key = "skyscraper01" if building_type == "complex" else "skyscraper02"
         model = self.models[model_key]
         material = self.materials[building_type]
+        buildings = chunk.building_data[building_type]
 
-        for building_data in self.building_data[building_type]:
+        for row in range(len(buildings)) if rows is None else rows.tolist():
+            building_data = buildings[row]
             pos = building_data.position
             rot = building_data.rotation_angle
             draw_model_ex(model, pos, Vector3(0, 1, 0), rot, Vector3(1, 1, 1),
@@ -229,34 +421,66 @@ class BuildingManager:
 
     def draw_individual(self):
         """Fallback: Draw each building individually like the original system"""
-        for obj in self.collision_objects:
-            obj.draw()
+        for chunk in self.chunks.values():
+            for obj in chunk.collision_objects:
+                obj.draw()
 
     def get_collision_objects(self):
-        return self.collision_objects
+        """Every building of the loaded chunks, gathered into a new list."""
+        return [obj for chunk in self.chunks.values() for obj in chunk.collision_objects]
 
     def get_spatial_grid(self):
         return self.spatial_grid
 
+    def get_nav_field(self):
+        return self.nav_field
+
     def clear_all(self):
-        self.building_data = {"simple": [], "complex": []}
-        self.collision_objects.clear()
+        self.chunks.clear()
         self.spatial_grid.clear()
+        self.nav_field.clear()
+        self.stream_center = None
+        self.pending_chunks = []
+        self.laid_out_unloaded.clear()
 
     def get_building_count(self):
-        return len(self.collision_objects)
+        return sum(len(chunk.collision_objects) for chunk in self.chunks.values())
+
+    def get_chunk_stats(self):
+        return {
+            "loaded": len(self.chunks),
+            "pending": len(self.pending_chunks),
+            "buildings": self.get_building_count(),
+            **self.chunk_stats
+        }
 
     def get_instancing_stats(self):
-        simple_count = len(self.building_data["simple"])
-        complex_count = len(self.building_data["complex"])
+        simple_count = sum(len(chunk.building_data["simple"]) for chunk in self.chunks.values())
+        complex_count = sum(len(chunk.building_data["complex"]) for chunk in self.chunks.values())
+        visible_count = sum(sum(counts) for counts in self.lod_counts.values())
+        batches = sum(1 for counts in self.lod_counts.values() for count in counts if count)
+        lod = {}
+        for tier, name in enumerate(RENDER_LOD_TIERS):
+            instances = [(building_type, counts[tier]) for building_type, counts in self.lod_counts.items()]
+            lod[name] = {
+                "instances": sum(count for _, count in instances),
+                "triangles": sum(count * self.lod_meshes[building_type][tier].triangleCount
+                                 for building_type, count in instances if building_type in self.lod_meshes),
+            }
         return {
             "total": simple_count + complex_count,
             "simple": simple_count,
             "complex": complex_count,
+            "visible": visible_count,  # in the view at the last instanced draw
+            "culled": simple_count + complex_count - visible_count,
+            "lod": lod,  # instances and triangles per render LOD tier at the last instanced draw
+            "chunks": len(self.chunks),
             "instancing_enabled": self.instancing_enabled,
-            "draw_calls": 2 if self.instancing_enabled else simple_count + complex_count
+            "draw_calls": batches if self.instancing_enabled else simple_count + complex_count
         }
 
     def __del__(self):
         if hasattr(self, 'shader') and self.shader is not None:
-            unload_shader(self.shader)
\ No newline at end of file
+            unload_shader(self.shader)
+        for meshes in getattr(self, 'lod_meshes', {}).values():
+            unload_mesh(meshes[IMPOSTOR])
\ No newline at end of file
@@ -1,138 +1,157 @@
 from settings import *
-
-
-class Bullet:
-    """Base class for projectiles"""
-    def __init__(self, position, direction, bullet_type="normal"):
-        # types of bullets
-        bullet_configs = {
-            "normal": {
-                "speed": 100.0,
-                "damage": 25,
-                "lifetime": 3.0,
-                "color": YELLOW,
-                "size": 1.0
-            },
-            "heavy": {
-                "speed": 80.0,
-                "damage": 50,
-                "lifetime": 2.5,
-                "color": RED,
-                "size": 1.5
-            },
-            "rapid": {
-                "speed": 140.0,
-                "damage": 15,
-                "lifetime": 2.0,
-                "color": BLUE,
-                "size": 0.8
-            }
-        }
-        
-        config = bullet_configs.get(bullet_type, bullet_configs["normal"])
-        
-        self.position = Vector3(position.x, position.y, position.z)
-        self.previous_position = Vector3(position.x, position.y, position.z)
-        self.direction = Vector3(direction.x, direction.y, direction.z)
-        self.speed = config["speed"]
-        
-        self.bullet_type = bullet_type
-        self.damage = config["damage"]
-        self.lifetime = config["lifetime"]
-        self.max_lifetime = config["lifetime"]
-        self.color = config["color"]
-        self.size = config["size"]
-        self.active = True
-        
-        self.collision_box = BoundingBox(
-            Vector3(-0.1, -0.1, -0.1),
-            Vector3(0.1, 0.1, 0.1)
-        )
-
-    def update(self, dt):
-        if not self.active:
-            return
-        
-        self.previous_position.x = self.position.x
-        self.previous_position.y = self.position.y
-        self.previous_position.z = self.position.z
-            
-        self.position.x += self.speed * self.direction.x * dt
-        self.position.y += self.speed * self.direction.y * dt
-        self.position.z += self.speed * self.direction.z * dt
-        
-        self.lifetime -= dt
-        if self.lifetime <= 0:
-            self.active = False
-            return
-
-
-    def get_transform_matrix(self):
-        scale_matrix = matrix_scale(self.size, self.size, self.size)
-        translation_matrix = matrix_translate(self.position.x, self.position.y, self.position.z)
-
-        return matrix_multiply(scale_matrix, translation_matrix)
-
-
-    def get_world_bounding_box(self):
-        min_point = Vector3(
-            self.position.x + self.collision_box.min.x * self.size,
-            self.position.y + self.collision_box.min.y * self.size,
-            self.position.z + self.collision_box.min.z * self.size
-        )
-        max_point = Vector3(
-            self.position.x + self.collision_box.max.x * self.size,
-            self.position.y + self.collision_box.max.y * self.size,
-            self.position.z + self.collision_box.max.z * self.size
-        )
-        return BoundingBox(min_point, max_point)
-
-    def check_collision_with(self, other_model):
-        if not self.active:
-            return False
-        
-        my_box = self.get_world_bounding_box()
-        
-        if hasattr(other_model, 'has_multiple_collision_boxes') and other_model.has_multiple_collision_boxes:
-            other_boxes = other_model.get_world_bounding_boxes()
-            for other_box in other_boxes:
-                if check_collision_boxes(my_box, other_box):
-                    return True
-        else:
-            other_box = other_model.get_world_bounding_box()
-            if other_box is None:
-                return False
-            return check_collision_boxes(my_box, other_box)
-        
-        return False
-
-
-    def draw_trail(self):
-        trail_color = fade(self.color, 0.6)
-        draw_line_3d(self.previous_position, self.position, trail_color)
-
-
-
-    def check_bounds(self, max_distance=1000):
-        distance_from_origin = vector3_length(self.position)
-        if distance_from_origin > max_distance:
-            self.active = False
-
-
-    def on_hit(self, target):
-        if DEBUG:
-            print(f"{self.bullet_type.title()} bullet hit {target.__class__.__name__} for {self.damage} damage")
-        
-        self.active = False
-        return self.damage
+from dynamic_mesh import DynamicQuadMesh
+from frustum import camera_basis
+import numpy as np
+from types import MappingProxyType
+
+
+# types of bullets, read-only and shared by every bullet instead of being rebuilt per shot
+BULLET_CONFIGS = MappingProxyType({
+    "normal": MappingProxyType({
+        "speed": 100.0,
+        "damage": 25,
+        "lifetime": 3.0,
+        "color": YELLOW,
+        "size": 1.0
+    }),
+    "heavy": MappingProxyType({
+        "speed": 80.0,
+        "damage": 50,
+        "lifetime": 2.5,
+        "color": RED,
+        "size": 1.5
+    }),
+    "rapid": MappingProxyType({
+        "speed": 140.0,
+        "damage": 15,
+        "lifetime": 2.0,
+        "color": BLUE,
+        "size": 0.8
+    })
+})
+
+BULLET_TYPE_NAMES = list(BULLET_CONFIGS)
+BULLET_TYPE_INDEX = {name: i for i, name in enumerate(BULLET_TYPE_NAMES)}
+BULLET_TYPE_COLORS = [BULLET_CONFIGS[name]["color"] for name in BULLET_TYPE_NAMES]
+
+TYPE_SPEED = np.array([BULLET_CONFIGS[name]["speed"] for name in BULLET_TYPE_NAMES], dtype=np.float32)
+TYPE_DAMAGE = np.array([BULLET_CONFIGS[name]["damage"] for name in BULLET_TYPE_NAMES], dtype=np.int32)
+TYPE_LIFETIME = np.array([BULLET_CONFIGS[name]["lifetime"] for name in BULLET_TYPE_NAMES], dtype=np.float32)
+TYPE_SIZE = np.array([BULLET_CONFIGS[name]["size"] for name in BULLET_TYPE_NAMES], dtype=np.float32)
+for table in (TYPE_SPEED, TYPE_DAMAGE, TYPE_LIFETIME, TYPE_SIZE):
+    table.setflags(write=False)
+
+BULLET_CORE_COLOR = np.array((255, 255, 255, 204), dtype=np.uint8)  # the white centre of a bullet
+BULLET_HALF_EXTENT = 0.1  # half size of the bullet collision box, scaled by the type size
+BULLET_MAX_DISTANCE = 1000.0
+
+
+def segment_box_pair_times(starts, ends, box_mins, box_maxs, half_extents):
+    """
+    Slab test of paired segments and axis-aligned boxes, row i against box i, each box grown
+    by the segment's half extent so the moving bullet box is treated as a point.
+
+    Returns the path fraction in [0, 1] where each segment first touches its box, or inf where it misses.
+    """
+    deltas = ends - starts
+    deltas = np.where(np.abs(deltas) < 1e-9, np.float32(1e-9), deltas)
+    inverse = 1.0 / deltas
+
+    grow = half_extents[:, None]
+    t1 = (box_mins - grow - starts) * inverse
+    t2 = (box_maxs + grow - starts) * inverse
+
+    t_enter = np.minimum(t1, t2).max(axis=1)
+    t_exit = np.maximum(t1, t2).min(axis=1)
+
+    hit = (t_enter <= t_exit) & (t_exit >= 0.0) & (t_enter <= 1.0)
+    return np.where(hit, np.maximum(t_enter, 0.0), np.inf).astype(np.float32)
+
+
+def segment_box_hit_times(starts, ends, box_mins, box_maxs, half_extents):
+    """
+    Slab test of N segments against K axis-aligned boxes.
+
+    Returns an (N, K) array with the path fraction in [0, 1] where each segment first
+    touches each box, or inf where it misses.
+    """
+    grow = half_extents[:, None]
+    lows = np.minimum(starts, ends) - grow
+    highs = np.maximum(starts, ends) + grow
+
+    # cheap bounding-box rejection first, the slab test only runs on the surviving pairs
+    overlap = np.all((lows[:, None, :] <= box_maxs[None, :, :]) & (highs[:, None, :] >= box_mins[None, :, :]), axis=2)
+    rows, cols = np.nonzero(overlap)
+
+    times = np.full(overlap.shape, np.inf, dtype=np.float32)
+    if len(rows) == 0:
+        return times
+
+    times[rows, cols] = segment_box_pair_times(starts[rows], ends[rows], box_mins[cols], box_maxs[cols],
+                                               half_extents[rows])
+    return times
 
 
 class BulletManager:
-    """Game's Bullet Manager with instancing"""
-    def __init__(self):
-        self.bullets = []
-        self.max_bullets = 500
+    """Game's Bullet Manager with instancing
+
+    Bullets live in a fixed pool of max_bullets slots stored as a structure of arrays: slot i of
+    every array is one bullet, which keeps its slot for its whole life. Movement, expiry and
+    bounds checks run over the slots [0, count) at once, masked by `active`.
+
+    A bullet's slot goes back on a free list as it dies. A bullet stopped by a building can
+    still hit aircraft this step, so its slot waits for the next update or a full pool. Firing
+    takes a slot from the free list, or a never used one, or, with the pool full, overwrites the
+    oldest bullet, found through a ring buffer of slots in firing order. Firing never allocates
+    and is O(1).
+    """
+    def __init__(self, max_bullets=500, headless=False):
+        self.max_bullets = max_bullets
+        self.max_distance = BULLET_MAX_DISTANCE  # from the centre, Simulation widens it for bigger cities
+        self.count = 0  # slots handed out since the pool was last empty
+        self.spawn_serial = 0
+
+        self.positions = np.zeros((max_bullets, 3), dtype=np.float32)
+        self.previous_positions = np.zeros((max_bullets, 3), dtype=np.float32)
+        self.directions = np.zeros((max_bullets, 3), dtype=np.float32)
+        self.speeds = np.zeros(max_bullets, dtype=np.float32)
+        self.lifetimes = np.zeros(max_bullets, dtype=np.float32)
+        self.types = np.zeros(max_bullets, dtype=np.int8)
+        self.births = np.zeros(max_bullets, dtype=np.int64)
+        self.shooters = np.zeros(max_bullets, dtype=np.int64)  # serial of the aircraft that fired, 0 for none
+        self.active = np.zeros(max_bullets, dtype=bool)
+        # fraction of this step's path that can still hit something: 1 for the whole path,
+        # the building hit time after striking a wall and 0 once spent or expired
+        self.sweep_limits = np.zeros(max_bullets, dtype=np.float32)
+
+        self.in_use = np.zeros(max_bullets, dtype=bool)  # holds a bullet, live or waiting to be freed
+        self.free_slots = np.zeros(max_bullets, dtype=np.int32)
+        self.free_count = 0
+        self.held_slots = []  # bullets stopped by a building this step, freed at the next update
+        self.evictions = 0
+
+        # slots in firing order with the serial of the bullet fired into them; entries whose slot
+        # was freed or refilled since are stale and skipped. Twice the pool size keeps compaction rare.
+        self.fired_slots = np.zeros(2 * max_bullets, dtype=np.int32)
+        self.fired_serials = np.zeros(2 * max_bullets, dtype=np.int64)
+        self.fired_head = 0
+        self.fired_tail = 0
+
+        # positions at the end of the last BULLET_TRAIL_SEGMENTS + 1 steps, a ring shared by every
+        # slot with trail_head as the next entry; only kept when the bullets are drawn
+        self.trail_history = None
+        self.trail_head = 0
+
+        self.instancing_enabled = False
+        self.render_path = None  # "instanced" or "batched" once the bullets are drawn
+        self.draw_calls = 0
+        self.shader = None
+        self.materials = {}
+        if not headless:
+            self.setup_rendering()
 
+
+    def setup_rendering(self):
         self.bullet_mesh = gen_mesh_sphere(0.2, 8, 8)
         
         vs_path = join("shaders", "bullets", "bullet_instancing.vs")
@@ -167,10 +186,7 @@ class BulletManager:
                 self.shader = None
 
         self.materials = {}
-        bullet_types = ["normal", "heavy", "rapid"]
-        bullet_colors = [YELLOW, RED, BLUE]
-        
-        for bullet_type, color in zip(bullet_types, bullet_colors):
+        for bullet_type, color in zip(BULLET_TYPE_NAMES, BULLET_TYPE_COLORS):
             if self.instancing_enabled:
                 material = load_material_default()
                 material.shader = self.shader
@@ -181,139 +197,406 @@ class BulletManager:
                 material.maps[MATERIAL_MAP_DIFFUSE].color = color
                 self.materials[bullet_type] = material
 
+        # trail colour of every segment per type, fading out towards the oldest
+        fades = 0.6 * (1.0 - np.arange(BULLET_TRAIL_SEGMENTS) / BULLET_TRAIL_SEGMENTS)
+        self.trail_colors = np.repeat(np.array(BULLET_TYPE_COLORS, dtype=np.uint8)[:, None], BULLET_TRAIL_SEGMENTS, axis=1)
+        self.trail_colors[:, :, 3] = (255 * fades).astype(np.uint8)
+        self.trail_history = np.zeros((self.max_bullets, BULLET_TRAIL_SEGMENTS + 1, 3), dtype=np.float32)
+        self.trails = DynamicQuadMesh(min(self.max_bullets * BULLET_TRAIL_SEGMENTS, 4096))
+
+        # without instancing every bullet is two camera-facing quads in one batch, built once here
+        self.body_colors = np.array(BULLET_TYPE_COLORS, dtype=np.uint8)
+        self.sprites = DynamicQuadMesh(min(2 * self.max_bullets, 4096))
+        self.render_path = "instanced" if self.instancing_enabled else "batched"
+        print(f"[*] Bullet rendering path: {self.render_path}")
+
+        # instance transforms for the whole pool, filled in place each frame through the NumPy
+        # view; only the scale and translation entries change, the rest stay the identity's
+        self.instance_buffer = ffi.new('Matrix[]', self.max_bullets)
+        self.instance_matrices = np.frombuffer(ffi.buffer(self.instance_buffer), dtype=np.float32).reshape(-1, 16)
+        self.instance_matrices[:, 15] = 1.0
+        self.camera_position = ffi.new('float[3]')
+
+
+    def add_bullet(self, position, direction, bullet_type="normal", shooter=None):
+        if not self.free_count and self.held_slots:
+            # a bullet stopped by a building is still better to overwrite than a live one
+            self.release_slots([self.held_slots.pop()])
+
+        if self.free_count:
+            self.free_count -= 1
+            i = int(self.free_slots[self.free_count])
+        elif self.count < self.max_bullets:
+            i = self.count
+            self.count += 1
+        else:
+            i = self.pop_oldest_slot()
+            self.evictions += 1
+
+        type_index = BULLET_TYPE_INDEX.get(bullet_type, 0)
+        self.positions[i] = (position.x, position.y, position.z)
+        self.previous_positions[i] = self.positions[i]
+        self.directions[i] = (direction.x, direction.y, direction.z)
+        self.speeds[i] = TYPE_SPEED[type_index]
+        self.lifetimes[i] = TYPE_LIFETIME[type_index]
+        self.types[i] = type_index
+        self.births[i] = self.spawn_serial
+        self.shooters[i] = shooter.serial if shooter is not None else 0
+        self.active[i] = True
+        self.in_use[i] = True
+        self.sweep_limits[i] = 0.0
+        if self.trail_history is not None:
+            self.trail_history[i] = self.positions[i]
+
+        self.push_fired(i, self.spawn_serial)
+        self.spawn_serial += 1
+        return i
+
+
+    def push_fired(self, slot, serial):
+        size = len(self.fired_slots)
+        if self.fired_tail - self.fired_head == size:
+            self.compact_fired()
+
+        k = self.fired_tail % size
+        self.fired_slots[k] = slot
+        self.fired_serials[k] = serial
+        self.fired_tail += 1
+
+
+    def pop_oldest_slot(self):
+        """Takes the slot of the oldest bullet still in the pool off the firing-order ring."""
+        size = len(self.fired_slots)
+        while True:
+            k = self.fired_head % size
+            self.fired_head += 1
+            slot = int(self.fired_slots[k])
+            if self.in_use[slot] and self.births[slot] == self.fired_serials[k]:
+                return slot
+
+
+    def compact_fired(self):
+        """Drops the stale ring entries, which leaves at most one entry per slot."""
+        size = len(self.fired_slots)
+        ring = np.arange(self.fired_head, self.fired_tail) % size
+        slots, serials = self.fired_slots[ring], self.fired_serials[ring]
+        keep = self.in_use[slots] & (self.births[slots] == serials)
+
+        kept = int(np.count_nonzero(keep))
+        self.fired_slots[:kept] = slots[keep]
+        self.fired_serials[:kept] = serials[keep]
+        self.fired_head = 0
+        self.fired_tail = kept
+
+
+    def release_slots(self, slots):
+        """Returns the slots of dead bullets to the free list, skipping slots already freed or refilled."""
+        slots = np.asarray(slots, dtype=np.int32)
+        slots = slots[self.in_use[slots] & ~self.active[slots]]
+        if len(slots) == 0:
+            return
 
-    def add_bullet(self, position, direction, bullet_type="normal"):
-        if len(self.bullets) >= self.max_bullets:
-            for i, bullet in enumerate(self.bullets):
-                if not bullet.active:
-                    self.bullets.pop(i)
-                    break
-            else:
-                self.bullets.pop(0)
-            
-        bullet = Bullet(position, direction, bullet_type)
-        self.bullets.append(bullet)
-        return bullet
+        self.in_use[slots] = False
+        self.free_slots[self.free_count:self.free_count + len(slots)] = slots
+        self.free_count += len(slots)
+
+        if self.free_count == self.count:
+            # the pool is empty, so hand out slots from the bottom again
+            self.count = 0
+            self.free_count = 0
+            self.fired_head = self.fired_tail = 0
 
 
     def update(self, dt, spatial_grid=None):
-        for bullet in self.bullets[:]: 
-            if not bullet.active:
-                self.bullets.remove(bullet)
-                continue
-                
-            bullet.update(dt)
-            bullet.check_bounds()
+        if self.held_slots:
+            self.release_slots(self.held_slots)
+            self.held_slots.clear()
+        n = self.count
+        if n == 0:
+            return
+
+        positions = self.positions[:n]
+        self.previous_positions[:n] = positions
+        positions += self.directions[:n] * (self.speeds[:n] * dt)[:, None]
+
+        self.lifetimes[:n] -= dt
+        active = self.active[:n]
+        alive = (self.lifetimes[:n] > 0) & (np.einsum('ij,ij->i', positions, positions) <= self.max_distance ** 2)
+        expired = np.flatnonzero(active & ~alive)
+        active &= alive
+        self.sweep_limits[:n] = active
 
-            if spatial_grid:
-                self.check_bullet_collisions(bullet, spatial_grid)
+        if self.trail_history is not None:
+            self.trail_history[:n, self.trail_head] = positions
+            self.trail_head = (self.trail_head + 1) % (BULLET_TRAIL_SEGMENTS + 1)
 
+        self.release_slots(expired)
+        if spatial_grid:
+            self.check_building_collisions(spatial_grid)
 
-    def check_bullet_collisions(self, bullet, spatial_grid):
-        if not bullet.active:
+
+    def get_half_extents(self, indices):
+        return TYPE_SIZE[self.types[indices]] * BULLET_HALF_EXTENT
+
+
+    def check_building_collisions(self, spatial_grid):
+        indices = np.flatnonzero(self.active[:self.count])
+        if len(indices) == 0:
             return
 
-        # only gets potential coliders insted of all 
-        potential_colliders = spatial_grid.get_potential_colliders(bullet.position)
-            
-        for obj in potential_colliders:
-            if bullet.check_collision_with(obj):
-                damage_dealt = bullet.on_hit(obj)
-                
-                if hasattr(obj, 'take_damage'):
-                    obj.take_damage(damage_dealt)
+        # a path can cross into a neighbouring cell, so each bullet is tested in the cells of both ends
+        cell_size = spatial_grid.cell_size
+        start_cells = np.floor(self.previous_positions[indices][:, [0, 2]] / cell_size).astype(np.int64)
+        end_cells = np.floor(self.positions[indices][:, [0, 2]] / cell_size).astype(np.int64)
+        crossing = np.any(start_cells != end_cells, axis=1)
+
+        rows = np.concatenate([indices, indices[crossing]])
+        cells = np.concatenate([end_cells, start_cells[crossing]])
+        keys = (cells[:, 0] << 32) + cells[:, 1]
+        order = np.argsort(keys)
+        sorted_keys = keys[order]
+        group_starts = np.flatnonzero(np.r_[True, sorted_keys[1:] != sorted_keys[:-1]])
+        group_ends = np.r_[group_starts[1:], len(order)]
+
+        earliest = {}  # bullet index -> (hit time, building)
+        for start, end in zip(group_starts.tolist(), group_ends.tolist()):
+            cell_boxes = spatial_grid.get_cell_boxes(tuple(cells[order[start]].tolist()))
+            if cell_boxes is None:
+                continue
+            objects, box_mins, box_maxs, owners = cell_boxes
+
+            group = rows[order[start:end]]
+            times = segment_box_hit_times(self.previous_positions[group], self.positions[group],
+                                          box_mins, box_maxs, self.get_half_extents(group))
+            first = times.argmin(axis=1)
+            first_times = times[np.arange(len(group)), first]
+            hit_rows = np.flatnonzero(np.isfinite(first_times))
+
+            for bullet_index, t, owner in zip(group[hit_rows].tolist(), first_times[hit_rows].tolist(),
+                                              owners[first[hit_rows]].tolist()):
+                if bullet_index not in earliest or t < earliest[bullet_index][0]:
+                    earliest[bullet_index] = (t, objects[owner])
+
+        for bullet_index, (t, obj) in earliest.items():
+            damage_dealt = self.on_hit(bullet_index, obj, release=False)
+            # aircraft can still be hit on the part of the path before the wall
+            self.sweep_limits[bullet_index] = t
+            self.held_slots.append(bullet_index)
+
+            if hasattr(obj, 'take_damage'):
+                obj.take_damage(damage_dealt)
+
+
+    def sweep_hits(self, spatial_hash):
+        """
+        Sweeps every bullet that moved this step, from its previous to its current position,
+        against the boxes of a DynamicSpatialHash rebuilt for this frame.
+
+        Only bullet/box pairs that share a hash cell reach the slab test, so the cost follows how
+        crowded the area around each bullet is rather than bullets times targets.
+
+        Returns (bullet_indices, target_indices, impact_positions) sorted by hit time. Each bullet
+        reports only the box it touches first, and only if that happens before it struck a building.
+        """
+        n = self.count
+        candidates = np.flatnonzero(self.sweep_limits[:n] > 0)
+        if len(candidates) == 0 or len(spatial_hash) == 0:
+            return candidates[:0], candidates[:0], np.zeros((0, 3), dtype=np.float32)
+
+        starts = self.previous_positions[candidates]
+        ends = self.positions[candidates]
+        half_extents = self.get_half_extents(candidates)
+        grow = half_extents[:, None]
+
+        rows, cols = spatial_hash.query_pairs(np.minimum(starts, ends) - grow, np.maximum(starts, ends) + grow)
+        # bullets leave from inside their own aircraft's box, which must not count as a hit
+        own = self.shooters[candidates[rows]] == spatial_hash.keys[cols]
+        rows, cols = rows[~own], cols[~own]
+        if len(rows) == 0:
+            return candidates[:0], candidates[:0], np.zeros((0, 3), dtype=np.float32)
+
+        times = segment_box_pair_times(starts[rows], ends[rows], spatial_hash.box_mins[cols],
+                                       spatial_hash.box_maxs[cols], half_extents[rows])
+        hit = times <= self.sweep_limits[candidates[rows]]
+        rows, cols, times = rows[hit], cols[hit], times[hit]
+
+        # earliest box per bullet: sort by (bullet, time) and keep the first pair of each bullet
+        order = np.lexsort((times, rows))
+        rows, cols, times = rows[order], cols[order], times[order]
+        first = np.ones(len(rows), dtype=bool)
+        first[1:] = rows[1:] != rows[:-1]
+        rows, cols, times = rows[first], cols[first], times[first]
+
+        order = np.argsort(times, kind='stable')
+        rows, cols, t = rows[order], cols[order], times[order][:, None]
+        impacts = starts[rows] + (ends[rows] - starts[rows]) * t
+        return candidates[rows], cols, impacts
+
+
+    def on_hit(self, index, target, release=True):
+        bullet_type = BULLET_TYPE_NAMES[self.types[index]]
+        damage = int(TYPE_DAMAGE[self.types[index]])
+        if DEBUG:
+            print(f"{bullet_type.title()} bullet hit {target.__class__.__name__} for {damage} damage")
 
-                break
+        self.active[index] = False
+        self.sweep_limits[index] = 0.0
+        if release:
+            self.release_slots([index])
+        return damage
 
 
-    def draw(self, camera=None):
-        if not self.bullets:
+    def draw(self, camera=None, alpha=1.0):
+        """`alpha` is how far the renderer is between the last two simulation steps."""
+        active_indices = np.flatnonzero(self.active[:self.count])
+        if len(active_indices) == 0:
             return
 
-        for bullet in self.bullets:
-            if bullet.active:
-                bullet.draw_trail()
-        
-        if self.instancing_enabled and camera:
-            self.draw_instanced(camera)
+        previous = self.previous_positions[active_indices]
+        positions = previous + (self.positions[active_indices] - previous) * np.float32(alpha)
+
+        self.draw_calls = 0
+        self.draw_trails(camera, active_indices, positions)
+
+        if self.render_path == "instanced" and camera:
+            self.draw_instanced(camera, active_indices, positions)
         else:
-            self.draw_individual()
+            self.draw_batched(camera, active_indices, positions)
+
+
+    def draw_trails(self, camera, indices, positions):
+        """
+        Every trail as BULLET_TRAIL_SEGMENTS ribbons facing the camera, from the drawn position
+        back through the trail history, all bullet types in one draw call.
+        """
+        length = BULLET_TRAIL_SEGMENTS + 1
+        points = np.empty((len(indices), length, 3), dtype=np.float32)
+        points[:, 0] = positions
+        ring = (self.trail_head - 1 - np.arange(1, length)) % length  # newest first, skipping this step's end
+        points[:, 1:] = self.trail_history[indices[:, None], ring]
 
+        ends = points[:, :-1].reshape(-1, 3)
+        starts = points[:, 1:].reshape(-1, 3)
+        centers = (starts + ends) * 0.5
+        half_lengths = (ends - starts) * 0.5
 
-    def draw_instanced(self, camera):
         if camera:
-            camera_pos = ffi.new('float[3]', [camera.position.x, camera.position.y, camera.position.z])
-            set_shader_value(self.shader, self.shader.locs[SHADER_LOC_VECTOR_VIEW], 
-                           camera_pos, SHADER_UNIFORM_VEC3)
- 
-        bullets_by_type = {}
-        for bullet in self.bullets:
-            if not bullet.active:
-                continue
-            
-            if bullet.bullet_type not in bullets_by_type:
-                bullets_by_type[bullet.bullet_type] = []
-            bullets_by_type[bullet.bullet_type].append(bullet)
+            views = centers - (camera.position.x, camera.position.y, camera.position.z)
+        else:
+            views = np.array((0.0, -1.0, 0.0), dtype=np.float32)
+        sides = np.cross(half_lengths, views)
+        lengths = np.linalg.norm(sides, axis=1)
+        sides *= (BULLET_TRAIL_WIDTH / 2 / np.where(lengths > 0, lengths, 1.0))[:, None]
 
-        for bullet_type, type_bullets in bullets_by_type.items():
-            if not type_bullets:
+        trails = self.trails
+        trails.reserve(len(centers))
+        end = trails.set_quads(0, centers, half_lengths, sides, self.trail_colors[self.types[indices]].reshape(-1, 4))
+        trails.draw(end)
+        self.draw_calls += 1
+
+
+    def draw_instanced(self, camera, indices, positions):
+        if camera:
+            self.camera_position[0:3] = [camera.position.x, camera.position.y, camera.position.z]
+            set_shader_value(self.shader, self.shader.locs[SHADER_LOC_VECTOR_VIEW],
+                             self.camera_position, SHADER_UNIFORM_VEC3)
+
+        # bullets sorted by type, so each type's instances are one run of the buffer
+        types = self.types[indices]
+        order = np.argsort(types, kind='stable')
+        counts = np.bincount(types, minlength=len(BULLET_TYPE_NAMES)).tolist()
+        sizes = TYPE_SIZE[types[order]]
+
+        matrices = self.instance_matrices[:len(indices)]
+        matrices[:, 0] = matrices[:, 5] = matrices[:, 10] = sizes
+        matrices[:, [3, 7, 11]] = positions[order]
+
+        start = 0
+        for type_index, bullet_type in enumerate(BULLET_TYPE_NAMES):
+            count = counts[type_index]
+            if count == 0:
                 continue
 
-            transforms = []
-            for bullet in type_bullets:
-                transforms.append(bullet.get_transform_matrix())
-
-            if len(transforms) > 0:
-                try:
-                    transforms_ptr = ffi.new('Matrix[]', transforms)
-                    draw_mesh_instanced(
-                        self.bullet_mesh, 
-                        self.materials[bullet_type], 
-                        transforms_ptr, 
-                        len(transforms)
-                    )
-                except Exception as e:
-                    if DEBUG:
-                        print(f"Instancing failed, falling back to individual drawing: {e}")
-                    self.draw_individual_type(type_bullets, bullet_type)
-
-
-    def draw_individual_type(self, bullets, bullet_type):
-        model = load_model_from_mesh(self.bullet_mesh)
-        for bullet in bullets:
-            if bullet.active:
-                draw_model_ex(
-                    model, 
-                    bullet.position, 
-                    Vector3(0, 1, 0), 
-                    0, 
-                    Vector3(bullet.size, bullet.size, bullet.size), 
-                    bullet.color
+            try:
+                draw_mesh_instanced(
+                    self.bullet_mesh,
+                    self.materials[bullet_type],
+                    self.instance_buffer + start,
+                    count
                 )
-        unload_model(model)
+            except Exception as e:
+                # a driver that fails once keeps failing, so the bullets stay on the batched path
+                print(f"[x] Bullet instancing failed, switching to batched drawing: {e}")
+                self.render_path = "batched"
+                rest = order[start:]
+                self.draw_batched(camera, indices[rest], positions[rest])
+                return
+            self.draw_calls += 1
+            start += count
+
+
+    def draw_batched(self, camera, indices, positions):
+        """
+        Fallback without instancing: every bullet as a coloured quad facing the camera with a
+        white core in front, like the two spheres of a bullet, all in one draw call.
+        """
+        if camera:
+            _, forward, right, up = camera_basis(camera)
+        else:
+            forward, right, up = np.array((0.0, 0.0, -1.0)), np.array((1.0, 0.0, 0.0)), np.array((0.0, 1.0, 0.0))
 
+        types = self.types[indices]
+        radii = TYPE_SIZE[types][:, None] * 0.2
+        core_radii = TYPE_SIZE[types][:, None] * 0.09
 
-    def draw_individual(self):
-        for bullet in self.bullets:
-            if bullet.active:
-                draw_sphere(bullet.position, bullet.size * 0.2, bullet.color)
-                draw_sphere(bullet.position, bullet.size * 0.3 * 0.3, fade(WHITE, 0.8))
+        sprites = self.sprites
+        sprites.reserve(2 * len(indices))
+        end = sprites.set_quads(0, positions, right * radii, up * radii, self.body_colors[types])
+        end = sprites.set_quads(end, positions - forward * 0.01, right * core_radii, up * core_radii, BULLET_CORE_COLOR)
+        sprites.draw(end)
+        self.draw_calls += 1
 
 
     def clear_all(self):
-        self.bullets.clear()
+        self.active[:self.count] = False
+        self.in_use[:self.count] = False
+        self.count = 0
+        self.free_count = 0
+        self.held_slots.clear()
+        self.fired_head = self.fired_tail = 0
 
 
     def get_bullet_count(self):
-        return len([b for b in self.bullets if b.active])
+        return int(np.count_nonzero(self.active[:self.count]))
+
+
+    def get_pool_stats(self):
+        return {
+            "capacity": self.max_bullets,
+            "live": self.get_bullet_count(),
+            "slots_used": self.count - self.free_count,
+            "free": self.free_count + self.max_bullets - self.count,
+            "evictions": self.evictions,
+        }
+
+
+    def get_render_stats(self):
+        """The active drawing path and the draw calls the bullets and trails took at the last draw."""
+        return {"path": self.render_path, "draw_calls": self.draw_calls}
 
 
     def get_bullets_by_type(self, bullet_type):
-        return [b for b in self.bullets if b.bullet_type == bullet_type and b.active]
+        """Indices of the live bullets of one type."""
+        type_index = BULLET_TYPE_INDEX.get(bullet_type, 0)
+        n = self.count
+        return np.flatnonzero(self.active[:n] & (self.types[:n] == type_index))
     
 
     def __del__(self):
         if hasattr(self, 'shader') and self.shader is not None:
             unload_shader(self.shader)
         if hasattr(self, 'bullet_mesh'):
-            unload_mesh(self.bullet_mesh)
\ No newline at end of file
+            unload_mesh(self.bullet_mesh)
+        for quads in (getattr(self, 'trails', None), getattr(self, 'sprites', None)):
+            if quads is not None:
+                quads.unload()
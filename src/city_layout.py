@@ -0,0 +1,297 @@
+from settings import *
+from models import SkyscraperSimple, SkycraperMultipleLayer
+from os import makedirs, replace
+from functools import lru_cache
+import numpy as np
+
+
+# cells of the background grid that can hold a point closer than one cell diagonal to a point
+# in the middle cell; the corners two cells away are already at least that far
+NEIGHBOUR_OFFSETS = [(dz, dx) for dz in range(-2, 3) for dx in range(-2, 3)
+                     if (dz, dx) != (0, 0) and (abs(dz), abs(dx)) != (2, 2)]
+# neighbouring chunks after a chunk in (x, z) order, whose sites win where two chunks' sites clash
+LATER_CHUNKS = [(dx, dz) for dx in (-1, 0, 1) for dz in (-1, 0, 1) if (dx, dz) > (0, 0)]
+PHASES = [(phase_z, phase_x) for phase_z in range(3) for phase_x in range(3)]
+
+
+def poisson_disk_points(bounds, min_distance, rng, exclusion_radius=0.0, rounds=12, target=None, existing=None):
+    """
+    Poisson-disk points in the XZ rectangle bounds = (min_x, min_z, max_x, max_z): no two are
+    closer than `min_distance` and none is within `exclusion_radius` of the world origin.
+    `existing` (M, 2) points, themselves min_distance apart, are kept clear of as well but are
+    not returned.
+
+    As in Bridson's method, the points live in a background grid of min_distance / sqrt(2)
+    cells, each holding at most one point, so a candidate is only checked against the 20 cells
+    around it. Candidates are thrown in phases rather than from an active list, which keeps the
+    work in NumPy: cells three apart on both axes can never conflict, so each of the 9 phases
+    tries one candidate in every empty cell of that phase at once. Each pass over the phases,
+    in a random order every time, spreads points evenly over the whole rectangle; `rounds`
+    passes fill it close to the maximal packing, or sampling stops after the first pass that reaches
+    `target` points.
+
+    Returns an (N, 2) array of (x, z) positions, the same for the same `rng` state.
+    """
+    min_x, min_z, max_x, max_z = bounds
+    cell_size = min_distance / sqrt(2)
+    width = max(int(np.ceil((max_x - min_x) / cell_size)), 1)
+    depth = max(int(np.ceil((max_z - min_z) / cell_size)), 1)
+    pad = 2  # empty border, so the neighbour gathers never leave the grid
+
+    # (z, x) cell -> coordinates of its point, NaN while empty
+    grid_x = np.full((depth + 2 * pad, width + 2 * pad), np.nan)
+    grid_z = np.full((depth + 2 * pad, width + 2 * pad), np.nan)
+    min_distance_sqr = min_distance ** 2
+    fixed = np.zeros(grid_x.shape, dtype=bool)
+    if existing is not None and len(existing):
+        # points further out than the padding are more than min_distance from any new one
+        cells_x = np.floor((existing[:, 0] - min_x) / cell_size).astype(np.int64) + pad
+        cells_z = np.floor((existing[:, 1] - min_z) / cell_size).astype(np.int64) + pad
+        inside = (cells_x >= 0) & (cells_x < grid_x.shape[1]) & (cells_z >= 0) & (cells_z < grid_x.shape[0])
+        grid_x[cells_z[inside], cells_x[inside]] = existing[inside, 0]
+        grid_z[cells_z[inside], cells_x[inside]] = existing[inside, 1]
+        fixed[cells_z[inside], cells_x[inside]] = True
+
+    placed = 0
+    phase_cells = []
+    for phase_z, phase_x in PHASES:
+        cells_z, cells_x = np.meshgrid(np.arange(phase_z, depth, 3), np.arange(phase_x, width, 3), indexing='ij')
+        phase_cells.append((cells_z.ravel() + pad, cells_x.ravel() + pad))
+
+    for _ in range(rounds):
+        for phase in rng.permutation(len(PHASES)).tolist():
+            cells_z, cells_x = phase_cells[phase]
+            empty = np.isnan(grid_x[cells_z, cells_x])
+            cells_z, cells_x = cells_z[empty], cells_x[empty]
+            phase_cells[phase] = (cells_z, cells_x)
+            if len(cells_z) == 0:
+                continue
+
+            offsets = rng.random((2, len(cells_z)))
+            x = (cells_x - pad + offsets[0]) * cell_size + min_x
+            z = (cells_z - pad + offsets[1]) * cell_size + min_z
+
+            valid = (x <= max_x) & (z <= max_z)
+            valid &= x * x + z * z >= exclusion_radius ** 2
+            for dz, dx in NEIGHBOUR_OFFSETS:
+                gap_x = grid_x[cells_z + dz, cells_x + dx] - x
+                gap_z = grid_z[cells_z + dz, cells_x + dx] - z
+                valid &= ~(gap_x * gap_x + gap_z * gap_z < min_distance_sqr)  # NaN for empty cells compares false
+
+            grid_x[cells_z[valid], cells_x[valid]] = x[valid]
+            grid_z[cells_z[valid], cells_x[valid]] = z[valid]
+            placed += int(np.count_nonzero(valid))
+
+        if target is not None and placed >= target:
+            break
+
+    filled = ~np.isnan(grid_x) & ~fixed
+    return np.column_stack([grid_x[filled], grid_z[filled]])
+
+
+CITY_LAYOUT_VERSION = 3  # bump whenever CITY_RECORD or the layout generator changes
+
+# one building of a laid out city, as stored in the cache; layered buildings use all three
+# boxes, simple ones only the first
+CITY_RECORD = np.dtype([
+    ("position", np.float32, 3),
+    ("rotation", np.float32),
+    ("layered", np.bool_),
+    ("box_count", np.uint8),
+    ("box_mins", np.float32, (3, 3)),
+    ("box_maxs", np.float32, (3, 3)),
+])
+
+
+def local_world_boxes(layered, rotation):
+    """World boxes of a building of the type at the origin, turned by `rotation` degrees, as (mins, maxs)."""
+    if layered:
+        boxes = SkycraperMultipleLayer(None, Vector3(0, 0, 0), rotation_angle=rotation).compute_world_bounding_boxes()
+    else:
+        boxes = [SkyscraperSimple(None, Vector3(0, 0, 0), rotation_angle=rotation).compute_world_bounding_box()]
+
+    mins = np.array([(box.min.x, box.min.y, box.min.z) for box in boxes], dtype=np.float32)
+    maxs = np.array([(box.max.x, box.max.y, box.max.z) for box in boxes], dtype=np.float32)
+    return mins, maxs
+
+
+def chunk_bounds(chunk, chunk_size=CITY_CHUNK_SIZE):
+    chunk_x, chunk_z = chunk
+    return chunk_x * chunk_size, chunk_z * chunk_size, (chunk_x + 1) * chunk_size, (chunk_z + 1) * chunk_size
+
+
+def chunk_in_city(chunk, radius, chunk_size=CITY_CHUNK_SIZE):
+    min_x, min_z, max_x, max_z = chunk_bounds(chunk, chunk_size)
+    return max_x > -radius and max_z > -radius and min_x < radius and min_z < radius
+
+
+def record_boxes(records):
+    """Every world box of an array of CITY_RECORD, as (N, 3) mins and maxs."""
+    used = np.arange(3) < records["box_count"][:, None]
+    return np.asarray(records["box_mins"])[used], np.asarray(records["box_maxs"])[used]
+
+
+def chunk_distance(bounds, x, z):
+    """Distance on the XZ plane from (x, z) to the nearest point of a chunk."""
+    min_x, min_z, max_x, max_z = bounds
+    dx = max(min_x - x, 0.0, x - max_x)
+    dz = max(min_z - z, 0.0, z - max_z)
+    return sqrt(dx * dx + dz * dz)
+
+
+def chunks_near(x, z, distance, radius, chunk_size=CITY_CHUNK_SIZE):
+    """Chunks of the city square [-radius, radius]^2 within `distance` of (x, z), nearest first."""
+    city_low = int(np.floor(-radius / chunk_size))
+    city_high = int(np.ceil(radius / chunk_size)) - 1
+    low_x, high_x = max(int((x - distance) // chunk_size), city_low), min(int((x + distance) // chunk_size), city_high)
+    low_z, high_z = max(int((z - distance) // chunk_size), city_low), min(int((z + distance) // chunk_size), city_high)
+
+    chunks = []
+    for chunk_x in range(low_x, high_x + 1):
+        for chunk_z in range(low_z, high_z + 1):
+            gap = chunk_distance(chunk_bounds((chunk_x, chunk_z), chunk_size), x, z)
+            if gap <= distance:
+                chunks.append((gap, (chunk_x, chunk_z)))
+    return [chunk for _, chunk in sorted(chunks)]
+
+
+def city_chunk_bounds(chunk, radius, chunk_size=CITY_CHUNK_SIZE):
+    """The part of a chunk inside the city square [-radius, radius]^2, empty for chunks outside it."""
+    min_x, min_z, max_x, max_z = chunk_bounds(chunk, chunk_size)
+    return max(min_x, -radius), max(min_z, -radius), min(max_x, radius), min(max_z, radius)
+
+
+@lru_cache(maxsize=256)
+def sample_chunk_sites(chunk, count, radius, seed, chunk_size=CITY_CHUNK_SIZE):
+    """
+    The building sites a chunk samples over its whole square on its own, before they are checked
+    against its neighbours' sites, as a read-only (N, 2) array. Kept for the next few chunks,
+    as laying out a chunk needs the sites of the neighbours next to it.
+    """
+    min_x, min_z, max_x, max_z = city_chunk_bounds(chunk, radius, chunk_size)
+    target = int(round(count * max(max_x - min_x, 0) * max(max_z - min_z, 0) / (2 * radius) ** 2))
+
+    # chunk coordinates can be negative, the seed sequence only takes non-negative entropy
+    rng = np.random.default_rng([seed, chunk[0] + 2 ** 31, chunk[1] + 2 ** 31])
+    sites = np.zeros((0, 2))
+    if target > 0:
+        sites = poisson_disk_points((min_x, min_z, max_x, max_z), MIN_BUILDING_DISTANCE, rng,
+                                    MIN_DISTANCE_FROM_CENTER, target=target)
+    if len(sites) < target:
+        print(f"[WARNING]: Only {len(sites)} of {target} buildings fit {MIN_BUILDING_DISTANCE}m apart in chunk {chunk}.")
+
+    sites = sites[rng.permutation(len(sites))[:target]]
+    sites.flags.writeable = False
+    return sites
+
+
+def edge_distances(sites, bounds):
+    """Distance of each (x, z) site to the nearest edge of the rectangle bounds it lies in."""
+    min_x, min_z, max_x, max_z = bounds
+    return np.minimum.reduce([sites[:, 0] - min_x, sites[:, 1] - min_z, max_x - sites[:, 0], max_z - sites[:, 1]])
+
+
+def generate_chunk_layout(chunk, count, radius, seed, chunk_size=CITY_CHUNK_SIZE):
+    """
+    Lays out one chunk of a city of `count` buildings in the square [-radius, radius]^2 as an
+    array of CITY_RECORD. The chunk gets the city's density over its part of the square, and
+    the same seed and chunk always give the same buildings.
+
+    Each chunk samples its whole square on its own, then drops its sites closer than
+    MIN_BUILDING_DISTANCE to those sampled by a neighbour after it in (x, z) order, so every
+    clash across an edge loses one site whichever chunk is laid out first. The dropped sites
+    are sampled again away from the edges of the earlier neighbours, which did not see them,
+    so streets between chunks are no wider than inside them and the chunk keeps its density.
+    """
+    sites = sample_chunk_sites(chunk, count, radius, seed, chunk_size)
+    bounds = chunk_bounds(chunk, chunk_size)
+    near_edge = np.flatnonzero(edge_distances(sites, bounds) < MIN_BUILDING_DISTANCE)
+
+    keep = np.ones(len(sites), dtype=bool)
+    later_sites = []
+    for dx, dz in LATER_CHUNKS:
+        neighbour = (chunk[0] + dx, chunk[1] + dz)
+        if len(near_edge) == 0 or not chunk_in_city(neighbour, radius, chunk_size):
+            continue
+
+        others = sample_chunk_sites(neighbour, count, radius, seed, chunk_size)
+        gaps = others - np.clip(others, bounds[:2], bounds[2:])
+        others = others[np.hypot(gaps[:, 0], gaps[:, 1]) < MIN_BUILDING_DISTANCE]
+        if len(others) == 0:
+            continue
+
+        offsets = sites[near_edge][:, None, :] - others[None, :, :]
+        clashes = np.any(np.einsum('ijk,ijk->ij', offsets, offsets) < MIN_BUILDING_DISTANCE ** 2, axis=1)
+        keep[near_edge[clashes]] = False
+        later_sites.append(others)
+
+    dropped = len(sites) - int(np.count_nonzero(keep))
+    sites = sites[keep]
+    if dropped:
+        rng = np.random.default_rng([seed, chunk[0] + 2 ** 31, chunk[1] + 2 ** 31, 2])
+        min_x, min_z, max_x, max_z = city_chunk_bounds(chunk, radius, chunk_size)
+        existing = np.concatenate([sites] + later_sites)
+        refill = poisson_disk_points((min_x + MIN_BUILDING_DISTANCE, min_z + MIN_BUILDING_DISTANCE, max_x, max_z),
+                                     MIN_BUILDING_DISTANCE, rng, MIN_DISTANCE_FROM_CENTER, target=dropped,
+                                     existing=existing)
+        # sites of two later neighbours can clash with each other and share a cell of the sampler
+        offsets = refill[:, None, :] - existing[None, :, :]
+        refill = refill[np.all(np.einsum('ijk,ijk->ij', offsets, offsets) >= MIN_BUILDING_DISTANCE ** 2, axis=1)]
+        sites = np.concatenate([sites, refill[rng.permutation(len(refill))[:dropped]]])
+
+    rng = np.random.default_rng([seed, chunk[0] + 2 ** 31, chunk[1] + 2 ** 31, 1])
+    records = np.zeros(len(sites), dtype=CITY_RECORD)
+    records["rotation"] = rng.integers(0, 4, len(sites)) * 90
+    records["layered"] = rng.random(len(sites)) < 0.4
+    records["position"][:, 0] = sites[:, 0]
+    records["position"][:, 1] = np.where(records["layered"], -10.0, -14.8)
+    records["position"][:, 2] = sites[:, 1]
+
+    # buildings only differ by type, rotation and position, so each type and rotation is
+    # transformed once and its boxes are moved to every site
+    for layered in (False, True):
+        for rotation in np.unique(records["rotation"]).tolist():
+            rows = np.flatnonzero((records["layered"] == layered) & (records["rotation"] == rotation))
+            if len(rows) == 0:
+                continue
+
+            mins, maxs = local_world_boxes(layered, rotation)
+            offsets = records["position"][rows][:, None, :]
+            records["box_count"][rows] = len(mins)
+            records["box_mins"][rows, :len(mins)] = mins + offsets
+            records["box_maxs"][rows, :len(maxs)] = maxs + offsets
+
+    return records
+
+
+def chunk_cache_path(chunk, count, radius, seed, chunk_size=CITY_CHUNK_SIZE):
+    return join(CITY_CACHE_DIR, f"city_v{CITY_LAYOUT_VERSION}_{seed}_{count}_{radius:g}_{chunk_size:g}_"
+                                f"{MIN_BUILDING_DISTANCE:g}_{MIN_DISTANCE_FROM_CENTER:g}_{chunk[0]}_{chunk[1]}.npy")
+
+
+def load_chunk_layout(chunk, count, radius, seed, chunk_size=CITY_CHUNK_SIZE):
+    """
+    Returns (records, cached): the chunk's layout, memory-mapped from the city cache when it
+    has been laid out before, otherwise generated and written to the cache.
+    """
+    path = chunk_cache_path(chunk, count, radius, seed, chunk_size)
+    if exists(path):
+        try:
+            records = np.load(path, mmap_mode='r')
+            if records.dtype == CITY_RECORD:
+                return records, True
+            print(f"[WARNING]: Ignoring the city cache {path}, it has an unknown record layout.")
+        except (OSError, ValueError) as e:
+            print(f"[WARNING]: Could not read the city cache {path}: {e}")
+
+    records = generate_chunk_layout(chunk, count, radius, seed, chunk_size)
+    try:
+        makedirs(CITY_CACHE_DIR, exist_ok=True)
+        # written next to the cache and renamed, so a reader never sees half a file
+        with open(path + ".tmp", 'wb') as f:
+            np.save(f, records)
+        replace(path + ".tmp", path)
+    except OSError as e:
+        print(f"[WARNING]: Could not write the city cache {path}: {e}")
+
+    return records, False
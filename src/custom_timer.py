@@ -1,15 +1,67 @@
 from settings import *
+from heapq import heappush, heappop
+
+
+class TimerScheduler:
+    """
+    Deadline heap shared by every Timer on one clock.
+
+    advance() is called once per tick with the clock's new time and only touches the timers
+    whose deadline has passed, so the cost follows expirations rather than the number of timers.
+    Restarting or deactivating a timer leaves its old entry behind, skipped when it comes due.
+    """
+
+    def __init__(self, time=0.0):
+        self.time = time
+        self.heap = []
+        self.serial = 0  # tie-breaker, keeps equal deadlines from comparing the timers
+
+    def reset(self, time=0.0):
+        """Restarts the clock at `time`, stopping every timer still waiting on it, repeating ones included."""
+        self.time = time
+        for _, _, timer, generation in self.heap:
+            if timer.generation == generation:
+                timer.active = False
+                timer.start_time = 0
+                timer.generation += 1
+        self.heap.clear()
+
+    def schedule(self, timer):
+        self.serial += 1
+        heappush(self.heap, (timer.start_time + timer.duration, self.serial, timer, timer.generation))
+
+    def advance(self, time):
+        self.time = time
+        heap = self.heap
+        # entries pushed by repeating timers during this call wait for the next one
+        last_serial = self.serial
+        while heap and heap[0][0] <= time and heap[0][1] <= last_serial:
+            _, _, timer, generation = heappop(heap)
+            if timer.active and timer.generation == generation:
+                timer.expire()
+
+
+# the simulation clock, advanced by Simulation.step(), and the real-time clock of the window and audio
+sim_timers = TimerScheduler()
+ui_timers = TimerScheduler()
+
+
+def now():
+    """Current simulation time."""
+    return sim_timers.time
 
 
 class Timer:
     """Custom timer for raylib by: https://github.com/clear-code-projects"""
 
-    def __init__(self, duration: int, repeat=False, autostart=False, func=None):
+    def __init__(self, duration: int, repeat=False, autostart=False, func=None, scheduler=None):
         self.duration = duration
         self.start_time = 0
         self.active = False
         self.repeat = repeat
         self.func = func
+        self.scheduler = scheduler or sim_timers
+        self.generation = 0  # bumped on every start and stop, so older heap entries are ignored
 
         if autostart:
             self.activate()
@@ -19,17 +71,23 @@ class Timer:
 
     def activate(self):
         self.active = True
-        self.start_time = get_time()
+        self.start_time = self.scheduler.time
+        self.generation += 1
+        self.scheduler.schedule(self)
 
     def deactivate(self):
         self.active = False
         self.start_time = 0
+        self.generation += 1
         if self.repeat:
             self.activate()
 
-    def update(self):
-        if self.active:
-            if get_time() - self.start_time >= self.duration:
-                if self.func and self.start_time:
-                    self.func()
-                self.deactivate()
\ No newline at end of file
+    def expire(self):
+        if self.func:
+            self.func()
+        self.deactivate()
+
+    def remaining(self):
+        if not self.active:
+            return 0.0
+        return max(self.start_time + self.duration - self.scheduler.time, 0.0)
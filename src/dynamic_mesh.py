@@ -0,0 +1,84 @@
+from settings import *
+import numpy as np
+
+
+MAX_QUADS = 65536 // 4  # the mesh indices are 16 bit
+
+
+class DynamicQuadMesh:
+    """
+    A mesh of coloured quads rewritten every frame, for overlays drawn in one call.
+
+    `vertices` (capacity, 4, 3) and `colors` (capacity, 4, 4) are NumPy views of the mesh's
+    own CPU buffers: callers fill the first quads, and draw() uploads only those into the
+    dynamic vertex buffers and draws them with the default shader and its vertex colours.
+    """
+
+    def __init__(self, capacity=256):
+        self.capacity = 0
+        self.mesh = None
+        self.material = load_material_default()
+        self.reserve(capacity)
+
+    def reserve(self, count):
+        """Makes room for `count` quads, regrowing the buffers and dropping their contents if needed."""
+        if count <= self.capacity or self.capacity == MAX_QUADS:
+            return
+
+        capacity = min(max(count, 2 * self.capacity), MAX_QUADS)
+        self.unload()
+        mesh = ffi.new('Mesh *')
+        mesh.vertexCount = capacity * 4
+        mesh.triangleCount = capacity * 2
+        mesh.vertices = ffi.cast('float *', mem_alloc(capacity * 4 * 3 * 4))
+        mesh.colors = ffi.cast('unsigned char *', mem_alloc(capacity * 4 * 4))
+        mesh.indices = ffi.cast('unsigned short *', mem_alloc(capacity * 6 * 2))
+
+        self.vertices = np.frombuffer(ffi.buffer(mesh.vertices, capacity * 4 * 3 * 4), dtype=np.float32).reshape(capacity, 4, 3)
+        self.colors = np.frombuffer(ffi.buffer(mesh.colors, capacity * 4 * 4), dtype=np.uint8).reshape(capacity, 4, 4)
+        indices = np.frombuffer(ffi.buffer(mesh.indices, capacity * 6 * 2), dtype=np.uint16).reshape(capacity, 6)
+        indices[:] = np.arange(capacity, dtype=np.uint16)[:, None] * 4 + np.array([0, 1, 2, 0, 2, 3], dtype=np.uint16)
+
+        upload_mesh(mesh, True)
+        self.mesh = mesh
+        self.capacity = capacity
+
+    def set_quads(self, start, centers, half_rights, half_ups, colors):
+        """
+        Writes quads from `start` on: each spans centre +- half_right +- half_up, with one RGBA
+        colour. Any argument can be a single row shared by every quad. Returns the next free quad.
+        """
+        count = len(centers)
+        end = min(start + count, self.capacity)
+        centers = np.broadcast_to(centers, (count, 3))[:end - start]
+        half_rights = np.broadcast_to(half_rights, (count, 3))[:end - start]
+        half_ups = np.broadcast_to(half_ups, (count, 3))[:end - start]
+
+        quads = self.vertices[start:end]
+        quads[:, 0] = centers - half_rights - half_ups
+        quads[:, 1] = centers + half_rights - half_ups
+        quads[:, 2] = centers + half_rights + half_ups
+        quads[:, 3] = centers - half_rights + half_ups
+        self.colors[start:end] = np.broadcast_to(colors, (count, 4))[:end - start, None, :]
+        return end
+
+    def draw(self, count):
+        count = min(count, self.capacity)
+        if count == 0:
+            return
+
+        mesh = self.mesh
+        update_mesh_buffer(mesh[0], 0, mesh.vertices, count * 4 * 3 * 4, 0)
+        update_mesh_buffer(mesh[0], 3, mesh.colors, count * 4 * 4, 0)
+        mesh.triangleCount = count * 2
+
+        # the quads face whichever way they were built, so both sides are drawn
+        rl_disable_backface_culling()
+        draw_mesh(mesh[0], self.material, matrix_identity())
+        rl_enable_backface_culling()
+
+    def unload(self):
+        if self.mesh is not None:
+            unload_mesh(self.mesh[0])
+            self.mesh = None
+            self.capacity = 0
@@ -1,7 +1,15 @@
 from settings import *
 
-from models import Model
+from models import Model, interpolate_transform
+from custom_timer import now
+from spatial_grid import DynamicSpatialHash
+from render_lod import RENDER_LOD_TIERS, FULL, IMPOSTOR, select_lod_tiers, make_box_impostor, model_triangles
+from dynamic_mesh import DynamicQuadMesh
+from profiler import profiler
+import numpy as np
 import random
+from time import perf_counter
+from types import MappingProxyType
 
 
 class AIState(Enum):
@@ -23,103 +31,350 @@ class ManeuverType(Enum):
     SPLIT_S = "split_s"
 
 
-class Enemy(Model):
-    """AI enemy aircraft#"""
+# states and maneuvers are stored as small ints in the enemy arrays
+AI_STATES = list(AIState)
+AI_STATE_INDEX = {state: i for i, state in enumerate(AI_STATES)}
+PATROL, CHASE, ATTACK, EVADE, RETREAT, EMERGENCY = (AI_STATE_INDEX[state] for state in AIState)
+SHOOTING_STATES = np.array([ATTACK, CHASE, PATROL, EVADE], dtype=np.int8)
+
+MANEUVERS = list(ManeuverType)
+MANEUVER_INDEX = {maneuver: i for i, maneuver in enumerate(MANEUVERS)}
+ATTACK_MANEUVERS = [ManeuverType.CIRCLE_LEFT, ManeuverType.CIRCLE_RIGHT, ManeuverType.CLIMB, ManeuverType.DIVE]
+EVASIVE_MANEUVERS = [ManeuverType.BARREL_ROLL, ManeuverType.SPLIT_S, ManeuverType.CLIMB, ManeuverType.CIRCLE_LEFT]
+
+# steering offset and target roll of every maneuver, NaN keeps the current roll;
+# circles and the barrel roll change over time and are filled in by maneuver_steering()
+MANEUVER_OFFSETS = np.array([(0.0, 0.0, 1.0), (0.0, 0.0, 0.0), (0.0, 0.0, 0.0), (0.0, 0.7, 0.3),
+                             (0.0, -0.3, 0.7), (0.0, 0.0, 1.0), (0.0, -0.5, 0.5)], dtype=np.float32)
+MANEUVER_ROLLS = np.array([np.nan, -25.0, 25.0, 0.0, 0.0, 0.0, 90.0], dtype=np.float32)
+
+AI_LOD_TIERS = ("near", "mid", "far")
+NEAR, MID, FAR = range(len(AI_LOD_TIERS))
+LOD_STEER_INTERVALS = np.array(AI_LOD_STEER_INTERVALS, dtype=np.int64)
+
+# health bar and AI state marker colours, also as RGBA rows for the batched markers
+AI_STATE_COLORS = {
+    AIState.PATROL: GREEN,
+    AIState.CHASE: YELLOW,
+    AIState.ATTACK: RED,
+    AIState.EVADE: PURPLE,
+    AIState.RETREAT: BLUE,
+    AIState.EMERGENCY: ORANGE
+}
+STATE_MARKER_COLORS = np.array([AI_STATE_COLORS[state] for state in AI_STATES], dtype=np.uint8)
+HEALTH_BAR_COLORS = np.array([RED, YELLOW, GREEN], dtype=np.uint8)  # at most 30%, 60% and above
+HEALTH_BAR_BACKGROUND = np.array((50, 50, 50, 200), dtype=np.uint8)
+
+RETREAT_POINT = np.array((0.0, 60.0, 0.0), dtype=np.float32)
+ENEMY_BOX_MIN = np.array((-4.0, -2.0, -6.0), dtype=np.float32)
+ENEMY_BOX_MAX = np.array((4.0, 2.0, 6.0), dtype=np.float32)
+# every enemy shares this box, it is never changed in place
+ENEMY_COLLISION_BOX = BoundingBox(Vector3(*ENEMY_BOX_MIN.tolist()), Vector3(*ENEMY_BOX_MAX.tolist()))
+
+# per-type stats, read-only and shared by every enemy of the type
+ENEMY_CONFIGS = MappingProxyType({
+    "fighter": MappingProxyType({
+        "max_speed": 25.0, "acceleration": 9.0, "max_health": 120,
+        "aggressiveness": 0.9, "skill_level": 0.7,
+        "bullet_type": "normal", "shoot_cooldown": 0.8,
+        "burst_count": 3, "burst_delay": 0.2, "score_value": 100
+    }),
+    "interceptor": MappingProxyType({
+        "max_speed": 32.0, "acceleration": 14.0, "max_health": 80,
+        "aggressiveness": 1.0, "skill_level": 0.8,
+        "bullet_type": "rapid", "shoot_cooldown": 1.2,
+        "burst_count": 6, "burst_delay": 0.1, "score_value": 150
+    }),
+    "bomber": MappingProxyType({
+        "max_speed": 18.0, "acceleration": 6.0, "max_health": 250,
+        "aggressiveness": 0.6, "skill_level": 0.5,
+        "bullet_type": "heavy", "shoot_cooldown": 1.5,
+        "burst_count": 1, "burst_delay": 0.0, "score_value": 200
+    })
+})
+
+
+def normalize_rows(vectors):
+    """Row-wise vector3_normalize: zero-length rows stay zero."""
+    lengths = np.sqrt(np.einsum('ij,ij->i', vectors, vectors))
+    return vectors / np.where(lengths > 0, lengths, 1.0)[:, None]
+
+
+def rotate_rows(vectors, axes, angles):
+    """Row-wise vector3_rotate_by_axis_angle around unit axes."""
+    c = np.cos(angles)[:, None]
+    s = np.sin(angles)[:, None]
+    along = np.einsum('ij,ij->i', axes, vectors)[:, None]
+    return vectors * c + np.cross(axes, vectors) * s + axes * along * (1.0 - c)
+
+
+def maneuver_steering(maneuvers, starts, time):
+    """Returns (offsets, target rolls) of each maneuver at `time`, rolls are NaN where the roll is left alone."""
+    offsets = MANEUVER_OFFSETS[maneuvers]
+    rolls = MANEUVER_ROLLS[maneuvers]
+
+    for maneuver, turn_rate in ((ManeuverType.CIRCLE_LEFT, 1.5), (ManeuverType.CIRCLE_RIGHT, -1.5)):
+        circling = maneuvers == MANEUVER_INDEX[maneuver]
+        angle = time * turn_rate
+        offsets[circling] = (cos(angle) * 0.8, 0.0, sin(angle) * 0.8)
+
+    rolling = maneuvers == MANEUVER_INDEX[ManeuverType.BARREL_ROLL]
+    roll_progress = np.sin((time - starts[rolling]) * 2.0)
+    offsets[rolling, 0] = roll_progress * 0.2
+    rolls[rolling] = roll_progress * 90
+    return offsets, rolls
+
+
+class EnemyArrays:
+    """
+    Structure of arrays with the flight state of every enemy, one row per enemy.
+
+    Rows [0, count) are packed and removal moves the last row into the hole, like the bullets
+    in BulletManager. An Enemy reads and writes its own row through properties, so the
+    batched passes in EnemyManager and the per-enemy code see the same state.
+    """
+
+    FIELDS = {
+        "positions": ((3,), np.float32),
+        "previous_positions": ((3,), np.float32),
+        "velocities": ((3,), np.float32),
+        "directions": ((3,), np.float32),
+        "patrol_centers": ((3,), np.float32),
+        "last_player_positions": ((3,), np.float32),
+        "bases": ((3, 3), np.float32),  # rotation columns: rolled right, rolled up, backward
+        "previous_bases": ((3, 3), np.float32),
+        "roll_angles": ((), np.float32),
+        "target_rolls": ((), np.float32),
+        "stress": ((), np.float32),
+        "healths": ((), np.float32),
+        "max_healths": ((), np.float32),
+        "max_speeds": ((), np.float32),
+        "accelerations": ((), np.float32),
+        "skill_levels": ((), np.float32),
+        "boost_times": ((), np.float32),
+        "boosting": ((), bool),
+        "in_burst": ((), bool),
+        "states": ((), np.int8),
+        "maneuvers": ((), np.int8),
+        "maneuver_starts": ((), np.float64),
+        "maneuver_ends": ((), np.float64),
+        "decision_times": ((), np.float64),
+        "cooldown_ends": ((), np.float64),
+        "lod_tiers": ((), np.int8),
+        "render_lods": ((), np.int8),  # render LOD tier at the last draw, kept for the hysteresis
+        "models": ((), np.int8),  # index of the enemy's model in EnemyManager.available_models, -1 for none
+        "keys": ((), np.int64),  # serial of the enemy's spawn, used as its box key in the bullet sweep
+    }
+
+    def __init__(self, capacity=32):
+        self.count = 0
+        self.capacity = 0
+        self._resize(capacity)
+
+    def _resize(self, capacity):
+        for name, (shape, dtype) in self.FIELDS.items():
+            array = np.zeros((capacity,) + shape, dtype=dtype)
+            if self.capacity:
+                array[:self.count] = getattr(self, name)[:self.count]
+            setattr(self, name, array)
+        self.capacity = capacity
+
+    def add(self, key):
+        if self.count >= self.capacity:
+            self._resize(self.capacity * 2)
+
+        row = self.count
+        for name in self.FIELDS:
+            getattr(self, name)[row] = 0
+        self.bases[row] = np.eye(3)
+        self.previous_bases[row] = np.eye(3)
+        self.keys[row] = key
+        self.count += 1
+        return row
+
+    def remove(self, row):
+        last = self.count - 1
+        if row != last:
+            for name in self.FIELDS:
+                array = getattr(self, name)
+                array[row] = array[last]
+        self.count = last
+
+    def clear(self):
+        self.count = 0
+
+    def interpolated_transforms(self, alpha):
+        """
+        Transforms of every row between the last two steps, as (count, 16) float32 laid out like
+        Matrix. The blended rotation is re-orthonormalized, close to the slerp of
+        interpolate_transform for the turn of a single step.
+        """
+        n = self.count
+        alpha = np.float32(min(alpha, 1.0))
+        bases = self.previous_bases[:n] + (self.bases[:n] - self.previous_bases[:n]) * alpha
+        backward = normalize_rows(bases[:, :, 2])
+        right = normalize_rows(np.cross(bases[:, :, 1], backward))
+
+        matrices = np.zeros((n, 4, 4), dtype=np.float32)
+        matrices[:, :3, 0] = right
+        matrices[:, :3, 1] = np.cross(backward, right)
+        matrices[:, :3, 2] = backward
+        matrices[:, :3, 3] = self.previous_positions[:n] + (self.positions[:n] - self.previous_positions[:n]) * alpha
+        matrices[:, 3, 3] = 1.0
+        return matrices.reshape(n, 16)
+
+    def get_transform(self, row, previous=False):
+        bases = self.previous_bases if previous else self.bases
+        positions = self.previous_positions if previous else self.positions
+        (a, b, c), (d, e, f), (g, h, i) = bases[row].tolist()
+        x, y, z = positions[row].tolist()
+        return Matrix(a, b, c, x,
+                      d, e, f, y,
+                      g, h, i, z,
+                      0.0, 0.0, 0.0, 1.0)
+
+
+def _row_vector(field):
+    def get(self):
+        x, y, z = getattr(self.arrays, field)[self.row].tolist()
+        return Vector3(x, y, z)
+
+    def set(self, value):
+        getattr(self.arrays, field)[self.row] = (value.x, value.y, value.z)
+
+    return property(get, set)
+
+
+def _row_value(field, cast=float):
+    def get(self):
+        return cast(getattr(self.arrays, field)[self.row])
+
+    def set(self, value):
+        getattr(self.arrays, field)[self.row] = value
+
+    return property(get, set)
+
+
+def _row_enum(field, members, index):
+    def get(self):
+        return members[getattr(self.arrays, field)[self.row]]
+
+    def set(self, value):
+        getattr(self.arrays, field)[self.row] = index[value]
+
+    return property(get, set)
+
 
-    def __init__(self, model, position, enemy_type="fighter"):
+class Enemy(Model):
+    """AI enemy aircraft, its flight state lives in a row of the EnemyManager arrays"""
+
+    # flight and behaviour constants shared by every enemy, read by the batched passes
+    drag = 0.7
+    max_boost_time = 4.0
+    boost_speed_multiplier = 1.6
+    boost_recharge_rate = 0.8
+    boost_depletion_rate = 1.2
+    roll_speed = 2.0
+    maneuver_duration = 4.0
+    decision_interval = 0.5
+    patrol_radius = 200.0
+    safe_altitude_min = 20.0
+    safe_altitude_max = 120.0
+    detection_range = 500.0
+    attack_range = 250.0
+    retreat_threshold = 0.3
+    max_stress = 100.0
+    avoidance_range = 100.0
+    emergency_avoidance_range = 50.0
+
+    position = _row_vector("positions")
+    velocity = _row_vector("velocities")
+    target_direction = _row_vector("directions")
+    patrol_center = _row_vector("patrol_centers")
+    last_player_position = _row_vector("last_player_positions")
+    roll_angle = _row_value("roll_angles")
+    target_roll = _row_value("target_rolls")
+    stress_level = _row_value("stress")
+    health = _row_value("healths")
+    max_health = _row_value("max_healths")
+    max_speed = _row_value("max_speeds")
+    acceleration = _row_value("accelerations")
+    skill_level = _row_value("skill_levels")
+    current_boost_time = _row_value("boost_times")
+    is_boosting = _row_value("boosting", bool)
+    is_in_burst = _row_value("in_burst", bool)
+    ai_state = _row_enum("states", AI_STATES, AI_STATE_INDEX)
+    current_maneuver = _row_enum("maneuvers", MANEUVERS, MANEUVER_INDEX)
+
+    def __init__(self, model, position, enemy_type="fighter", arrays=None, serial=1):
+        self.serial = serial  # unique to this spawn, so its bullets never count as a recycled enemy's
+        self.arrays = arrays if arrays is not None else EnemyArrays(1)
+        self.row = self.arrays.add(serial)
         super().__init__(model, speed=20, position=position)
-        self.transform = matrix_identity()
-
-        self.enemy_configs = {
-            "fighter": {
-                "max_speed": 25.0, "acceleration": 9.0, "max_health": 120,
-                "aggressiveness": 0.9, "skill_level": 0.7,
-                "bullet_type": "normal", "shoot_cooldown": 0.8,
-                "burst_count": 3, "burst_delay": 0.2, "score_value": 100
-            },
-            "interceptor": {
-                "max_speed": 32.0, "acceleration": 14.0, "max_health": 80,
-                "aggressiveness": 1.0, "skill_level": 0.8,
-                "bullet_type": "rapid", "shoot_cooldown": 1.2,
-                "burst_count": 6, "burst_delay": 0.1, "score_value": 150
-            },
-            "bomber": {
-                "max_speed": 18.0, "acceleration": 6.0, "max_health": 250,
-                "aggressiveness": 0.6, "skill_level": 0.5,
-                "bullet_type": "heavy", "shoot_cooldown": 1.5,
-                "burst_count": 1, "burst_delay": 0.0, "score_value": 200
-            }
-        }
+        self.collision_box = ENEMY_COLLISION_BOX
+
+        self.shoot_cooldown = Timer(0.0)
+        self.burst_timer = Timer(0.0)
+        self.state_timer = Timer(2.0)
+        self.reset(model, position, enemy_type)
 
-        config = self.enemy_configs.get(enemy_type, self.enemy_configs["fighter"])
+
+    def reset(self, model, position, enemy_type="fighter"):
+        """Sets up the enemy's row and timers as freshly spawned, in place so recycled enemies allocate nothing"""
+        config = ENEMY_CONFIGS.get(enemy_type, ENEMY_CONFIGS["fighter"])
+        arrays, row = self.arrays, self.row
+
+        self.model = model
+        arrays.positions[row] = (position.x, position.y, position.z)
+        arrays.previous_positions[row] = arrays.positions[row]
+        arrays.patrol_centers[row] = arrays.positions[row]
+        arrays.directions[row] = (0.0, 0.0, 1.0)
 
         self.enemy_type = enemy_type
-        self.max_speed = config["max_speed"]
-        self.acceleration = config["acceleration"]
-        self.max_health = config["max_health"]
-        self.health = self.max_health
+        arrays.max_speeds[row] = config["max_speed"]
+        arrays.accelerations[row] = config["acceleration"]
+        arrays.max_healths[row] = config["max_health"]
+        arrays.healths[row] = config["max_health"]
+        arrays.skill_levels[row] = config["skill_level"]
         self.aggressiveness = config["aggressiveness"]
-        self.skill_level = config["skill_level"]
         self.bullet_type = config["bullet_type"]
-        self.shoot_cooldown = Timer(config["shoot_cooldown"])
         self.score_value = config["score_value"]
 
         self.burst_count = config["burst_count"]
         self.burst_delay = config["burst_delay"]
-        self.is_in_burst = False
         self.shots_in_burst_left = 0
-        self.burst_timer = Timer(self.burst_delay)
+        self.shoot_cooldown.duration = config["shoot_cooldown"]
+        self.burst_timer.duration = self.burst_delay
+        self.shoot_cooldown.deactivate()
+        self.burst_timer.deactivate()
+        self.state_timer.deactivate()
+
+        arrays.states[row] = PATROL
+        arrays.maneuvers[row] = MANEUVER_INDEX[ManeuverType.STRAIGHT]
+        arrays.boost_times[row] = self.max_boost_time
+        self.player_threat_level = 0.0
 
-        self.velocity = Vector3(0, 0, 0)
-        self.target_direction = Vector3(0, 0, 1)
-        self.drag = 0.7
 
-        self.ai_state = AIState.PATROL
-        self.state_timer = Timer(2.0)
-        self.decision_timer = Timer(0.5)
-
-        self.is_boosting = False
-        self.max_boost_time = 4.0
-        self.current_boost_time = self.max_boost_time
-        self.boost_speed_multiplier = 1.6
-        self.boost_recharge_rate = 0.8
-        self.boost_depletion_rate = 1.2
-
-        self.current_maneuver = ManeuverType.STRAIGHT
-        self.maneuver_timer = Timer(4.0)
-        self.maneuver_intensity = 1.0
-        self.roll_angle = 0.0
-        self.target_roll = 0.0
-        self.roll_speed = 2.0
-
-        self.avoidance_vector = Vector3(0, 0, 0)
-        self.target_position = Vector3(0, 0, 0)
-        self.patrol_center = Vector3(position.x, position.y, position.z)
-        self.patrol_radius = 200.0
-        self.safe_altitude_min = 20.0
-        self.safe_altitude_max = 120.0
+    @property
+    def transform(self):
+        return self.arrays.get_transform(self.row)
 
-        self.player_threat_level = 0.0
-        self.last_player_position = Vector3(0, 0, 0)
-        self.detection_range = 500.0
-        self.attack_range = 250.0
-        self.retreat_threshold = 0.3
 
-        self.stress_level = 0.0
-        self.max_stress = 100.0
+    @property
+    def previous_transform(self):
+        return self.arrays.get_transform(self.row, previous=True)
 
-        self.collision_box = BoundingBox(
-            Vector3(-4.0, -2.0, -6.0),
-            Vector3(4.0, 2.0, 6.0)
-        )
-        self.avoidance_range = 100.0
-        self.emergency_avoidance_range = 50.0
+
+    def get_world_bounding_box(self):
+        # enemies never turn their collision box, so it only moves with the position
+        x, y, z = self.arrays.positions[self.row].tolist()
+        box = self.collision_box
+        return BoundingBox(Vector3(x + box.min.x, y + box.min.y, z + box.min.z),
+                           Vector3(x + box.max.x, y + box.max.y, z + box.max.z))
 
 
     def take_damage(self, amount):
-        self.health -= amount
-        if self.health < 0:
-            self.health = 0
+        self.health = max(self.health - amount, 0)
 
         stress_increase = amount * 2.0
         self.stress_level = min(self.stress_level + stress_increase, self.max_stress)
@@ -129,131 +384,56 @@ class Enemy(Model):
             self.state_timer.activate()
 
 
-    def update_ai_state(self, player_position, dt):
-        self.decision_timer.update()
-        self.state_timer.update()
-
-        if not self.decision_timer:
-            distance_to_player = vector3_distance(self.position, player_position)
-            health_ratio = self.health / self.max_health
+    def update_ai_state(self, player_position, dt, city_radius=CITY_RADIUS):
+        """Re-evaluates the AI state, called by EnemyManager each time this enemy's decision comes due."""
 
-            self.assess_threats(player_position, distance_to_player)
-
-            if health_ratio < self.retreat_threshold or self.stress_level > 80:
-                self.ai_state = AIState.RETREAT
-            elif distance_to_player < self.attack_range and self.player_threat_level > 0.3:
-                self.ai_state = AIState.ATTACK
-            elif distance_to_player < self.detection_range and self.player_threat_level > 0.1:
-                self.ai_state = AIState.CHASE
-            elif self.ai_state == AIState.ATTACK and distance_to_player > self.attack_range * 1.5:
-                self.ai_state = AIState.CHASE
-            elif not self.state_timer:
-                if random.random() < 0.3:
-                    self.ai_state = random.choice([AIState.PATROL, AIState.EVADE])
-                    self.state_timer.activate()
-
-            self.decision_timer.activate()
+        distance_to_player = vector3_distance(self.position, player_position)
+        health_ratio = self.health / self.max_health
 
+        self.assess_threats(player_position, distance_to_player, dt, city_radius)
 
-    def assess_threats(self, player_position, distance_to_player):
+        if health_ratio < self.retreat_threshold or self.stress_level > 80:
+            self.ai_state = AIState.RETREAT
+        elif distance_to_player < self.attack_range and self.player_threat_level > 0.3:
+            self.ai_state = AIState.ATTACK
+        elif distance_to_player < self.detection_range and self.player_threat_level > 0.1:
+            self.ai_state = AIState.CHASE
+        elif self.ai_state == AIState.ATTACK and distance_to_player > self.attack_range * 1.5:
+            self.ai_state = AIState.CHASE
+        elif not self.state_timer:
+            if random.random() < 0.3:
+                self.ai_state = random.choice([AIState.PATROL, AIState.EVADE])
+                self.state_timer.activate()
+
+
+    def assess_threats(self, player_position, distance_to_player, dt, city_radius=CITY_RADIUS):
         if distance_to_player < self.detection_range:
             distance_threat = 1.0 - (distance_to_player / self.detection_range)
             self.player_threat_level = distance_threat * self.aggressiveness
         else:
             self.player_threat_level *= 0.9
 
-        if self.position.y < self.safe_altitude_min + 10:
-            self.stress_level += 20 * get_frame_time()
-
-        boundary_distance = sqrt(self.position.x ** 2 + self.position.z ** 2)
-        if boundary_distance > CITY_RADIUS - 100:
-            self.stress_level += 15 * get_frame_time()
-
-        self.stress_level = max(0, self.stress_level - 5 * get_frame_time())
-
-
-    def calculate_desired_direction(self, player_position, spatial_grid):
-        emergency_avoidance = self.calculate_emergency_avoidance(spatial_grid)
-        if vector3_length_sqr(emergency_avoidance) > 0.1:
-            return emergency_avoidance
-        desired_direction = Vector3(0, 0, 0)
+        position = self.position
+        stress_level = self.stress_level
+        if position.y < self.safe_altitude_min + 10:
+            stress_level += 20 * dt
 
-        if self.ai_state == AIState.PATROL:
-            desired_direction = self.patrol_behavior()
-        elif self.ai_state == AIState.CHASE:
-            desired_direction = self.chase_behavior(player_position)
-        elif self.ai_state == AIState.ATTACK:
-            desired_direction = self.attack_behavior(player_position)
-        elif self.ai_state == AIState.EVADE:
-            desired_direction = self.evade_behavior(player_position)
-        elif self.ai_state == AIState.RETREAT:
-            desired_direction = self.retreat_behavior(player_position)
+        boundary_distance = sqrt(position.x ** 2 + position.z ** 2)
+        if boundary_distance > city_radius - 100:
+            stress_level += 15 * dt
 
-        general_avoidance = self.calculate_general_avoidance(spatial_grid)
-        desired_direction = vector3_add(desired_direction, general_avoidance)
+        self.stress_level = max(0, stress_level - 5 * dt)
 
-        boundary_avoidance = self.calculate_boundary_avoidance()
-        desired_direction = vector3_add(desired_direction, boundary_avoidance)
 
-        altitude_correction = self.calculate_altitude_correction()
-        desired_direction = vector3_add(desired_direction, altitude_correction)
+    def start_maneuver(self, maneuver):
+        start = now()
+        self.current_maneuver = maneuver
+        self.arrays.maneuver_starts[self.row] = start
+        self.arrays.maneuver_ends[self.row] = start + self.maneuver_duration
 
-        return vector3_normalize(desired_direction)
 
-
-    def patrol_behavior(self):
-        to_center = vector3_subtract(self.patrol_center, self.position)
-        distance_to_center = vector3_length(to_center)
-
-        if distance_to_center > self.patrol_radius:
-            return vector3_normalize(to_center)
-        else:
-            if distance_to_center < 50:
-                away_from_center = vector3_normalize(vector3_subtract(self.position, self.patrol_center))
-                return away_from_center
-            else:
-                right_vector = vector3_cross_product(Vector3(0, 1, 0), to_center)
-                if vector3_length_sqr(right_vector) > 0.01:
-                    return vector3_normalize(right_vector)
-                else:
-                    return Vector3(1, 0, 0)
-
-
-    def chase_behavior(self, player_position):
-        to_player = vector3_subtract(player_position, self.position)
-        distance = vector3_length(to_player)
-
-        if distance > 5.0:
-            direct_chase = vector3_normalize(to_player)
-
-            if self.skill_level > 0.6:
-                predicted_pos = self.predict_player_position(player_position)
-                to_predicted = vector3_subtract(predicted_pos, self.position)
-                predicted_chase = vector3_normalize(to_predicted)
-
-                blend_factor = 0.3
-                final_direction = vector3_add(
-                    vector3_scale(direct_chase, 1.0 - blend_factor),
-                    vector3_scale(predicted_chase, blend_factor)
-                )
-                return vector3_normalize(final_direction)
-            else:
-                return direct_chase
-        return Vector3(0, 0, 0)
-
-
-    def attack_behavior(self, player_position):
-        to_player = vector3_subtract(player_position, self.position)
-        distance = vector3_length(to_player)
-
-        if distance < 100:
-            self.use_boost_if_needed()
-            return self.execute_attack_maneuver(player_position)
-        else:
-            return self.chase_behavior(player_position)
-
-
-    def handle_shooting(self, player_position, bullet_manager, audio_manager):
+    def handle_shooting(self, player_position, bullet_manager, audio_manager, aimed):
+        """Runs the burst and cooldown logic, called by EnemyManager while bursting or with the player in the sights."""
         if self.is_in_burst:
             if not self.burst_timer:
                 if self.shots_in_burst_left > 0:
@@ -267,28 +447,24 @@ class Enemy(Model):
                     self.is_in_burst = False
             return
 
-        if self.shoot_cooldown:
+        if self.shoot_cooldown or not aimed:
             return
 
-        to_player = vector3_normalize(vector3_subtract(player_position, self.position))
-        forward = vector3_normalize(self.velocity)
-        if vector3_length_sqr(forward) < 0.01:
-            return
-
-        if vector3_dot_product(forward, to_player) > 0.85:
-            self.is_in_burst = True
-            self.shots_in_burst_left = self.burst_count
-            self.shoot_cooldown.activate()
+        self.is_in_burst = True
+        self.shots_in_burst_left = self.burst_count
+        self.shoot_cooldown.activate()
+        self.arrays.cooldown_ends[self.row] = self.shoot_cooldown.start_time + self.shoot_cooldown.duration
 
-            self.fire_one_shot(player_position, bullet_manager, audio_manager)
-            self.shots_in_burst_left -= 1
-            if self.shots_in_burst_left > 0:
-                self.burst_timer.activate()
+        self.fire_one_shot(player_position, bullet_manager, audio_manager)
+        self.shots_in_burst_left -= 1
+        if self.shots_in_burst_left > 0:
+            self.burst_timer.activate()
 
 
     def fire_one_shot(self, player_position, bullet_manager, audio_manager):
+        position = self.position
         inaccuracy = (1.0 - self.skill_level) * 0.1
-        direction_to_player = vector3_normalize(vector3_subtract(player_position, self.position))
+        direction_to_player = vector3_normalize(vector3_subtract(player_position, position))
 
         offset = Vector3(
             uniform(-inaccuracy, inaccuracy),
@@ -297,402 +473,706 @@ class Enemy(Model):
         )
         final_direction = vector3_normalize(vector3_add(direction_to_player, offset))
 
-        shoot_position = vector3_add(self.position, vector3_scale(final_direction, 6.0))
-        bullet_manager.add_bullet(shoot_position, final_direction, self.bullet_type)
+        shoot_position = vector3_add(position, vector3_scale(final_direction, 6.0))
+        bullet_manager.add_bullet(shoot_position, final_direction, self.bullet_type, shooter=self)
 
         if audio_manager:
             audio_manager.play_sound_3d(
                 'shooting',
-                self.position,
+                position,
                 self.velocity,
                 base_volume=0.6,
                 pitch_variation=0.05
             )
 
 
-    def evade_behavior(self, player_position):
-        away_from_player = vector3_subtract(self.position, player_position)
-        distance = vector3_length(away_from_player)
-
-        if distance < self.detection_range:
-            self.use_boost_if_needed()
-            return self.execute_evasive_maneuver(away_from_player)
-        return Vector3(0, 0, 0)
+    def draw(self, alpha=1.0, impostor=None, impostor_material=None):
+        """`impostor` is a box mesh drawn instead of the model when the enemy is far from the camera."""
+        transform = interpolate_transform(self.previous_transform, self.transform, alpha)
+        position = Vector3(transform.m12, transform.m13, transform.m14)
 
+        if self.model is None:
+            draw_cube(position, 4.0, 2.0, 6.0, Color(255, 0, 255, 150))
+            return
 
-    def retreat_behavior(self, player_position):
-        to_center = vector3_subtract(Vector3(0, 60, 0), self.position)
-        away_from_player = vector3_subtract(self.position, player_position)
+        if impostor is not None:
+            draw_mesh(impostor, impostor_material, transform)
+        else:
+            for i in range(self.model.meshCount):
+                mesh = self.model.meshes[i]
+                material = self.model.materials[self.model.meshMaterial[i]]
+                draw_mesh(mesh, material, transform)
 
-        retreat_dir = vector3_add(
-            vector3_scale(vector3_normalize(to_center), 0.7),
-            vector3_scale(vector3_normalize(away_from_player), 0.3)
-        )
+        health_ratio = self.health / self.max_health
+        bar_color = GREEN if health_ratio > 0.6 else (YELLOW if health_ratio > 0.3 else RED)
 
-        self.use_boost_if_needed()
-        return vector3_normalize(retreat_dir)
+        bar_pos = Vector3(position.x, position.y + 8, position.z)
+        bar_width = 10.0
+        bar_height = 1.0
 
+        draw_cube(bar_pos, bar_width, bar_height, 0.5, Color(50, 50, 50, 200))
+        filled_width = bar_width * health_ratio
+        health_bar_pos = Vector3(bar_pos.x - (bar_width - filled_width) / 2, bar_pos.y, bar_pos.z)
+        draw_cube(health_bar_pos, filled_width, bar_height, 0.5, bar_color)
 
-    def execute_attack_maneuver(self, player_position):
-        if not self.maneuver_timer:
-            maneuvers = [ManeuverType.CIRCLE_LEFT, ManeuverType.CIRCLE_RIGHT,
-                         ManeuverType.CLIMB, ManeuverType.DIVE]
-            self.current_maneuver = random.choice(maneuvers)
-            self.maneuver_timer.activate()
+        state_color = AI_STATE_COLORS.get(self.ai_state, WHITE)
+        state_indicator_pos = Vector3(position.x, position.y + 10, position.z)
+        draw_cube(state_indicator_pos, 2.0, 1.0, 0.5, state_color)
 
-        return self.execute_maneuver(player_position)
 
+class EnemyManager:
+    """
+    Manages multiple enemy aircraft
 
-    def execute_evasive_maneuver(self, away_direction):
-        if not self.maneuver_timer:
-            evasive_maneuvers = [ManeuverType.BARREL_ROLL, ManeuverType.SPLIT_S,
-                                 ManeuverType.CLIMB, ManeuverType.CIRCLE_LEFT]
-            self.current_maneuver = random.choice(evasive_maneuvers)
-            self.maneuver_timer.activate()
+    Flight state is kept in EnemyArrays, with self.enemies[i] owning row i. Boost, steering,
+    avoidance, drag, integration and orientation run as batched NumPy passes over all rows;
+    per-enemy Python only runs for AI decisions as they come due, new maneuvers and shooting.
 
-        base_direction = vector3_normalize(away_direction)
-        maneuver_offset = self.execute_maneuver(Vector3(0, 0, 0))
+    Each step every enemy is put in a level-of-detail tier by its distance to the player
+    (AI_LOD_DISTANCES, with the LOD_HYSTERESIS of the render tiers). Farther tiers re-steer and
+    decide less often, and AI decisions are spread over steps within AI_DECISION_BUDGET_MS.
+    Headless, where runs must repeat, the budget is AI_DECISIONS_PER_STEP decisions instead.
+    get_lod_stats() reports the tier counts.
 
-        return vector3_normalize(vector3_add(base_direction, maneuver_offset))
+    Removed enemies go to a pool and spawn_enemy() resets them in place before building a new
+    one, get_pool_stats() reports how often it could.
 
+    Enemies farther from the camera than ENEMY_LOD_DISTANCES are drawn as a box impostor of
+    their model, get_render_stats() reports the instances and triangles of each tier. With the
+    instancing shader, every (model, mesh, tier) batch is one instanced draw and all health
+    bars and state markers are one quad mesh, so the draw calls do not grow with the enemies.
+    """
 
-    def execute_maneuver(self, reference_position):
-        self.maneuver_timer.update()
-        maneuver_time = get_time()
+    def __init__(self, models, vfx_manager, headless=False):
+        self.models = models
+        self.vfx_manager = vfx_manager
+        self.headless = headless
+        self.enemies = []
+        self.arrays = EnemyArrays()
+        self.spatial_hash = DynamicSpatialHash(AIRCRAFT_GRID_CELL_SIZE)
+        self.tick = 0
+        # None counts decisions against decisions_per_step rather than timing them
+        self.decision_budget_ms = None if headless else AI_DECISION_BUDGET_MS
+        self.decisions_per_step = AI_DECISIONS_PER_STEP
+        self.lod_stats = dict.fromkeys(AI_LOD_TIERS + ("steered", "decisions", "decisions_deferred"), 0)
+        self.pool = []
+        self.pool_hits = 0
+        self.pool_misses = 0
+        self.spawn_serial = 0
+        self.city_radius = CITY_RADIUS  # enemies spawn inside it and turn back at its edge
 
-        if self.current_maneuver == ManeuverType.CIRCLE_LEFT:
-            self.target_roll = -25
-            angle = maneuver_time * 1.5
-            return Vector3(cos(angle) * 0.8, 0, sin(angle) * 0.8)
+        self.max_enemies = 18
+        self.spawn_timer = Timer(4.0)
+        self.enemy_types = ["fighter", "interceptor", "bomber"]
 
-        elif self.current_maneuver == ManeuverType.CIRCLE_RIGHT:
-            self.target_roll = 25
-            angle = maneuver_time * -1.5
-            return Vector3(cos(angle) * 0.8, 0, sin(angle) * 0.8)
+        self.available_models = []
+        self.impostors = []  # box impostor mesh of each available model
+        self.model_triangles = []  # triangles of all meshes of each available model
+        self.impostor_material = None
+        self.render_stats = {tier: {"instances": 0, "triangles": 0} for tier in RENDER_LOD_TIERS}
+        self.draw_calls = 0
+
+        self.instancing_enabled = False
+        self.shader = None
+        self.instanced_materials = []  # per available model, a material per mesh on the instancing shader
+        self.impostor_instanced_material = None
+        self.instance_buffer = None
+        self.instance_matrices = None
+        self.markers = None
+        self.camera_position = ffi.new('float[3]')
+        if self.headless:
+            print("[*] Headless enemies: no models are loaded or drawn")
+            return
 
-        elif self.current_maneuver == ManeuverType.CLIMB:
-            self.target_roll = 0
-            return Vector3(0, 0.7, 0.3)
+        for model_name in ["enemy01", "enemy02"]:
+            if model_name in self.models and self.models[model_name] is not None:
+                self.available_models.append(model_name)
+            else:
+                print(f"[!] Enemy model '{model_name}' not found or failed to load")
 
-        elif self.current_maneuver == ManeuverType.DIVE:
-            self.target_roll = 0
-            return Vector3(0, -0.3, 0.7)
+        if not self.available_models:
+            print("[ERROR] No enemy models available! Check your model files.")
+        else:
+            print(f"[*] Available enemy models: {self.available_models}")
 
-        elif self.current_maneuver == ManeuverType.BARREL_ROLL:
-            roll_progress = (get_time() - self.maneuver_timer.start_time) * 2.0
-            self.target_roll = sin(roll_progress) * 90
-            return Vector3(sin(roll_progress) * 0.2, 0, 1)
+        self.impostor_material = load_material_default()
+        self.impostor_material.maps[MATERIAL_MAP_DIFFUSE].color = Color(90, 90, 100, 255)
+        for model_name in self.available_models:
+            model = self.models[model_name]
+            self.impostors.append(make_box_impostor(get_model_bounding_box(model)))
+            self.model_triangles.append(model_triangles(model))
 
-        elif self.current_maneuver == ManeuverType.SPLIT_S:
-            self.target_roll = 90
-            return Vector3(0, -0.5, 0.5)
+        self.markers = DynamicQuadMesh(3 * self.max_enemies)
+        self.setup_instancing()
 
-        return Vector3(0, 0, 1)
 
+    def setup_instancing(self):
+        # enemies share the bullets' instancing shader, lit and textured like the models
+        vs_path = join("shaders", "bullets", "bullet_instancing.vs")
+        fs_path = join("shaders", "bullets", "bullet_instancing.fs")
 
-    def predict_player_position(self, player_position):
-        player_velocity = vector3_subtract(player_position, self.last_player_position)
-        prediction_time = 1.0
+        if not exists(vs_path) or not exists(fs_path):
+            print("Warning: Enemy instancing shaders not found, drawing enemies one by one...")
+            return
 
-        predicted_position = vector3_add(player_position,
-                                         vector3_scale(player_velocity, prediction_time))
+        try:
+            self.shader = load_shader(vs_path, fs_path)
+            self.shader.locs[SHADER_LOC_MATRIX_MVP] = get_shader_location(self.shader, "mvp")
+            self.shader.locs[SHADER_LOC_VECTOR_VIEW] = get_shader_location(self.shader, "viewPos")
+
+            ambient_loc = get_shader_location(self.shader, "ambient")
+            ambient_value = ffi.new('float[4]', [0.3, 0.3, 0.3, 1.0])
+            set_shader_value(self.shader, ambient_loc, ambient_value, SHADER_UNIFORM_VEC4)
+
+            try:
+                from rlights import create_light, LIGHT_DIRECTIONAL
+                create_light(LIGHT_DIRECTIONAL, Vector3(50.0, 50.0, 0.0), Vector3Zero(), WHITE, self.shader)
+            except ImportError:
+                print("Warning: rlights not available, enemy lighting will be basic")
+
+            for model_name in self.available_models:
+                model = self.models[model_name]
+                materials = []
+                for i in range(model.meshCount):
+                    source = model.materials[model.meshMaterial[i]].maps[MATERIAL_MAP_DIFFUSE]
+                    material = load_material_default()
+                    material.shader = self.shader
+                    material.maps[MATERIAL_MAP_DIFFUSE].texture = source.texture
+                    material.maps[MATERIAL_MAP_DIFFUSE].color = source.color
+                    materials.append(material)
+                self.instanced_materials.append(materials)
+
+            self.impostor_instanced_material = load_material_default()
+            self.impostor_instanced_material.shader = self.shader
+            self.impostor_instanced_material.maps[MATERIAL_MAP_DIFFUSE].color = Color(90, 90, 100, 255)
+            self.instancing_enabled = True
+            print("[*] Enemy instancing shaders loaded successfully")
 
-        self.last_player_position = Vector3(player_position.x, player_position.y, player_position.z)
-        return predicted_position
+        except Exception as e:
+            print(f"[x] Error loading enemy instancing shaders: {e}")
+            self.instancing_enabled = False
+            self.shader = None
 
 
-    def calculate_emergency_avoidance(self, spatial_grid):
-        if not spatial_grid:
-            return Vector3(0, 0, 0)
+    def spawn_enemy(self, position=None, enemy_type=None):
+        if len(self.enemies) >= self.max_enemies:
+            return None
 
-        forward_vector = vector3_normalize(self.velocity)
-        if vector3_length_sqr(forward_vector) < 0.01:
-            return Vector3(0, 0, 0)
+        if not self.available_models and not self.headless:
+            return None
 
-        potential_colliders = spatial_grid.get_potential_colliders(self.position)
-        for obj in potential_colliders:
-            distance = vector3_distance(self.position, obj.position)
-            if distance < self.emergency_avoidance_range:
-                to_obstacle = vector3_normalize(vector3_subtract(obj.position, self.position))
+        if position is None:
+            angle = random.uniform(0, 360)
+            distance = random.uniform(self.city_radius * 0.7, self.city_radius * 0.9)
+            x = cos(radians(angle)) * distance
+            z = sin(radians(angle)) * distance
+            y = random.uniform(40, 100)
+            position = Vector3(x, y, z)
 
-                if vector3_dot_product(forward_vector, to_obstacle) > 0.8:
-                    self.ai_state = AIState.EMERGENCY
-                    away_vector = vector3_normalize(vector3_subtract(self.position, obj.position))
-                    return vector3_normalize(Vector3(away_vector.x, 0.8, away_vector.z))
+        if enemy_type is None:
+            enemy_type = random.choice(self.enemy_types)
 
-        return Vector3(0, 0, 0)
+        if self.headless:
+            model_name = None
+            base_model = None
+        else:
+            model_name = random.choice(self.available_models)
+            base_model = self.models[model_name]
 
+            if base_model is None:
+                return None
 
-    def calculate_general_avoidance(self, spatial_grid):
-        if not spatial_grid:
-            return Vector3(0, 0, 0)
+        recycled = False
+        try:
+            self.spawn_serial += 1
+            if self.pool:
+                enemy = self.pool.pop()
+                recycled = True
+                enemy.serial = self.spawn_serial
+                enemy.row = self.arrays.add(enemy.serial)
+                enemy.reset(base_model, position, enemy_type)
+                self.pool_hits += 1
+            else:
+                enemy = Enemy(base_model, position, enemy_type, arrays=self.arrays, serial=self.spawn_serial)
+                self.pool_misses += 1
 
-        avoidance_vector = Vector3(0, 0, 0)
-        potential_colliders = spatial_grid.get_potential_colliders(self.position)
-        for obj in potential_colliders:
-            distance = vector3_distance(self.position, obj.position)
-            if 0 < distance < self.avoidance_range:
-                away_vector = vector3_normalize(vector3_subtract(self.position, obj.position))
-                avoidance_strength = 1.0 - (distance / self.avoidance_range)
-                scaled_avoidance = vector3_scale(away_vector, avoidance_strength)
-                avoidance_vector = vector3_add(avoidance_vector, scaled_avoidance)
+            self.arrays.models[enemy.row] = self.available_models.index(model_name) if model_name else -1
+            self.enemies.append(enemy)
 
-        return avoidance_vector
+            return enemy
 
+        except Exception as e:
+            # drop a row the failed enemy may have taken, and keep a recycled one for the next spawn
+            self.arrays.count = len(self.enemies)
+            if recycled:
+                self.pool.append(enemy)
+            print(f"[ERROR] Failed to create enemy: {e}")
+            return None
 
-    def calculate_boundary_avoidance(self):
-        boundary_limit = CITY_RADIUS - 50.0
-        distance_from_center = sqrt(self.position.x ** 2 + self.position.z ** 2)
 
-        if distance_from_center > boundary_limit:
-            to_center = vector3_normalize(Vector3(-self.position.x, 0, -self.position.z))
-            urgency = (distance_from_center - boundary_limit) / 50.0
-            return vector3_scale(to_center, urgency * 2.0)
+    def remove_enemy(self, enemy):
+        row = enemy.row
+        last = self.enemies.pop()
+        if last is not enemy:
+            self.enemies[row] = last
+            last.row = row
+        self.arrays.remove(row)
+        self.pool.append(enemy)
 
-        return Vector3(0, 0, 0)
 
+    def update(self, dt, player_position, nav_field=None, bullet_manager=None, audio_manager=None):
+        score_from_kills = 0
+        enemies_defeated_count = 0
+        defeated_enemies_info = []
 
-    def calculate_altitude_correction(self):
-        if self.position.y < self.safe_altitude_min:
-            urgency = (self.safe_altitude_min - self.position.y) / 20.0
-            return Vector3(0, urgency * 2.0, 0)
-        elif self.position.y > self.safe_altitude_max:
-            urgency = (self.position.y - self.safe_altitude_max) / 50.0
-            return Vector3(0, -urgency, 0)
+        if not self.spawn_timer and len(self.enemies) < self.max_enemies:
+            self.spawn_enemy()
+            self.spawn_timer.activate()
 
-        return Vector3(0, 0, 0)
+        # highest rows first, so every row moved into a hole has already been checked
+        for row in np.flatnonzero(self.arrays.healths[:self.arrays.count] <= 0)[::-1].tolist():
+            enemy = self.enemies[row]
+            score_from_kills += enemy.score_value
+            enemies_defeated_count += 1
+            defeated_enemies_info.append({'position': enemy.position, 'velocity': enemy.velocity})
+            self.vfx_manager.create_explosion(enemy.position, "explosion_air02")
+            self.remove_enemy(enemy)
+
+        if self.enemies:
+            self.update_flight(dt, player_position, nav_field)
+            if bullet_manager:
+                self.update_shooting(player_position, bullet_manager, audio_manager)
+
+        if bullet_manager:
+            with profiler.scope("enemy_bullet_hits"):
+                self.check_bullet_collisions(bullet_manager)
+
+        return score_from_kills, enemies_defeated_count, defeated_enemies_info
+
+
+    def update_flight(self, dt, player_position, nav_field=None):
+        """
+        One batched step for every enemy, scaled by its distance to the player.
+
+        Near enemies re-steer every step, mid and far ones every few steps, staggered by row so
+        the work spreads over the steps. In between, near and mid enemies keep flying towards
+        their last steering target and far enemies coast along their velocity.
+        """
+        arrays = self.arrays
+        n = arrays.count
+        time = now()
+
+        player = np.array((player_position.x, player_position.y, player_position.z), dtype=np.float32)
+        to_player = player - arrays.positions[:n]
+        player_distances = np.sqrt(np.einsum('ij,ij->i', to_player, to_player))
+        tiers = arrays.lod_tiers[:n]
+        tiers[:] = select_lod_tiers(player_distances, tiers, AI_LOD_DISTANCES)
+
+        self.run_due_decisions(player_position, dt, time)
+        self.update_boosts(dt)
+
+        steered = (self.tick + np.arange(n)) % LOD_STEER_INTERVALS[tiers] == 0
+        rows = np.flatnonzero(steered)
+        arrays.directions[rows] = self.get_desired_directions(rows, player, to_player, player_distances,
+                                                              time, nav_field)
+
+        flying = np.flatnonzero(steered | (tiers != FAR))
+        desired = arrays.directions[flying]
+        boost = np.where(arrays.boosting[flying], Enemy.boost_speed_multiplier, 1.0)
+        max_speeds = arrays.max_speeds[flying] * boost
+        stress_penalty = 1.0 - (arrays.stress[flying] / Enemy.max_stress) * 0.3
+        responsiveness = arrays.skill_levels[flying] * arrays.accelerations[flying] * stress_penalty
+
+        velocities = arrays.velocities[flying]
+        velocities += (desired * max_speeds[:, None] - velocities) * (responsiveness * dt)[:, None]
+        velocities -= velocities * (Enemy.drag * dt)
+        arrays.velocities[flying] = velocities
+
+        arrays.previous_positions[:n] = arrays.positions[:n]
+        arrays.positions[:n] += arrays.velocities[:n] * dt
+
+        roll_angles = arrays.roll_angles[flying]
+        arrays.roll_angles[flying] = roll_angles + (arrays.target_rolls[flying] - roll_angles) * (Enemy.roll_speed * dt)
+
+        self.update_orientations(flying)
+        self.tick += 1
+
+        self.lod_stats.update(zip(AI_LOD_TIERS, np.bincount(tiers, minlength=len(AI_LOD_TIERS)).tolist()))
+        self.lod_stats["steered"] = len(rows)
+
+
+    def run_due_decisions(self, player_position, dt, time):
+        """
+        Runs the AI decisions that are due, most overdue first, until decision_budget_ms is spent,
+        or decisions_per_step have run when it is None. The rest stay due for the next step.
+        Farther tiers are scheduled to decide less often.
+        """
+        arrays = self.arrays
+        n = arrays.count
+        due = np.flatnonzero(arrays.decision_times[:n] <= time)
+        due = due[np.argsort(arrays.decision_times[due], kind='stable')]
+
+        timed = self.decision_budget_ms is not None
+        if timed:
+            deadline = perf_counter() + self.decision_budget_ms / 1000.0
+        decided = 0
+        for row in (due if timed else due[:self.decisions_per_step]).tolist():
+            if timed and decided and perf_counter() > deadline:
+                break
+            self.enemies[row].update_ai_state(player_position, dt, self.city_radius)
+            arrays.decision_times[row] = time + Enemy.decision_interval * AI_LOD_DECISION_SCALE[arrays.lod_tiers[row]]
+            decided += 1
 
+        self.lod_stats["decisions"] = decided
+        self.lod_stats["decisions_deferred"] = len(due) - decided
 
-    def use_boost_if_needed(self):
-        if self.current_boost_time > 1.0 and not self.is_boosting:
-            if (self.ai_state in [AIState.EVADE, AIState.RETREAT] or
-                    self.stress_level > 50 or
-                    self.health < self.max_health * 0.5):
-                self.is_boosting = True
 
+    def get_lod_stats(self):
+        """Enemies per LOD tier, how many re-steered and how many AI decisions ran or were deferred in the last step."""
+        return dict(self.lod_stats)
 
-    def update_boost(self, dt):
-        if self.is_boosting:
-            self.current_boost_time -= self.boost_depletion_rate * dt
-            if self.current_boost_time <= 0:
-                self.current_boost_time = 0
-                self.is_boosting = False
-        else:
-            if self.current_boost_time < self.max_boost_time:
-                self.current_boost_time += self.boost_recharge_rate * dt
-                if self.current_boost_time > self.max_boost_time:
-                    self.current_boost_time = self.max_boost_time
 
+    def update_boosts(self, dt):
+        n = self.arrays.count
+        boosting = self.arrays.boosting[:n]
+        boost_times = self.arrays.boost_times[:n]
 
-    def update_physics(self, dt, desired_direction):
-        self.target_direction = desired_direction
+        boost_times += np.where(boosting, -Enemy.boost_depletion_rate * dt, Enemy.boost_recharge_rate * dt)
+        boosting &= boost_times > 0
+        np.clip(boost_times, 0.0, Enemy.max_boost_time, out=boost_times)
 
-        current_max_speed = self.max_speed * self.boost_speed_multiplier if self.is_boosting else self.max_speed
 
-        responsiveness = self.skill_level * self.acceleration
-        stress_penalty = 1.0 - (self.stress_level / self.max_stress) * 0.3
-        responsiveness *= stress_penalty
+    def use_boost_if_needed(self, rows):
+        arrays = self.arrays
+        states = arrays.states[rows]
+        ready = (arrays.boost_times[rows] > 1.0) & ~arrays.boosting[rows]
+        pressed = ((states == EVADE) | (states == RETREAT) | (arrays.stress[rows] > 50) |
+                   (arrays.healths[rows] < arrays.max_healths[rows] * 0.5))
+        arrays.boosting[rows[ready & pressed]] = True
 
-        desired_velocity = vector3_scale(self.target_direction, current_max_speed)
-        steering_force = vector3_subtract(desired_velocity, self.velocity)
-        steering_force = vector3_scale(steering_force, responsiveness * dt)
-        self.velocity = vector3_add(self.velocity, steering_force)
 
-        drag_force = vector3_scale(self.velocity, self.drag * dt)
-        self.velocity = vector3_subtract(self.velocity, drag_force)
+    def get_desired_directions(self, rows, player, to_player, player_distances, time, nav_field):
+        """The steering target of the given rows: their state's behaviour plus avoidance, boundary and altitude terms."""
+        arrays = self.arrays
+        n = arrays.count
+        positions = arrays.positions[:n]
+        states = arrays.states[:n]
 
-        self.position = vector3_add(self.position, vector3_scale(self.velocity, dt))
+        general_avoidance, emergency_rows, emergency_directions = self.get_obstacle_avoidance(rows, nav_field)
+        # an enemy about to fly into a building only climbs away from it this step
+        steering = np.zeros(n, dtype=bool)
+        steering[rows] = True
+        steering[emergency_rows] = False
+        states[emergency_rows] = EMERGENCY
 
-        self.roll_angle += (self.target_roll - self.roll_angle) * self.roll_speed * dt
+        attacking = (states == ATTACK) & steering
+        close = player_distances < 100
 
+        desired = np.zeros((n, 3), dtype=np.float32)
 
-    def update(self, dt, player_position, spatial_grid=None, bullet_manager=None, audio_manager=None):
-        self.update_ai_state(player_position, dt)
-        self.update_boost(dt)
-        self.shoot_cooldown.update()
-        self.burst_timer.update()
+        patrol = np.flatnonzero((states == PATROL) & steering)
+        desired[patrol] = self.get_patrol_directions(patrol)
 
-        desired_direction = self.calculate_desired_direction(player_position, spatial_grid)
-        self.update_physics(dt, desired_direction)
-        self.update_model_transform()
+        chase = np.flatnonzero((((states == CHASE) & steering) | (attacking & ~close)) & (player_distances > 5.0))
+        desired[chase] = self.get_chase_directions(chase, player, to_player, player_distances)
 
-        if self.ai_state in [AIState.ATTACK, AIState.CHASE, AIState.PATROL, AIState.EVADE] and bullet_manager:
-            self.handle_shooting(player_position, bullet_manager, audio_manager)
+        attack = np.flatnonzero(attacking & close)
+        evade = np.flatnonzero((states == EVADE) & steering & (player_distances < Enemy.detection_range))
+        retreat = np.flatnonzero((states == RETREAT) & steering)
+        self.use_boost_if_needed(np.concatenate((attack, evade, retreat)))
 
+        self.start_due_maneuvers(attack, ATTACK_MANEUVERS, time)
+        self.start_due_maneuvers(evade, EVASIVE_MANEUVERS, time)
+        desired[attack] = self.get_maneuver_offsets(attack, time)
+        desired[evade] = normalize_rows(normalize_rows(-to_player[evade]) + self.get_maneuver_offsets(evade, time))
 
-    def update_model_transform(self):
-        if vector3_length_sqr(self.velocity) > 0.01:
-            forward = vector3_normalize(self.velocity)
-        else:
-            forward = vector3_normalize(self.target_direction)
+        to_base = RETREAT_POINT - positions[retreat]
+        desired[retreat] = normalize_rows(normalize_rows(to_base) * 0.7 + normalize_rows(-to_player[retreat]) * 0.3)
 
-        if vector3_length_sqr(forward) < 0.01:
-            forward = Vector3(0, 0, 1)
+        desired[rows] = normalize_rows(desired[rows] + general_avoidance + self.get_boundary_corrections(rows))
+        desired[emergency_rows] = emergency_directions
+        return desired[rows]
 
-        world_up = Vector3(0, 1, 0)
 
-        right = vector3_normalize(vector3_cross_product(forward, world_up))
-        up = vector3_normalize(vector3_cross_product(right, forward))
+    def get_patrol_directions(self, rows):
+        to_center = self.arrays.patrol_centers[rows] - self.arrays.positions[rows]
+        distances = np.sqrt(np.einsum('ij,ij->i', to_center, to_center))[:, None]
 
-        roll_rad = radians(self.roll_angle)
+        # circle the patrol centre: up x to_center, or +X when that is degenerate
+        right = np.zeros_like(to_center)
+        right[:, 0] = to_center[:, 2]
+        right[:, 2] = -to_center[:, 0]
+        orbit = np.where(np.einsum('ij,ij->i', right, right)[:, None] > 0.01, normalize_rows(right),
+                         np.array((1.0, 0.0, 0.0), dtype=np.float32))
 
-        rolled_up = vector3_rotate_by_axis_angle(up, forward, roll_rad)
-        rolled_right = vector3_rotate_by_axis_angle(right, forward, roll_rad)
+        towards = normalize_rows(to_center)
+        return np.where(distances > Enemy.patrol_radius, towards, np.where(distances < 50, -towards, orbit))
 
-        self.transform = Matrix(
-            rolled_right.x, rolled_up.x, -forward.x, self.position.x,
-            rolled_right.y, rolled_up.y, -forward.y, self.position.y,
-            rolled_right.z, rolled_up.z, -forward.z, self.position.z,
-            0.0, 0.0, 0.0, 1.0
-        )
 
+    def get_chase_directions(self, rows, player, to_player, player_distances):
+        arrays = self.arrays
+        directions = to_player[rows] / player_distances[rows, None]
 
-    def draw(self):
-        if self.model is None:
-            draw_cube(self.position, 4.0, 2.0, 6.0, Color(255, 0, 255, 150))
-            return
+        # skilled pilots lead the player by its movement since they last looked, one second ahead
+        skilled = arrays.skill_levels[rows] > 0.6
+        leading = rows[skilled]
+        predicted = 2.0 * player - arrays.last_player_positions[leading]
+        arrays.last_player_positions[leading] = player
 
-        for i in range(self.model.meshCount):
-            mesh = self.model.meshes[i]
-            material = self.model.materials[self.model.meshMaterial[i]]
-            draw_mesh(mesh, material, self.transform)
+        to_predicted = normalize_rows(predicted - arrays.positions[leading])
+        directions[skilled] = normalize_rows(directions[skilled] * 0.7 + to_predicted * 0.3)
+        return directions
 
-        health_ratio = self.health / self.max_health
-        bar_color = GREEN if health_ratio > 0.6 else (YELLOW if health_ratio > 0.3 else RED)
 
-        bar_pos = Vector3(self.position.x, self.position.y + 8, self.position.z)
-        bar_width = 10.0
-        bar_height = 1.0
+    def start_due_maneuvers(self, rows, maneuvers, time):
+        for row in rows[self.arrays.maneuver_ends[rows] <= time].tolist():
+            self.enemies[row].start_maneuver(random.choice(maneuvers))
 
-        draw_cube(bar_pos, bar_width, bar_height, 0.5, Color(50, 50, 50, 200))
-        filled_width = bar_width * health_ratio
-        health_bar_pos = Vector3(bar_pos.x - (bar_width - filled_width) / 2, bar_pos.y, bar_pos.z)
-        draw_cube(health_bar_pos, filled_width, bar_height, 0.5, bar_color)
 
-        state_colors = {
-            AIState.PATROL: GREEN,
-            AIState.CHASE: YELLOW,
-            AIState.ATTACK: RED,
-            AIState.EVADE: PURPLE,
-            AIState.RETREAT: BLUE,
-            AIState.EMERGENCY: ORANGE
-        }
-        state_color = state_colors.get(self.ai_state, WHITE)
-        state_indicator_pos = Vector3(self.position.x, self.position.y + 10, self.position.z)
-        draw_cube(state_indicator_pos, 2.0, 1.0, 0.5, state_color)
+    def get_maneuver_offsets(self, rows, time):
+        arrays = self.arrays
+        offsets, rolls = maneuver_steering(arrays.maneuvers[rows], arrays.maneuver_starts[rows], time)
+        rolling = ~np.isnan(rolls)
+        arrays.target_rolls[rows[rolling]] = rolls[rolling]
+        return offsets
 
 
-class EnemyManager:
-    """Manages multiple enemy aircraft"""
+    def get_obstacle_avoidance(self, rows, nav_field):
+        """
+        Returns (general avoidance of each row, emergency rows, emergency directions) from the navigation field.
 
-    def __init__(self, models, vfx_manager):
-        self.models = models
-        self.vfx_manager = vfx_manager
-        self.enemies = []
+        The nearest building pushes away harder the closer it is, up to straight up inside one.
+        An enemy heading at a building inside the emergency range climbs away from it.
+        """
+        arrays = self.arrays
+        if nav_field is None:
+            return (np.zeros((len(rows), 3), dtype=np.float32), np.zeros(0, dtype=np.int64),
+                    np.zeros((0, 3), dtype=np.float32))
 
-        self.max_enemies = 18
-        self.spawn_timer = Timer(4.0)
-        self.enemy_types = ["fighter", "interceptor", "bomber"]
+        away, clearance = nav_field.sample(arrays.positions[rows])
+        general = away * np.clip(1.0 - clearance / Enemy.avoidance_range, 0.0, 1.0)[:, None]
 
-        self.available_models = []
-        for model_name in ["enemy01", "enemy02"]:
-            if model_name in self.models and self.models[model_name] is not None:
-                self.available_models.append(model_name)
-            else:
-                print(f"[!] Enemy model '{model_name}' not found or failed to load")
+        forward = normalize_rows(arrays.velocities[rows])
+        ahead = ((clearance < Enemy.emergency_avoidance_range) &
+                 (np.einsum('ij,ij->i', forward, -away) > 0.8))
 
-        if not self.available_models:
-            print("[ERROR] No enemy models available! Check your model files.")
-        else:
-            print(f"[*] Available enemy models: {self.available_models}")
+        climb = away[ahead]
+        climb[:, 1] = 0.8
+        return general, rows[ahead], normalize_rows(climb)
 
 
-    def spawn_enemy(self, position=None, enemy_type=None):
-        if len(self.enemies) >= self.max_enemies:
-            return None
+    def get_boundary_corrections(self, rows):
+        """Pushes the rows back towards the city near its edge and back into the safe altitude band."""
+        positions = self.arrays.positions[rows]
+        corrections = np.zeros_like(positions)
 
-        if not self.available_models:
-            return None
+        boundary_limit = self.city_radius - 50.0
+        distances = np.hypot(positions[:, 0], positions[:, 2])
+        outside = distances > boundary_limit
+        urgency = (distances[outside] - boundary_limit) / 50.0 * 2.0
+        corrections[outside, 0] = -positions[outside, 0] / distances[outside] * urgency
+        corrections[outside, 2] = -positions[outside, 2] / distances[outside] * urgency
 
-        if position is None:
-            angle = random.uniform(0, 360)
-            distance = random.uniform(CITY_RADIUS * 0.7, CITY_RADIUS * 0.9)
-            x = cos(radians(angle)) * distance
-            z = sin(radians(angle)) * distance
-            y = random.uniform(40, 100)
-            position = Vector3(x, y, z)
+        heights = positions[:, 1]
+        corrections[:, 1] = np.where(heights < Enemy.safe_altitude_min,
+                                     (Enemy.safe_altitude_min - heights) / 20.0 * 2.0,
+                                     np.where(heights > Enemy.safe_altitude_max,
+                                              -(heights - Enemy.safe_altitude_max) / 50.0, 0.0))
+        return corrections
 
-        if enemy_type is None:
-            enemy_type = random.choice(self.enemy_types)
 
-        model_name = random.choice(self.available_models)
-        base_model = self.models[model_name]
+    def update_orientations(self, rows):
+        """Rebuilds the rolled flight basis of the rows, facing their velocity or, when slow, their target direction."""
+        arrays = self.arrays
+        n = arrays.count
+        arrays.previous_bases[:n] = arrays.bases[:n]
 
-        if base_model is None:
-            return None
+        velocities = arrays.velocities[rows]
+        moving = np.einsum('ij,ij->i', velocities, velocities) > 0.01
+        forward = np.where(moving[:, None], normalize_rows(velocities), normalize_rows(arrays.directions[rows]))
+        forward[np.einsum('ij,ij->i', forward, forward) < 0.01] = (0.0, 0.0, 1.0)
 
-        try:
-            enemy = Enemy(base_model, position, enemy_type)
-            if enemy.model is None:
-                return None
+        world_up = np.array((0.0, 1.0, 0.0), dtype=np.float32)
+        right = normalize_rows(np.cross(forward, world_up))
+        up = normalize_rows(np.cross(right, forward))
 
-            self.enemies.append(enemy)
+        roll = np.radians(arrays.roll_angles[rows])
+        arrays.bases[rows] = np.stack((rotate_rows(right, forward, roll), rotate_rows(up, forward, roll), -forward),
+                                      axis=-1)
 
-            return enemy
 
-        except Exception as e:
-            print(f"[ERROR] Failed to create enemy: {e}")
-            return None
+    def update_shooting(self, player_position, bullet_manager, audio_manager):
+        """Lets the enemies that are bursting or have the player in their sights shoot, except far ones out of range."""
+        arrays = self.arrays
+        n = arrays.count
+        player = np.array((player_position.x, player_position.y, player_position.z), dtype=np.float32)
 
+        to_player = normalize_rows(player - arrays.positions[:n])
+        forward = normalize_rows(arrays.velocities[:n])
+        aimed = np.einsum('ij,ij->i', forward, to_player) > 0.85
+        armed = np.isin(arrays.states[:n], SHOOTING_STATES) & (arrays.lod_tiers[:n] != FAR)
+        ready = aimed & (arrays.cooldown_ends[:n] <= now())
 
-    def update(self, dt, player_position, spatial_grid=None, bullet_manager=None, audio_manager=None):
-        score_from_kills = 0
-        enemies_defeated_count = 0
-        defeated_enemies_info = []
-        self.spawn_timer.update()
+        for row in np.flatnonzero(armed & (ready | arrays.in_burst[:n])).tolist():
+            self.enemies[row].handle_shooting(player_position, bullet_manager, audio_manager, bool(aimed[row]))
 
-        if not self.spawn_timer and len(self.enemies) < self.max_enemies:
-            self.spawn_enemy()
-            self.spawn_timer.activate()
 
-        for enemy in self.enemies[:]:
-            if enemy.health <= 0:
-                score_from_kills += enemy.score_value
-                enemies_defeated_count += 1
-                defeated_enemies_info.append({'position': enemy.position, 'velocity': enemy.velocity})
-                self.vfx_manager.create_explosion(enemy.position, "explosion_air02")
-                self.enemies.remove(enemy)
-                continue
+    def check_bullet_collisions(self, bullet_manager):
+        """Re-hashes the living enemies for this frame and sweeps every bullet path against them in one batch."""
+        arrays = self.arrays
+        targets = np.flatnonzero(arrays.healths[:arrays.count] > 0)
+        if not len(targets):
+            return
 
-            enemy.update(dt, player_position, spatial_grid, bullet_manager, audio_manager)
+        positions = arrays.positions[targets]
+        self.spatial_hash.rebuild(positions + ENEMY_BOX_MIN, positions + ENEMY_BOX_MAX, arrays.keys[targets])
+
+        bullet_indices, target_indices, impacts = bullet_manager.sweep_hits(self.spatial_hash)
+        for bullet_index, target_index, (x, y, z) in zip(bullet_indices.tolist(), targets[target_indices].tolist(),
+                                                         impacts.tolist()):
+            enemy = self.enemies[target_index]
+            damage = bullet_manager.on_hit(bullet_index, enemy)
+            enemy.take_damage(damage)
+            self.vfx_manager.create_explosion(Vector3(x, y, z), "explosion_air01", scale=3.0)
+
+
+    def draw(self, alpha=1.0, camera=None):
+        n = self.arrays.count
+        tiers = self.arrays.render_lods[:n]
+        if camera is not None and n:
+            camera_position = np.array([camera.position.x, camera.position.y, camera.position.z], dtype=np.float32)
+            distances = np.linalg.norm(self.arrays.positions[:n] - camera_position, axis=1)
+            tiers[:] = select_lod_tiers(distances, tiers, ENEMY_LOD_DISTANCES)
+
+        instances = [0] * len(RENDER_LOD_TIERS)
+        triangles = [0] * len(RENDER_LOD_TIERS)
+        if self.instancing_enabled and camera is not None:
+            self.draw_instanced(alpha, camera, instances, triangles)
+        else:
+            self.draw_individual(alpha, instances, triangles)
 
-            if bullet_manager:
-                self.check_enemy_bullet_collisions(enemy, bullet_manager)
+        for tier, name in enumerate(RENDER_LOD_TIERS):
+            self.render_stats[name] = {"instances": instances[tier], "triangles": triangles[tier]}
 
-        return score_from_kills, enemies_defeated_count, defeated_enemies_info 
 
+    def draw_instanced(self, alpha, camera, instances, triangles):
+        arrays, n = self.arrays, self.arrays.count
+        self.draw_calls = 0
+        if n == 0:
+            return
 
-    def check_enemy_bullet_collisions(self, enemy, bullet_manager):
-        for bullet in bullet_manager.bullets:
-            if bullet.active and bullet.check_collision_with(enemy):
-                damage = bullet.on_hit(enemy)
-                enemy.take_damage(damage)
-                self.vfx_manager.create_explosion(bullet.position, "explosion_air01", scale=3.0)
-                break
+        self.camera_position[0:3] = [camera.position.x, camera.position.y, camera.position.z]
+        set_shader_value(self.shader, self.shader.locs[SHADER_LOC_VECTOR_VIEW],
+                         self.camera_position, SHADER_UNIFORM_VEC3)
+
+        if self.instance_matrices is None or len(self.instance_matrices) < n:
+            capacity = max(n, self.max_enemies)
+            self.instance_buffer = ffi.new('Matrix[]', capacity)
+            self.instance_matrices = np.frombuffer(ffi.buffer(self.instance_buffer), dtype=np.float32).reshape(capacity, 16)
+
+        # rows sorted by model and tier, so every batch is one run of the instance buffer
+        transforms = arrays.interpolated_transforms(alpha)
+        batches = arrays.models[:n].astype(np.int64) * len(RENDER_LOD_TIERS) + arrays.render_lods[:n]
+        order = np.argsort(batches, kind='stable')
+        np.take(transforms, order, axis=0, out=self.instance_matrices[:n])
+        counts = np.bincount(batches, minlength=len(self.available_models) * len(RENDER_LOD_TIERS)).tolist()
+
+        start = 0
+        for batch, count in enumerate(counts):
+            if count == 0:
+                continue
 
+            model_index, tier = divmod(batch, len(RENDER_LOD_TIERS))
+            if tier == IMPOSTOR:
+                meshes = [(self.impostors[model_index], self.impostor_instanced_material)]
+            else:
+                model = self.models[self.available_models[model_index]]
+                meshes = [(model.meshes[i], material) for i, material in enumerate(self.instanced_materials[model_index])]
+
+            for mesh, material in meshes:
+                draw_mesh_instanced(mesh, material, self.instance_buffer + start, count)
+                triangles[tier] += mesh.triangleCount * count
+            instances[tier] += count
+            self.draw_calls += len(meshes)
+            start += count
+
+        self.draw_markers(camera, transforms[:, [3, 7, 11]])
+        self.draw_calls += 1
+
+
+    def draw_markers(self, camera, positions):
+        """Health bars and AI state markers of every enemy as camera-facing quads, in one draw call."""
+        arrays, n = self.arrays, self.arrays.count
+        forward = np.array([camera.target.x - camera.position.x, camera.target.y - camera.position.y,
+                            camera.target.z - camera.position.z], dtype=np.float32)
+        right = np.cross(forward, (0.0, 1.0, 0.0))
+        length = np.linalg.norm(right)
+        right = right / length if length > 1e-6 else np.array((1.0, 0.0, 0.0), dtype=np.float32)
+        toward_camera = -forward / max(np.linalg.norm(forward), 1e-6) * 0.05  # keeps the fill in front of its bar
+        half_up = (0.0, 0.5, 0.0)
 
-    def draw(self):
-        for enemy in self.enemies:
-            enemy.draw()
+        bar_width = 10.0
+        ratios = np.clip(arrays.healths[:n] / arrays.max_healths[:n], 0.0, 1.0)
+        filled = bar_width * ratios
+        bars = positions + (0.0, 8.0, 0.0)
+        health_colors = HEALTH_BAR_COLORS[(ratios > 0.3).astype(np.int64) + (ratios > 0.6)]
+
+        markers = self.markers
+        markers.reserve(3 * n)
+        end = markers.set_quads(0, bars, right * (bar_width / 2), half_up, HEALTH_BAR_BACKGROUND)
+        end = markers.set_quads(end, bars - right * ((bar_width - filled) / 2)[:, None] + toward_camera,
+                                right * (filled / 2)[:, None], half_up, health_colors)
+        end = markers.set_quads(end, positions + (0.0, 10.0, 0.0), right, half_up,
+                                STATE_MARKER_COLORS[arrays.states[:n]])
+        markers.draw(end)
+
+
+    def draw_individual(self, alpha, instances, triangles):
+        """Fallback: every enemy draws its own meshes, health bar and state marker."""
+        tiers = self.arrays.render_lods[:self.arrays.count].tolist()
+        models = self.arrays.models[:self.arrays.count].tolist()
+        self.draw_calls = 0
+        for enemy, tier, model_index in zip(self.enemies, tiers, models):
+            impostor = self.impostors[model_index] if tier == IMPOSTOR and model_index >= 0 else None
+            enemy.draw(alpha, impostor, self.impostor_material)
+
+            tier = IMPOSTOR if impostor is not None else FULL
+            instances[tier] += 1
+            if impostor is not None:
+                triangles[tier] += impostor.triangleCount
+                self.draw_calls += 4
+            elif model_index >= 0:
+                triangles[tier] += self.model_triangles[model_index]
+                self.draw_calls += enemy.model.meshCount + 3
+
+
+    def get_render_stats(self):
+        """Enemies and triangles drawn per render LOD tier and the draw calls they took at the last draw."""
+        stats = {tier: dict(stats) for tier, stats in self.render_stats.items()}
+        stats["draw_calls"] = self.draw_calls
+        return stats
 
 
     def get_enemy_count(self):
         return len(self.enemies)
 
 
+    def get_pool_stats(self):
+        spawns = self.pool_hits + self.pool_misses
+        return {
+            "hits": self.pool_hits,
+            "misses": self.pool_misses,
+            "hit_rate": self.pool_hits / spawns if spawns else 0.0,
+            "pooled": len(self.pool),
+            "live": len(self.enemies),
+        }
+
+
     def clear_all(self):
+        self.pool.extend(self.enemies)
         self.enemies.clear()
+        self.arrays.clear()
 
 
     def get_enemies(self):
-        return self.enemies
\ No newline at end of file
+        return self.enemies
@@ -0,0 +1,56 @@
+from settings import *
+import numpy as np
+
+
+def camera_basis(camera):
+    """Returns the camera's (position, forward, right, up) as float64 arrays, forward, right and up of unit length."""
+    position = np.array([camera.position.x, camera.position.y, camera.position.z], dtype=np.float64)
+    target = np.array([camera.target.x, camera.target.y, camera.target.z], dtype=np.float64)
+    up = np.array([camera.up.x, camera.up.y, camera.up.z], dtype=np.float64)
+
+    forward = target - position
+    forward /= max(np.linalg.norm(forward), 1e-9)
+    right = np.cross(forward, up)
+    right /= max(np.linalg.norm(right), 1e-9)
+    return position, forward, right, np.cross(right, forward)
+
+
+def frustum_planes(camera, aspect, far=CAMERA_FAR_DISTANCE):
+    """
+    The view frustum of a perspective camera as (6, 4) planes (nx, ny, nz, d), normals
+    pointing inside, so a point p is inside when n . p + d >= 0 for all of them.
+    """
+    position, forward, right, up = camera_basis(camera)
+    tan_y = np.tan(np.radians(camera.fovy) / 2)
+    tan_x = tan_y * aspect
+    normals = np.array([
+        forward,
+        -forward,
+        forward * tan_x + right,  # left
+        forward * tan_x - right,  # right
+        forward * tan_y + up,  # bottom
+        forward * tan_y - up,  # top
+    ])
+    normals /= np.linalg.norm(normals, axis=1)[:, None]
+
+    planes = np.empty((6, 4), dtype=np.float64)
+    planes[:, :3] = normals
+    planes[:, 3] = -normals @ position
+    planes[1, 3] += far
+    return planes
+
+
+def boxes_in_frustum(planes, mins, maxs):
+    """
+    Tests (N, 3) boxes against frustum planes.
+
+    Returns (visible, contained): a box is visible unless it lies fully behind one plane, and
+    contained when it lies fully in front of all of them. Like any plane test, a few boxes
+    near the frustum corners are kept although they are outside.
+    """
+    normals, offsets = planes[:, :3], planes[:, 3]
+    low = mins[:, None, :] * normals
+    high = maxs[:, None, :] * normals
+    farthest = np.maximum(low, high).sum(axis=2) + offsets
+    nearest = np.minimum(low, high).sum(axis=2) + offsets
+    return np.all(farthest >= 0, axis=1), np.all(nearest >= 0, axis=1)
@@ -1,18 +1,17 @@
 from settings import *
 
 from skybox import Skybox
-from player import Player
-from enemy import EnemyManager
+from player import PlayerControls
 from models import Fog, WallCube
 from ui_manager import UIManager
-from bullet import BulletManager
-from vfx_manager import VFXManager
+from simulation import Simulation, spend_frame_time
 from audio_manager import AudioManager
-from building_manager import BuildingManager
 from highscore_manager import HighScoreManager
+from profiler import profiler
+from custom_timer import ui_timers
 
 
-class Game:
+class Game(Simulation):
     def __init__(self):
         self.resolutions = [(1280, 720), (1600, 900), (1900, 980)]
         self.settings = {
@@ -35,10 +34,6 @@ class Game:
         self.ui_manager = UIManager(self.font)
         self.highscore_manager = HighScoreManager()
 
-        self.score = 0
-        self.player_lives = PLAYER_LIVES
-        self.enemies_defeated = 0
-
         self.setup_ui_elements()
         self.load_external_data()
 
@@ -64,13 +59,10 @@ class Game:
         self.camera_target_offset = Vector3(0, 1.0, 0)
         self.camera_smooth_factor = 5.0
 
-        self.camera_shake_timer = Timer(0.3)
+        self.camera_shake_timer = Timer(0.3, scheduler=ui_timers)
         self.camera_shake_intensity = CAMERA_SHAKE_INTENSITY
-        self.show_altitude_warning = False
-        self.show_boundary_warning = False
-        self.world_boundary = CITY_RADIUS + 50.0
         
-        self.loading_timer = Timer(2.0)
+        self.loading_timer = Timer(2.0, scheduler=ui_timers)
 
         self.color_phase = 0.0
         self.current_color_index = 0
@@ -83,27 +75,17 @@ class Game:
         self.fog.set_fog_parameters(density=0.7, speed=0.2, scale=6.0, height=8.0, color=Vector3(0.6, 0.8, 1.0))
         self.wall_cube = WallCube(size=wall_size, height=200)
 
-        self.player = Player(self.models["player"])
-
-        self.bullet_manager = BulletManager()
-        self.building_manager = BuildingManager(self.models)
-        self.vfx_manager = VFXManager()
-        self.enemy_manager = EnemyManager(self.models, self.vfx_manager)
+        super().__init__(self.models)
         self.audio_manager = AudioManager(self.camera, self.player, self.settings)
 
-        self.current_bullet_type = "normal"
-        self.shoot_cooldown = Timer(0.02)
-        self.is_shooting = False
-        self.weapon_heat = 0.0
-        self.max_weapon_heat = 8.0
-        self.heat_increase_rate = 1.0
-        self.heat_decrease_rate = 2.0
-        self.is_overheated = False
-        self.overheat_message_timer = Timer(2.0)
-        self.show_overheat_message = False
+        # fixed-step simulation: frame time is banked and spent in SIM_DT steps,
+        # render_alpha is how far the drawn frame sits between the last two steps
+        self.sim_accumulator = 0.0
+        self.render_alpha = 1.0
+        self.pending_mouse_dx = 0.0
 
         self.skybox = Skybox()
-        self.building_manager.generate_city()
+        self.building_manager.generate_city(self.building_count, self.city_radius, self.city_seed, self.player.position)
 
 
     def load_external_data(self):
@@ -155,26 +137,21 @@ class Game:
 
 
     def reset_game(self):
-        print("[*] Resetting game state for a new game...")
-        self.score = 0
-        self.player_lives = PLAYER_LIVES
-        self.enemies_defeated = 0
+        super().reset_game()
+        self.sim_accumulator = 0.0
+        self.render_alpha = 1.0
+        self.pending_mouse_dx = 0.0
+        self.audio_manager.current_game_music = None
 
-        self.player.reset()
-        self.bullet_manager.clear_all()
-        self.enemy_manager.clear_all()
-        self.vfx_manager.animations.clear()
 
-        self.weapon_heat = 0.0
-        self.is_overheated = False
+    def on_player_hit(self):
+        self.camera_shake_timer.activate()
 
-        self.building_manager.generate_city()
-        self.audio_manager.current_game_music = None
 
-        self.enemy_manager.spawn_enemy(Vector3(200, 60, 200), "fighter")
-        self.enemy_manager.spawn_enemy(Vector3(-150, 80, -180), "interceptor")
-        self.enemy_manager.spawn_enemy(Vector3(0, 90, -250), "bomber")
-        print(f"[*] Initial enemies spawned. Active count: {self.enemy_manager.get_enemy_count()}")
+    def on_game_over(self):
+        self.highscore_manager.save_high_score(self.score)
+        self.game_state = GameState.GAME_OVER
+        enable_cursor()
 
 
     def import_assets(self):
@@ -204,57 +181,10 @@ class Game:
         print("[*] Non-audio asset loading complete!")
 
 
-    def shoot(self, position, forward_vector):
-        if self.shoot_cooldown:
-            return
-
-        shoot_direction = vector3_normalize(forward_vector)
-        offset = vector3_scale(shoot_direction, 2.5)
-        shoot_position = vector3_add(position, offset)
-
-        self.bullet_manager.add_bullet(shoot_position, shoot_direction, self.current_bullet_type)
-        self.shoot_cooldown.activate()
-
-        self.audio_manager.play_sound_3d(
-            'shooting',
-            self.player.position,
-            self.player.velocity,
-            base_volume=0.8,
-            pitch_variation=0.05
-        )
-
-
-    def start_overheat_message(self):
-        self.show_overheat_message = True
-        self.overheat_message_timer.activate()
-
-
-    def end_overheat_message(self):
-        self.show_overheat_message = False
-        self.overheat_message_timer.deactivate()
-
-
-    def update_overheat_message(self):
-        if not self.show_overheat_message:
-            return
-
-        self.overheat_message_timer.update()
-
-        if not self.overheat_message_timer:
-            self.end_overheat_message()
-
-
     def cycle_fog_color(self):
         self.current_color_index = (self.current_color_index + 1) % len(self.base_colors)
 
 
-    def handle_shooting(self, player_forward_vector):
-        self.is_shooting = is_mouse_button_down(MOUSE_BUTTON_LEFT)
-
-        if self.is_shooting and not self.shoot_cooldown and not self.is_overheated:
-            self.shoot(self.player.position, player_forward_vector)
-
-
     def handle_weapon_switching(self):
         if is_key_pressed(KEY_ONE):
             self.current_bullet_type = "normal"
@@ -264,197 +194,73 @@ class Game:
             self.current_bullet_type = "rapid"
 
 
-    def check_collisions(self):
-        if self.player.is_dying:
-            return False
-
-        collidable_objects = self.building_manager.get_collision_objects()
-        for obj in collidable_objects:
-            if self.player.check_collision_with(obj):
-                self.handle_collision(obj)
-                return True
-
-        for enemy in self.enemy_manager.get_enemies():
-            if self.player.check_collision_with(enemy):
-                self.handle_enemy_collision(enemy)
-                return True
-
-        return False
-
-
-    def check_player_bullet_collisions(self):
-        if self.player.is_invulnerable or self.player.is_dying:
-            return
-
-        for bullet in self.bullet_manager.bullets:
-            if bullet.active and bullet.check_collision_with(self.player):
-                damage_dealt = bullet.on_hit(self.player)
-                self.player.take_damage(damage_dealt, on_death=self.player_death_callback)
-                self.camera_shake_timer.activate()
-                self.vfx_manager.create_explosion(bullet.position, "explosion_air01", scale=3.0)
-                break
-
-
-    def handle_collision(self, collided_object):
-        if self.player.is_invulnerable:
-            return
-
-        self.vfx_manager.create_explosion(self.player.position, "explosion_air01")
-        self.camera_shake_timer.activate()
-        self.audio_manager.play_sound_3d('player_explosion', self.player.position, self.player.velocity, base_volume=0.9)
-
-        is_fatal = (self.player.health - 25) <= 0
-        self.player.take_damage(25, on_death=self.player_death_callback)
-
-        if not is_fatal:
-            if hasattr(collided_object, 'has_multiple_collision_boxes') and collided_object.has_multiple_collision_boxes:
-                collision_part = self.identify_collision_part(collided_object)
-                collision_reason = f"building collision - {collision_part}"
-            else:
-                collision_reason = "building collision"
-
-            self.player.start_invulnerability(collision_reason)
-
-
-    def handle_enemy_collision(self, enemy):
-        if self.player.is_invulnerable:
-            return
-
-        player_damage = 40
-        enemy_damage = 60
-
-        self.vfx_manager.create_explosion(self.player.position, "explosion_air02")
-        self.camera_shake_timer.activate()
-        self.audio_manager.play_sound_3d('player_explosion', self.player.position, self.player.velocity, base_volume=1.0)
-
-        is_fatal = (self.player.health - player_damage) <= 0
-        self.player.take_damage(player_damage, on_death=self.player_death_callback)
-        enemy.take_damage(enemy_damage)
-
-        if not is_fatal:
-            self.player.start_invulnerability("enemy collision")
-
-
-    def player_death_callback(self):
-        self.player_lives -= 1
-        self.audio_manager.play_sound_3d('player_explosion', self.player.position, self.player.velocity, base_volume=1.2)
-        if self.player_lives > 0:
-            self.vfx_manager.create_explosion(
-                self.player.position,
-                "explosion_air01",
-                on_finish=self.player.respawn
-            )
-        else:
-            self.vfx_manager.create_explosion(self.player.position, "explosion_air01")
-            self.highscore_manager.save_high_score(self.score)
-            self.game_state = GameState.GAME_OVER
-            enable_cursor()
-
-
-    def identify_collision_part(self, building):
-        if not hasattr(building, 'get_world_bounding_boxes'):
-            return "building"
-
-        player_box = self.player.get_world_bounding_box()
-        if not player_box:
-            return "building"
-
-        boxes = building.get_world_bounding_boxes()
-        parts = ["BASE (Y: -5 to 67.6)", "SECOND FLOOR (Y: 67.6 to 94.0)", "ANTENNA (Y: 94.0 to 128.9)"]
-
-        for i, box in enumerate(boxes):
-            if check_collision_boxes(player_box, box):
-                return parts[i] if i < len(parts) else f"part {i + 1}"
-
-        return "building"
-
-
-    def check_player_bounds(self, dt):
-        distance_from_center = sqrt(self.player.position.x ** 2 + self.player.position.z ** 2)
-
-        if distance_from_center > self.world_boundary:
-            self.show_boundary_warning = True
-
-            distance_out = distance_from_center - self.world_boundary
-            damage_per_second = BOUNDARY_DAMAGE_START + (distance_out * BOUNDARY_DAMAGE_SCALING)
-            damage_to_apply = damage_per_second * dt
-
-            self.player.take_damage(damage_to_apply, on_death=self.player_death_callback)
-        else:
-            self.show_boundary_warning = False
-
-
     def update_playing(self):
         if is_key_pressed(KEY_ESCAPE) or is_key_pressed(KEY_P):
             self.game_state = GameState.PAUSED
             enable_cursor()
             return
 
-        dt = get_frame_time()
+        frame_time = get_frame_time()
         mouse_delta = get_mouse_delta()
 
-        self.camera_shake_timer.update()
-        self.shoot_cooldown.update()
         self.update_overheat_message()
 
-        if not self.player.is_dying:
-            self.camera_yaw -= mouse_delta.x * MOUSE_SENSITIVITY
-            self.camera_pitch -= mouse_delta.y * MOUSE_SENSITIVITY
-            self.camera_pitch = min(max(self.camera_pitch, -1.5), 1.5)
-
-            player_forward_x = -sin(self.camera_yaw) * cos(self.camera_pitch)
-            player_forward_y = -sin(self.camera_pitch)
-            player_forward_z = -cos(self.camera_yaw) * cos(self.camera_pitch)
-            player_forward_vector = vector3_normalize(Vector3(player_forward_x, player_forward_y, player_forward_z))
-
-            self.handle_shooting(player_forward_vector)
-            self.handle_weapon_switching()
-
-            if self.is_shooting and not self.is_overheated:
-                self.weapon_heat += self.heat_increase_rate * dt
-                if self.weapon_heat >= self.max_weapon_heat:
-                    self.weapon_heat = self.max_weapon_heat
-                    self.is_overheated = True
-                    if not self.show_overheat_message:
-                        self.start_overheat_message()
-            else:
-                self.weapon_heat -= self.heat_decrease_rate * dt
-                if self.weapon_heat < 0:
-                    self.weapon_heat = 0
-                if self.is_overheated and self.weapon_heat <= 0:
-                    self.is_overheated = False
-
-            self.player.update(dt, player_forward_vector, mouse_delta.x)
+        if is_key_pressed(KEY_F3):
+            profiler.toggle_overlay()
+        if is_key_pressed(KEY_F4):
+            profiler.toggle_trace(PROFILE_TRACE_PATH)
 
-        spatial_grid = self.building_manager.get_spatial_grid()
-        self.bullet_manager.update(dt, spatial_grid)
-        self.vfx_manager.update(dt)
+        # looking around and key presses follow the rendered frame, the rest runs on the fixed step
+        with profiler.scope("input"):
+            if not self.player.is_dying:
+                self.camera_yaw -= mouse_delta.x * MOUSE_SENSITIVITY
+                self.camera_pitch -= mouse_delta.y * MOUSE_SENSITIVITY
+                self.camera_pitch = min(max(self.camera_pitch, -1.5), 1.5)
+                self.pending_mouse_dx += mouse_delta.x
 
-        score_gain, enemies_killed, defeated_info = self.enemy_manager.update(dt, self.player.position, spatial_grid, self.bullet_manager, self.audio_manager)
-        self.score += score_gain
-        self.enemies_defeated += enemies_killed
+                self.handle_weapon_switching()
+                self.player.handle_key_presses()
 
-        for info in defeated_info:
-            self.audio_manager.play_sound_3d('enemy_explosions', info['position'], info['velocity'])
+        def step_playing():
+            self.step(SIM_DT, self.get_player_controls())
+            return self.game_state == GameState.PLAYING
 
-        self.check_player_bullet_collisions()
-        self.check_collisions()
-        self.check_player_bounds(dt)
-
-        altitude_warning_active = self.player.position.y <= ALTITUDE_WARNING_Y and not self.player.is_invulnerable and not self.player.is_dying
-        self.show_altitude_warning = altitude_warning_active
+        with profiler.scope("simulation"):
+            self.sim_accumulator, _, self.render_alpha = spend_frame_time(self.sim_accumulator, frame_time,
+                                                                          step_playing)
 
         # send warnings to audio manager
         self.audio_manager.manage_warning_sound(self.game_state, self.show_altitude_warning, self.show_boundary_warning)
 
+        with profiler.scope("camera"):
+            self.update_camera(frame_time)
+        with profiler.scope("fog_uniforms"):
+            self.update_fog(frame_time)
+
+
+    def get_player_controls(self):
+        player_forward_x = -sin(self.camera_yaw) * cos(self.camera_pitch)
+        player_forward_y = -sin(self.camera_pitch)
+        player_forward_z = -cos(self.camera_yaw) * cos(self.camera_pitch)
+        player_forward_vector = vector3_normalize(Vector3(player_forward_x, player_forward_y, player_forward_z))
+
+        # the mouse movement gathered since the last step drives the roll of this one
+        controls = PlayerControls.from_devices(player_forward_vector, self.pending_mouse_dx)
+        self.pending_mouse_dx = 0.0
+        return controls
+
+
+    def update_camera(self, dt):
+        player_position = self.player.get_render_position(self.render_alpha)
+
         target_fov = self.boost_fov if self.player.is_boosting else self.base_fov
         self.camera.fovy = lerp(self.camera.fovy, target_fov, self.camera_smooth_factor * dt)
 
-        target_cam_x = self.player.position.x + (self.camera_distance * cos(self.camera_pitch) * sin(self.camera_yaw))
-        target_cam_y = self.player.position.y + (self.camera_distance * sin(self.camera_pitch))
-        target_cam_z = self.player.position.z + (self.camera_distance * cos(self.camera_pitch) * cos(self.camera_yaw))
+        target_cam_x = player_position.x + (self.camera_distance * cos(self.camera_pitch) * sin(self.camera_yaw))
+        target_cam_y = player_position.y + (self.camera_distance * sin(self.camera_pitch))
+        target_cam_z = player_position.z + (self.camera_distance * cos(self.camera_pitch) * cos(self.camera_yaw))
         target_camera_pos = Vector3(target_cam_x, target_cam_y, target_cam_z)
-        target_camera_lookat = vector3_add(self.player.position, self.camera_target_offset)
+        target_camera_lookat = vector3_add(player_position, self.camera_target_offset)
 
         self.camera.position = vector3_lerp(self.camera.position, target_camera_pos, self.camera_smooth_factor * dt)
         self.camera.target = vector3_lerp(self.camera.target, target_camera_lookat, self.camera_smooth_factor * dt)
@@ -465,6 +271,8 @@ class Game:
             self.camera.position.x += offset_x
             self.camera.position.y += offset_y
 
+
+    def update_fog(self, dt):
         self.color_phase += dt * 0.3
         current_color = self.base_colors[self.current_color_index]
         next_color_index = (self.current_color_index + 1) % len(self.base_colors)
@@ -486,16 +294,26 @@ class Game:
 
     def draw_playing_scene(self):
         begin_mode_3d(self.camera)
-        self.skybox.draw()
-        self.wall_cube.draw()
-        self.fog.draw()
-        self.player.draw()
-        self.building_manager.draw(camera=self.camera)
-        self.bullet_manager.draw(camera=self.camera)
-        self.vfx_manager.draw(self.camera)
-        self.enemy_manager.draw()
+        with profiler.scope("draw_skybox"):
+            self.skybox.draw()
+        with profiler.scope("draw_walls"):
+            self.wall_cube.draw()
+        with profiler.scope("draw_fog"):
+            self.fog.draw()
+        with profiler.scope("draw_player"):
+            self.player.draw(self.render_alpha)
+        with profiler.scope("draw_buildings"):
+            self.building_manager.draw(camera=self.camera)
+        with profiler.scope("draw_bullets"):
+            self.bullet_manager.draw(camera=self.camera, alpha=self.render_alpha)
+        with profiler.scope("draw_vfx"):
+            self.vfx_manager.draw(self.camera)
+        with profiler.scope("draw_enemies"):
+            self.enemy_manager.draw(self.render_alpha, self.camera)
         end_mode_3d()
-        self.draw_game_hud()
+        with profiler.scope("draw_hud"):
+            self.draw_game_hud()
+        profiler.draw_overlay(self.font)
 
 
     def draw_game_hud(self):
@@ -558,8 +376,10 @@ class Game:
 
     def run(self):
         while not self.should_close:
+            ui_timers.advance(get_time())
             self.update()
             self.draw()
+            profiler.end_frame()
 
         self.cleanup()
         close_audio_device()
@@ -693,7 +513,6 @@ class Game:
         self.menu_camera.position = Vector3(cos(self.menu_camera_angle) * 10, 2.0, sin(self.menu_camera_angle) * 10)
         self.menu_camera.target = Vector3(0, 2, 0)
         
-        self.loading_timer.update()
         if not self.loading_timer:
             self.reset_game()
             self.game_state = GameState.PLAYING
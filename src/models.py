@@ -1,6 +1,62 @@
 from settings import *
 
 
+def transform_bounding_box(box, transform_matrix, size=1.0):
+    """Transforms the 8 corners of a local box and returns the axis-aligned box around them."""
+    local_corners = [
+        Vector3(box.min.x * size, box.min.y * size, box.min.z * size),
+        Vector3(box.max.x * size, box.min.y * size, box.min.z * size),
+        Vector3(box.min.x * size, box.max.y * size, box.min.z * size),
+        Vector3(box.max.x * size, box.max.y * size, box.min.z * size),
+        Vector3(box.min.x * size, box.min.y * size, box.max.z * size),
+        Vector3(box.max.x * size, box.min.y * size, box.max.z * size),
+        Vector3(box.min.x * size, box.max.y * size, box.max.z * size),
+        Vector3(box.max.x * size, box.max.y * size, box.max.z * size)
+    ]
+
+    world_corners = [vector3_transform(corner, transform_matrix) for corner in local_corners]
+
+    min_p = Vector3(min(c.x for c in world_corners), min(c.y for c in world_corners), min(c.z for c in world_corners))
+    max_p = Vector3(max(c.x for c in world_corners), max(c.y for c in world_corners), max(c.z for c in world_corners))
+
+    return BoundingBox(min_p, max_p)
+
+
+def union_bounding_boxes(boxes):
+    return BoundingBox(
+        Vector3(min(b.min.x for b in boxes), min(b.min.y for b in boxes), min(b.min.z for b in boxes)),
+        Vector3(max(b.max.x for b in boxes), max(b.max.y for b in boxes), max(b.max.z for b in boxes))
+    )
+
+
+def interpolate_transform(previous, current, alpha):
+    """Blends two rigid transforms for rendering between simulation steps: rotation is slerped, translation lerped."""
+    if alpha >= 1.0:
+        return current
+
+    rotation = quaternion_slerp(quaternion_from_matrix(previous), quaternion_from_matrix(current), alpha)
+    result = quaternion_to_matrix(rotation)
+    result.m12 = lerp(previous.m12, current.m12, alpha)
+    result.m13 = lerp(previous.m13, current.m13, alpha)
+    result.m14 = lerp(previous.m14, current.m14, alpha)
+    return result
+
+
+def check_box_against_model(box, other_model):
+    """Tests a world box against a model's world box, or against each part of a multi-box model."""
+    if hasattr(other_model, 'has_multiple_collision_boxes') and other_model.has_multiple_collision_boxes:
+        for other_box in other_model.get_world_bounding_boxes():
+            if check_collision_boxes(box, other_box):
+                return True
+        return False
+
+    other_box = other_model.get_world_bounding_box()
+    if other_box is None:
+        return False
+
+    return check_collision_boxes(box, other_box)
+
+
 class Model:
     def __init__(self, model, speed, position, direction=Vector3(), rotation_angle=0.0):
         self.model = model
@@ -18,65 +74,53 @@ class Model:
         self.has_collision = True  # for simple models
         self.has_multiple_collision_boxes = False  # for complex models
 
-    def get_world_bounding_box(self):
-        if not self.has_collision:
-            return None
+        # cached world bounds, only used once cache_world_bounds() has been called
+        self._world_bounds_key = None
+        self._world_box = None
 
-        transform_matrix = matrix_multiply(
+    def _bounds_key(self):
+        return self.position.x, self.position.y, self.position.z, self.rotation_angle, self.size
+
+    def _world_transform(self):
+        return matrix_multiply(
             matrix_rotate_y(radians(self.rotation_angle)),
             matrix_translate(self.position.x, self.position.y, self.position.z)
         )
 
-        local_corners = [
-            Vector3(self.collision_box.min.x * self.size, self.collision_box.min.y * self.size,
-                    self.collision_box.min.z * self.size),
-            Vector3(self.collision_box.max.x * self.size, self.collision_box.min.y * self.size,
-                    self.collision_box.min.z * self.size),
-            Vector3(self.collision_box.min.x * self.size, self.collision_box.max.y * self.size,
-                    self.collision_box.min.z * self.size),
-            Vector3(self.collision_box.max.x * self.size, self.collision_box.max.y * self.size,
-                    self.collision_box.min.z * self.size),
-            Vector3(self.collision_box.min.x * self.size, self.collision_box.min.y * self.size,
-                    self.collision_box.max.z * self.size),
-            Vector3(self.collision_box.max.x * self.size, self.collision_box.min.y * self.size,
-                    self.collision_box.max.z * self.size),
-            Vector3(self.collision_box.min.x * self.size, self.collision_box.max.y * self.size,
-                    self.collision_box.max.z * self.size),
-            Vector3(self.collision_box.max.x * self.size, self.collision_box.max.y * self.size,
-                    self.collision_box.max.z * self.size)
-        ]
-
-        world_corners = [vector3_transform(corner, transform_matrix) for corner in local_corners]
+    def compute_world_bounding_box(self):
+        return transform_bounding_box(self.collision_box, self._world_transform(), self.size)
 
-        min_p = Vector3(min(c.x for c in world_corners), min(c.y for c in world_corners), min(c.z for c in world_corners))
-        max_p = Vector3(max(c.x for c in world_corners), max(c.y for c in world_corners), max(c.z for c in world_corners))
+    def cache_world_bounds(self):
+        """Stores the world box so static models skip the transform until they move, rotate or resize."""
+        self._world_box = self.compute_world_bounding_box()
+        self._world_bounds_key = self._bounds_key()
 
-        return BoundingBox(min_p, max_p)
+    def restore_world_bounds(self, world_boxes):
+        """Caches world boxes computed elsewhere, e.g. loaded with a city, instead of transforming the local ones."""
+        self._world_box = world_boxes[0]
+        self._world_bounds_key = self._bounds_key()
 
-    def check_collision_with(self, other_model):
-        if not self.has_collision or not other_model.has_collision:
-            return False
+    def get_world_bounding_box(self):
+        if not self.has_collision:
+            return None
 
-        if hasattr(other_model, 'has_multiple_collision_boxes') and other_model.has_multiple_collision_boxes:
-            other_boxes = other_model.get_world_bounding_boxes()
-            my_box = self.get_world_bounding_box()
+        if self._world_bounds_key is None:
+            return self.compute_world_bounding_box()
 
-            if my_box is None:
-                return False
+        if self._world_bounds_key != self._bounds_key():
+            self.cache_world_bounds()
 
-            for other_box in other_boxes:
-                if check_collision_boxes(my_box, other_box):
-                    return True
-        else:
-            my_box = self.get_world_bounding_box()
-            other_box = other_model.get_world_bounding_box()
+        return self._world_box
 
-            if my_box is None or other_box is None:
-                return False
+    def check_collision_with(self, other_model):
+        if not self.has_collision or not other_model.has_collision:
+            return False
 
-            return check_collision_boxes(my_box, other_box)
+        my_box = self.get_world_bounding_box()
+        if my_box is None:
+            return False
 
-        return False
+        return check_box_against_model(my_box, other_model)
 
     def move(self, dt):
         self.position.x += self.speed * self.direction.x * dt
@@ -147,38 +191,35 @@ class SkycraperMultipleLayer(Model):
 
         self.has_multiple_collision_boxes = True
 
-    def get_world_bounding_boxes(self):
-        if not self.has_collision:
-            return []
+    def compute_world_bounding_boxes(self):
+        transform_matrix = self._world_transform()
+        return [transform_bounding_box(box, transform_matrix, self.size) for box in self.collision_boxes]
 
-        world_boxes = []
-        transform_matrix = matrix_multiply(
-            matrix_rotate_y(radians(self.rotation_angle)),
-            matrix_translate(self.position.x, self.position.y, self.position.z)
-        )
+    def compute_world_bounding_box(self):
+        """The union of every layer, used to register the whole footprint in the spatial grid."""
+        return union_bounding_boxes(self.compute_world_bounding_boxes())
 
-        for box in self.collision_boxes:
-            local_corners = [
-                Vector3(box.min.x * self.size, box.min.y * self.size, box.min.z * self.size),
-                Vector3(box.max.x * self.size, box.min.y * self.size, box.min.z * self.size),
-                Vector3(box.min.x * self.size, box.max.y * self.size, box.min.z * self.size),
-                Vector3(box.max.x * self.size, box.max.y * self.size, box.min.z * self.size),
-                Vector3(box.min.x * self.size, box.min.y * self.size, box.max.z * self.size),
-                Vector3(box.max.x * self.size, box.min.y * self.size, box.max.z * self.size),
-                Vector3(box.min.x * self.size, box.max.y * self.size, box.max.z * self.size),
-                Vector3(box.max.x * self.size, box.max.y * self.size, box.max.z * self.size)
-            ]
+    def cache_world_bounds(self):
+        self._world_boxes = self.compute_world_bounding_boxes()
+        self._world_box = union_bounding_boxes(self._world_boxes)
+        self._world_bounds_key = self._bounds_key()
 
-            world_corners = [vector3_transform(corner, transform_matrix) for corner in local_corners]
+    def restore_world_bounds(self, world_boxes):
+        self._world_boxes = world_boxes
+        self._world_box = union_bounding_boxes(world_boxes)
+        self._world_bounds_key = self._bounds_key()
+
+    def get_world_bounding_boxes(self):
+        if not self.has_collision:
+            return []
 
-            min_p = Vector3(min(c.x for c in world_corners), min(c.y for c in world_corners),
-                            min(c.z for c in world_corners))
-            max_p = Vector3(max(c.x for c in world_corners), max(c.y for c in world_corners),
-                            max(c.z for c in world_corners))
+        if self._world_bounds_key is None:
+            return self.compute_world_bounding_boxes()
 
-            world_boxes.append(BoundingBox(min_p, max_p))
+        if self._world_bounds_key != self._bounds_key():
+            self.cache_world_bounds()
 
-        return world_boxes
+        return self._world_boxes
 
 
 class Fog(Model):
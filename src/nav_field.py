@@ -0,0 +1,205 @@
+from settings import *
+import numpy as np
+
+
+def _shifted(grid, dz, dx, fill):
+    """Returns `grid` moved so out[..., z, x] == grid[..., z + dz, x + dx], with `fill` where that falls outside."""
+    depth, width = grid.shape[-2:]
+    out = np.full_like(grid, fill)
+    out[..., max(-dz, 0):depth - max(dz, 0), max(-dx, 0):width - max(dx, 0)] = \
+        grid[..., max(dz, 0):depth - max(-dz, 0), max(dx, 0):width - max(-dx, 0)]
+    return out
+
+
+def nearest_occupied_cells(occupied, reach):
+    """
+    Jump flooding over a stack of 2D occupancy grids.
+
+    Returns (seed_z, seed_x, distance_sqr): for every cell, the indices of the nearest occupied
+    cell in the same layer and the squared distance to it in cells. Cells with no occupied cell
+    within `reach` cells get -1 and inf. The result is approximate, like any jump flood.
+    """
+    depth, width = occupied.shape[-2:]
+    cells_z, cells_x = np.meshgrid(np.arange(depth, dtype=np.int32), np.arange(width, dtype=np.int32), indexing='ij')
+    unreachable = np.int32(np.iinfo(np.int32).max)
+
+    seed_z = np.where(occupied, cells_z, -1).astype(np.int32)
+    seed_x = np.where(occupied, cells_x, -1).astype(np.int32)
+    distance_sqr = np.where(occupied, 0, unreachable).astype(np.int32)
+
+    # steps of 2^k + ... + 1 cover up to twice the largest one, so start at the top power of two of the reach
+    step = 1 << max(int(reach).bit_length() - 1, 0)
+    steps = []
+    while step >= 1:
+        steps.append(step)
+        step //= 2
+    steps.append(1)  # one more unit pass fixes most of the jump flood's misses
+
+    for step in steps:
+        for dz in (-step, 0, step):
+            for dx in (-step, 0, step):
+                if dz == 0 and dx == 0:
+                    continue
+
+                candidate_z = _shifted(seed_z, dz, dx, -1)
+                candidate_x = _shifted(seed_x, dz, dx, -1)
+                candidate = (candidate_z - cells_z) ** 2 + (candidate_x - cells_x) ** 2
+                better = (candidate < distance_sqr) & (candidate_z >= 0)
+
+                np.copyto(seed_z, candidate_z, where=better)
+                np.copyto(seed_x, candidate_x, where=better)
+                np.copyto(distance_sqr, candidate, where=better)
+
+    distance_sqr = distance_sqr.astype(np.float32)
+    unreached = distance_sqr > reach * reach
+    seed_z[unreached] = -1
+    seed_x[unreached] = -1
+    distance_sqr[unreached] = np.inf
+    return seed_z, seed_x, distance_sqr
+
+
+class NavigationField:
+    """
+    Clearance around the city's buildings, baked for the enemy AI.
+
+    The air over a rectangle of the city is cut into horizontal layers of NAV_FIELD_LAYER_HEIGHT,
+    each a 2D grid of NAV_FIELD_CELL_SIZE cells. A cell is blocked in a layer when any building
+    box reaches into that layer over it, so tall, wide and layered buildings all keep their
+    real shape. Every cell stores its distance to the nearest blocked cell of its layer and
+    the horizontal direction away from it, or straight up inside a building. sample() looks
+    up a whole batch of positions with plain indexing.
+    """
+
+    def __init__(self, origin, cell_size, layer_height, reach, away, clearance):
+        self.origin = origin  # (x, z) of the grid corner
+        self.cell_size = cell_size
+        self.layer_height = layer_height
+        self.reach = reach
+        self.away = away  # (layers, depth, width, 3) unit vectors
+        self.clearance = clearance  # (layers, depth, width) metres, inf beyond reach
+
+    @classmethod
+    def bake(cls, box_mins, box_maxs, bounds, cell_size=NAV_FIELD_CELL_SIZE,
+             layer_height=NAV_FIELD_LAYER_HEIGHT, reach=NAV_FIELD_REACH):
+        """Bakes the field over the XZ rectangle bounds = (min_x, min_z, max_x, max_z) from (N, 3) building boxes."""
+        # the grid covers the bounds plus the reach, so every cell that repels a position
+        # inside the bounds is in it; boxes are clipped to the grid
+        low = np.array(bounds[:2], dtype=np.float64) - reach - cell_size
+        high = np.array(bounds[2:], dtype=np.float64) + reach + cell_size
+        width, depth = np.ceil((high - low) / cell_size).astype(np.int64).tolist()
+
+        near = np.all((box_maxs[:, [0, 2]] >= low) & (box_mins[:, [0, 2]] <= high), axis=1)
+        box_mins, box_maxs = box_mins[near], box_maxs[near]
+        layers = max(int(np.ceil(box_maxs[:, 1].max() / layer_height)), 1) if len(box_maxs) else 1
+
+        occupied = np.zeros((layers, depth, width), dtype=bool)
+        low_cells = np.clip(np.floor((box_mins[:, [0, 2]] - low) / cell_size), 0, None).astype(np.int64)
+        high_cells = np.floor((box_maxs[:, [0, 2]] - low) / cell_size).astype(np.int64)
+        low_layers = np.clip(np.floor(box_mins[:, 1] / layer_height), 0, layers - 1).astype(np.int64)
+        high_layers = np.clip(np.ceil(box_maxs[:, 1] / layer_height), 1, layers).astype(np.int64)
+        for (x0, z0), (x1, z1), y0, y1 in zip(low_cells.tolist(), high_cells.tolist(),
+                                              low_layers.tolist(), high_layers.tolist()):
+            occupied[y0:y1, z0:z1 + 1, x0:x1 + 1] = True
+
+        seed_z, seed_x, distance_sqr = nearest_occupied_cells(occupied, reach / cell_size)
+
+        cells_z, cells_x = np.meshgrid(np.arange(depth), np.arange(width), indexing='ij')
+        away = np.zeros((layers, depth, width, 3), dtype=np.float32)
+        away[..., 0] = np.where(seed_x >= 0, cells_x - seed_x, 0)
+        away[..., 2] = np.where(seed_z >= 0, cells_z - seed_z, 0)
+        lengths = np.sqrt(distance_sqr)
+        away /= np.where(np.isfinite(lengths) & (lengths > 0), lengths, 1.0)[..., None]
+        away[occupied] = (0.0, 1.0, 0.0)
+
+        clearance = (lengths * cell_size).astype(np.float32)
+        return cls(low.astype(np.float32), cell_size, layer_height, reach, away, clearance)
+
+    def sample(self, positions):
+        """Returns (away directions, clearances) at an (N, 3) batch of positions, inf clearance where nothing is near."""
+        layers, depth, width = self.clearance.shape
+        cells = np.floor((positions[:, [0, 2]] - self.origin) / self.cell_size).astype(np.int64)
+        layer = np.floor(positions[:, 1] / self.layer_height).astype(np.int64)
+        np.clip(layer, 0, None, out=layer)
+
+        inside = (layer < layers) & np.all((cells >= 0) & (cells < (width, depth)), axis=1)
+        away = np.zeros((len(positions), 3), dtype=np.float32)
+        clearance = np.full(len(positions), np.inf, dtype=np.float32)
+
+        layer, cell_x, cell_z = layer[inside], cells[inside, 0], cells[inside, 1]
+        away[inside] = self.away[layer, cell_z, cell_x]
+        clearance[inside] = self.clearance[layer, cell_z, cell_x]
+        return away, clearance
+
+    def get_stats(self):
+        layers, depth, width = self.clearance.shape
+        return {
+            "layers": layers,
+            "cells": layers * depth * width,
+            "blocked": int(np.count_nonzero(self.clearance == 0)),
+            "megabytes": (self.away.nbytes + self.clearance.nbytes) / 2 ** 20,
+        }
+
+
+class ChunkedNavigationField:
+    """
+    The NavigationFields of the loaded city chunks behind a single sample().
+
+    Each chunk's field covers its own square; positions are sent to the field of the chunk
+    they are in, and positions over chunks that are not loaded see nothing near.
+
+    Baking a chunk takes around 20 ms, too long to do for a whole large city up front, so a
+    loaded chunk only registers how to bake its field and the field is baked the first time a
+    position inside the chunk is sampled. Chunks nothing flies over are never baked.
+    """
+
+    def __init__(self, chunk_size=CITY_CHUNK_SIZE):
+        self.chunk_size = chunk_size
+        self.fields = {}  # (chunk_x, chunk_z) -> NavigationField
+        self.bakers = {}  # (chunk_x, chunk_z) -> function baking the field, for chunks not sampled yet
+
+    def add_chunk(self, coords, bake):
+        self.bakers[coords] = bake
+
+    def remove_chunk(self, coords):
+        self.fields.pop(coords, None)
+        self.bakers.pop(coords, None)
+
+    def get_field(self, coords):
+        """The chunk's field, baked now if this is its first use; None for chunks not loaded."""
+        field = self.fields.get(coords)
+        if field is None and coords in self.bakers:
+            field = self.fields[coords] = self.bakers.pop(coords)()
+        return field
+
+    def sample(self, positions):
+        """Returns (away directions, clearances) at an (N, 3) batch of positions, inf clearance where nothing is near."""
+        away = np.zeros((len(positions), 3), dtype=np.float32)
+        clearance = np.full(len(positions), np.inf, dtype=np.float32)
+        if len(positions) == 0 or not (self.fields or self.bakers):
+            return away, clearance
+
+        chunks = np.floor(positions[:, [0, 2]] / self.chunk_size).astype(np.int64)
+        keys, groups = np.unique(chunks, axis=0, return_inverse=True)
+        for group, key in enumerate(map(tuple, keys.tolist())):
+            field = self.get_field(key)
+            if field is None:
+                continue
+
+            rows = np.flatnonzero(groups.ravel() == group)
+            away[rows], clearance[rows] = field.sample(positions[rows])
+        return away, clearance
+
+    def clear(self):
+        self.fields.clear()
+        self.bakers.clear()
+
+    def get_stats(self):
+        stats = [field.get_stats() for field in self.fields.values()]
+        return {
+            "chunks": len(stats),
+            "unbaked": len(self.bakers),
+            "layers": max((s["layers"] for s in stats), default=0),
+            "cells": sum(s["cells"] for s in stats),
+            "blocked": sum(s["blocked"] for s in stats),
+            "megabytes": sum(s["megabytes"] for s in stats),
+        }
@@ -1,14 +1,42 @@
 from settings import *
-from models import Model
+from models import Model, check_box_against_model, interpolate_transform
 from custom_timer import Timer
+from profiler import profiler
+
+
+class PlayerControls:
+    """What the pilot does during one simulation step: read from the keyboard and mouse, or scripted when headless."""
+
+    def __init__(self, forward, thrust=0, boost=False, shooting=False, turn=0.0):
+        self.forward = forward
+        self.thrust = thrust  # 1 forward, -1 backwards, 0 to coast
+        self.boost = boost
+        self.shooting = shooting
+        self.turn = turn  # horizontal mouse movement, drives the roll
+
+    @classmethod
+    def from_devices(cls, forward, turn):
+        return cls(
+            forward,
+            thrust=int(is_key_down(KEY_W)) - int(is_key_down(KEY_S)),
+            boost=is_key_down(KEY_LEFT_SHIFT),
+            shooting=is_mouse_button_down(MOUSE_BUTTON_LEFT),
+            turn=turn
+        )
 
 
 class Player(Model):
     """Player class with its own UI and ADVANCED RADAR SYSTEM"""
 
+    serial = -1  # key of the player's box and bullets in the bullet sweep, enemy spawns count up from 1
+
     def __init__(self, model):
         super().__init__(model=model, speed=25, position=Vector3(0, 35, 0))
-        self.model.transform = matrix_identity()
+        if self.model is not None:
+            self.model.transform = matrix_identity()
+        # pose of the last two simulation steps, blended when drawing between them
+        self.transform = matrix_translate(self.position.x, self.position.y, self.position.z)
+        self.previous_transform = self.transform
 
         self.collision_box = BoundingBox(
             Vector3(-1.0, -0.5, -3.4),  # min (X/2, Z/2, Y/2)
@@ -57,6 +85,7 @@ class Player(Model):
         self.health = self.max_health
         self.position = Vector3(self.spawn_position.x, self.spawn_position.y, self.spawn_position.z)
         self.velocity = Vector3(0, 0, 0)
+        self.snap_transform()
         self.roll_angle = 0.0
         self.current_boost_time = self.max_boost_time
         self.is_boosting = False
@@ -71,6 +100,11 @@ class Player(Model):
         self.show_boost_drained_message = False
         print("[*] Player state has been reset.")
 
+    def snap_transform(self):
+        """Moves the drawn pose straight to the current position so a teleport is not blended across the map."""
+        self.transform = matrix_translate(self.position.x, self.position.y, self.position.z)
+        self.previous_transform = self.transform
+
     def take_damage(self, amount, on_death=None):
         if self.is_invulnerable or self.is_dying:
             return
@@ -100,6 +134,7 @@ class Player(Model):
 
         self.position = Vector3(self.spawn_position.x, self.spawn_position.y, self.spawn_position.z)
         self.velocity = Vector3(0, 0, 0)
+        self.snap_transform()
 
     def end_invulnerability(self):
         self.is_invulnerable = False
@@ -111,9 +146,6 @@ class Player(Model):
         if not self.is_invulnerable:
             return
 
-        self.invulnerability_timer.update()
-        self.flash_timer.update()
-
         if not self.flash_timer:
             self.is_visible = not self.is_visible
             self.flash_timer.activate()
@@ -145,7 +177,7 @@ class Player(Model):
 
         world_corners = []
         for corner in local_corners:
-            transformed_corner = vector3_transform(corner, self.model.transform)
+            transformed_corner = vector3_transform(corner, self.transform)
             world_corners.append(transformed_corner)
 
         return world_corners
@@ -171,33 +203,22 @@ class Player(Model):
             Vector3(max_x, max_y, max_z)
         )
 
-    def check_collision_with(self, other_model):
+    def check_collision_with(self, other_model, my_box=None):
+        """`my_box` lets callers testing many objects in one frame compute the player box only once."""
         if not self.has_collision or not other_model.has_collision or self.is_invulnerable or self.is_dying:
             return False
 
-        my_box = self.get_world_bounding_box()
+        if my_box is None:
+            my_box = self.get_world_bounding_box()
         if my_box is None:
             return False
 
-        if hasattr(other_model, 'has_multiple_collision_boxes') and other_model.has_multiple_collision_boxes:
-            other_boxes = other_model.get_world_bounding_boxes()
-            for other_box in other_boxes:
-                if check_collision_boxes(my_box, other_box):
-                    return True
-        else:
-            other_box = other_model.get_world_bounding_box()
-            if other_box is None:
-                return False
+        return check_box_against_model(my_box, other_model)
 
-            return check_collision_boxes(my_box, other_box)
+    def input(self, controls):
+        self.target_direction = vector3_scale(controls.forward, controls.thrust)
 
-        return False
-
-    def input(self, forward_vector):
-        move_amount = int(is_key_down(KEY_W)) - int(is_key_down(KEY_S))
-        self.target_direction = vector3_scale(forward_vector, move_amount)
-
-        if is_key_down(KEY_LEFT_SHIFT):  # just stop the player from abusing the boost
+        if controls.boost:  # just stop the player from abusing the boost
             if not self.is_boosting:
                 boost_ratio = self.current_boost_time / self.max_boost_time
                 if boost_ratio > 0.2:
@@ -205,6 +226,8 @@ class Player(Model):
         else:
             self.is_boosting = False
 
+    def handle_key_presses(self):
+        """Edge-triggered keys are read every rendered frame, a press could fall between simulation steps."""
         if is_key_pressed(KEY_TAB):
             self.radar_enhanced_mode = not self.radar_enhanced_mode
 
@@ -248,12 +271,11 @@ class Player(Model):
         if not self.show_boost_drained_message:
             return
 
-        self.boost_drained_timer.update()
-
         if not self.boost_drained_timer:
             self.end_boost_drained_message()
 
-    def update(self, dt, forward_vector, mouse_dx):
+    def update(self, dt, controls):
+        self.previous_transform = self.transform
         if self.is_dying:
             return
 
@@ -261,32 +283,35 @@ class Player(Model):
         self.update_boost_drained_message()
         self.check_fog_collision()
 
-        self.input(forward_vector)
+        self.input(controls)
         self.update_boost(dt)
         self.move(dt)
 
-        self.radar_ping_timer.update()
         self.radar_sweep_angle += dt * 90.0
         if self.radar_sweep_angle > 360:
             self.radar_sweep_angle -= 360
 
         target_roll = 0.0
         is_moving = vector3_length_sqr(self.velocity) > 1.0
-        is_turning = abs(mouse_dx) > 0.01
+        is_turning = abs(controls.turn) > 0.01
 
         if is_moving and is_turning:
-            target_roll = mouse_dx * self.TURN_TO_ROLL_RATIO
+            target_roll = controls.turn * self.TURN_TO_ROLL_RATIO
             target_roll = min(max(target_roll, -self.MAX_ROLL_ANGLE), self.MAX_ROLL_ANGLE)
 
         self.roll_angle += (target_roll - self.roll_angle) * self.ROLL_SPEED * dt
 
-        forward = vector3_normalize(self.velocity) if vector3_length_sqr(self.velocity) > 0.01 else forward_vector
+        forward = vector3_normalize(self.velocity) if vector3_length_sqr(self.velocity) > 0.01 else controls.forward
         world_up = Vector3(0, 1, 0)
 
         if abs(vector3_dot_product(forward, world_up)) > 0.9999:
-            self.model.transform.m12 = self.position.x
-            self.model.transform.m13 = self.position.y
-            self.model.transform.m14 = self.position.z
+            t = self.transform
+            self.transform = Matrix(
+                t.m0, t.m4, t.m8, self.position.x,
+                t.m1, t.m5, t.m9, self.position.y,
+                t.m2, t.m6, t.m10, self.position.z,
+                0.0, 0.0, 0.0, 1.0
+            )
         else:
             right = vector3_normalize(vector3_cross_product(forward, world_up))
             up = vector3_normalize(vector3_cross_product(right, forward))
@@ -295,15 +320,21 @@ class Player(Model):
             rolled_right = vector3_rotate_by_axis_angle(right, forward, self.roll_angle)
 
             # this matrix contains rotation and position in the world
-            self.model.transform = Matrix(
+            self.transform = Matrix(
                 rolled_right.x, rolled_up.x, -forward.x, self.position.x,
                 rolled_right.y, rolled_up.y, -forward.y, self.position.y,
                 rolled_right.z, rolled_up.z, -forward.z, self.position.z,
                 0.0, 0.0, 0.0, 1.0
             )
 
-    def draw(self):
+    def get_render_position(self, alpha=1.0):
+        previous, current = self.previous_transform, self.transform
+        return Vector3(lerp(previous.m12, current.m12, alpha), lerp(previous.m13, current.m13, alpha),
+                       lerp(previous.m14, current.m14, alpha))
+
+    def draw(self, alpha=1.0):
         if self.is_visible:
+            self.model.transform = interpolate_transform(self.previous_transform, self.transform, alpha)
             draw_model(self.model, Vector3(0, 0, 0), 1.0, WHITE)
 
     def draw_hud(self, camera_pitch, camera_yaw, is_warning_active=False, font=None,
@@ -460,10 +491,11 @@ class Player(Model):
                          Vector2(int(x_pos_hp - char_width / 2), int(y_start_hp + i * (font_size + char_spacing))),
                          font_size, 1, speedo_color)
 
-        self.draw_advanced_radar(camera_yaw, final_hud_color, enemies, font)
+        with profiler.scope("radar"):
+            self.draw_advanced_radar(camera_yaw, final_hud_color, enemies, font)
 
         if self.is_invulnerable:
-            remaining_time = self.invulnerability_timer.duration - (get_time() - self.invulnerability_timer.start_time)
+            remaining_time = self.invulnerability_timer.remaining()
             inv_text = f"INVULNERABLE: {remaining_time:.1f}s"
             text_width = measure_text_ex(font, inv_text, 20, 1).x
             draw_text_ex(font, inv_text, Vector2(center_x - text_width // 2, center_y + 80), 20, 1, PURPLE)
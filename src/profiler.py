@@ -0,0 +1,154 @@
+from settings import *
+from collections import deque
+from time import perf_counter
+
+
+class ProfileScope:
+    """Context manager that adds the time spent inside it to one named stage of the frame."""
+
+    __slots__ = ("profiler", "name", "start")
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self):
+        profiler = self.profiler
+        profiler.stage_depths.setdefault(self.name, profiler.depth)
+        profiler.depth += 1
+        self.start = perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        end = perf_counter()
+        profiler = self.profiler
+        profiler.depth -= 1
+        profiler.frame_times[self.name] = profiler.frame_times.get(self.name, 0.0) + (end - self.start)
+
+        if profiler.trace_events is not None and len(profiler.trace_events) < profiler.max_trace_events:
+            profiler.trace_events.append({
+                "name": self.name, "ph": "X", "pid": 0, "tid": 0,
+                "ts": (self.start - profiler.trace_start) * 1e6,
+                "dur": (end - self.start) * 1e6
+            })
+        return False
+
+
+class FrameProfiler:
+    """
+    Scoped per-stage timers for the game loop.
+
+    Wrap a stage in `with profiler.scope("enemies"):` and call end_frame() once per rendered
+    frame. Each stage keeps a rolling window of its per-frame milliseconds for the overlay.
+    While a trace is recording, every scope is also stored as a Chrome trace event. The file
+    opens in chrome://tracing or https://ui.perfetto.dev.
+
+    Scopes are cached per name, so a stage must not be nested inside itself.
+    """
+
+    def __init__(self, history=120, max_trace_events=500_000):
+        self.history = history
+        self.max_trace_events = max_trace_events
+
+        self.scopes = {}
+        self.frame_times = {}  # stage -> seconds spent in it this frame
+        self.stage_history = {}  # stage -> deque of per-frame milliseconds
+        self.stage_depths = {}  # stage -> nesting depth it was first seen at
+        self.frame_history = deque(maxlen=history)
+        self.depth = 0
+        self.frame_start = perf_counter()
+
+        self.visible = False
+        self.trace_events = None
+        self.trace_start = 0.0
+
+    def scope(self, name):
+        scope = self.scopes.get(name)
+        if scope is None:
+            scope = self.scopes[name] = ProfileScope(self, name)
+        return scope
+
+    def end_frame(self):
+        now = perf_counter()
+        self.frame_history.append((now - self.frame_start) * 1000)
+        self.frame_start = now
+
+        # stage_depths is filled on scope entry, so the overlay lists parents before their children
+        for name in self.stage_depths:
+            if name not in self.stage_history:
+                self.stage_history[name] = deque(maxlen=self.history)
+        for name, samples in self.stage_history.items():
+            samples.append(self.frame_times.get(name, 0.0) * 1000)
+        self.frame_times.clear()
+
+    def get_stage_stats(self):
+        """Returns {stage: (mean ms, max ms)} over the rolling window."""
+        return {name: (sum(samples) / len(samples), max(samples))
+                for name, samples in self.stage_history.items() if samples}
+
+    def toggle_overlay(self):
+        self.visible = not self.visible
+
+    @property
+    def is_tracing(self):
+        return self.trace_events is not None
+
+    def start_trace(self):
+        self.trace_events = []
+        self.trace_start = perf_counter()
+
+    def stop_trace(self, path):
+        """Writes the recorded events as a Chrome trace JSON file and stops recording."""
+        events, self.trace_events = self.trace_events, None
+        if events is None:
+            return None
+
+        with open(path, 'w') as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+        print(f"[*] Wrote {len(events)} profiler events to {path}")
+        return path
+
+    def toggle_trace(self, path):
+        if self.is_tracing:
+            return self.stop_trace(path)
+        self.start_trace()
+        return None
+
+    def draw_overlay(self, font, x=10, y=60, budget_ms=1000.0 / FPS):
+        if not self.visible or not self.stage_history:
+            return
+
+        row_height = 16
+        label_width = 170
+        bar_width = 220
+        stats = self.get_stage_stats()
+        height = (len(stats) + 2) * row_height + 10
+
+        draw_rectangle(x, y, label_width + bar_width + 70, height, fade(BLACK, 0.7))
+
+        frame_ms = sum(self.frame_history) / len(self.frame_history) if self.frame_history else 0.0
+        header = f"FRAME {frame_ms:5.2f} ms   budget {budget_ms:.1f} ms"
+        if self.is_tracing:
+            header += "   [REC]"
+        draw_text_ex(font, header, Vector2(x + 5, y + 5), 14, 1, WHITE)
+
+        # bars are the rolling mean against the frame budget, the white tick is the rolling peak
+        row_y = y + 5 + row_height * 2
+        for name, (mean_ms, max_ms) in stats.items():
+            indent = self.stage_depths.get(name, 0) * 10
+            draw_text_ex(font, f"{name}", Vector2(x + 5 + indent, row_y), 12, 1, LIGHTGRAY)
+            draw_text_ex(font, f"{mean_ms:5.2f}", Vector2(x + label_width - 40, row_y), 12, 1, LIGHTGRAY)
+
+            bar_x = x + label_width + 10
+            fill = int(min(mean_ms / budget_ms, 1.0) * bar_width)
+            bar_color = GREEN if mean_ms < budget_ms * 0.25 else (YELLOW if mean_ms < budget_ms * 0.5 else RED)
+            draw_rectangle(bar_x, row_y + 2, bar_width, row_height - 6, fade(DARKGRAY, 0.6))
+            draw_rectangle(bar_x, row_y + 2, fill, row_height - 6, bar_color)
+
+            peak_x = bar_x + int(min(max_ms / budget_ms, 1.0) * bar_width)
+            draw_rectangle(peak_x, row_y, 2, row_height - 2, WHITE)
+            row_y += row_height
+
+
+profiler = FrameProfiler()
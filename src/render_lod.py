@@ -0,0 +1,34 @@
+from settings import *
+import numpy as np
+
+
+RENDER_LOD_TIERS = ("full", "impostor")
+FULL, IMPOSTOR = range(len(RENDER_LOD_TIERS))
+
+
+def select_lod_tiers(distances, tiers, thresholds, hysteresis=LOD_HYSTERESIS):
+    """
+    Returns the render tiers for `distances`, given each one's previous tier. A tier is kept
+    while the distance stays within `hysteresis` (a fraction) of the boundary it would
+    cross, so objects hovering at a boundary do not pop between meshes.
+    """
+    thresholds = np.asarray(thresholds, dtype=np.float32)
+    lowest = np.searchsorted(thresholds * (1 + hysteresis), distances)
+    highest = np.searchsorted(thresholds * (1 - hysteresis), distances)
+    return np.clip(tiers, lowest, highest).astype(np.int8)
+
+
+def make_box_impostor(box):
+    """A 12-triangle box mesh filling the BoundingBox `box`, the far stand-in for a model."""
+    size = vector3_subtract(box.max, box.min)
+    mesh = gen_mesh_cube(size.x, size.y, size.z)
+
+    # the cube is generated around the origin, the model's box usually is not
+    vertices = np.frombuffer(ffi.buffer(mesh.vertices, mesh.vertexCount * 3 * 4), dtype=np.float32).reshape(-1, 3)
+    vertices += ((box.min.x + box.max.x) / 2, (box.min.y + box.max.y) / 2, (box.min.z + box.max.z) / 2)
+    update_mesh_buffer(mesh, 0, mesh.vertices, mesh.vertexCount * 3 * 4, 0)
+    return mesh
+
+
+def model_triangles(model):
+    return sum(model.meshes[i].triangleCount for i in range(model.meshCount))
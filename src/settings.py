@@ -4,7 +4,7 @@ from raylib import *
 from enum import Enum, auto
 from custom_timer import Timer
 from os.path import join, exists
-from math import sin, cos, radians, degrees, sqrt
+from math import sin, cos, radians, degrees, sqrt, atan2
 from random import randint, uniform, choice
 
 
@@ -25,6 +25,25 @@ def lerp(a, b, t):
 
 
 GRID_CELL_SIZE = 150.0
+AIRCRAFT_GRID_CELL_SIZE = 40.0  # moving aircraft are re-hashed every frame, so the cells stay small
+
+# navigation field baked around the buildings for the enemy AI
+NAV_FIELD_CELL_SIZE = 10.0
+NAV_FIELD_LAYER_HEIGHT = 30.0
+NAV_FIELD_REACH = 100.0  # how far from a building its cells still repel, matches the enemy avoidance range
+
+# enemy AI level of detail: near is on the player's radar, far is beyond this distance
+AI_LOD_DISTANCES = (320.0, 600.0)
+AI_LOD_STEER_INTERVALS = (1, 3, 8)  # simulation steps between steering updates, per tier
+AI_LOD_DECISION_SCALE = (1.0, 2.0, 4.0)  # multiplier of the AI decision interval, per tier
+AI_DECISION_BUDGET_MS = 0.5  # AI decisions per step stop here, the rest wait for the next step
+AI_DECISIONS_PER_STEP = 24  # the fixed cap used instead when headless, so seeded runs repeat on any machine
+
+# render level of detail: full meshes up to these camera distances, box impostors beyond. A
+# tier only changes once the distance is LOD_HYSTERESIS (a fraction) past its boundary.
+BUILDING_LOD_DISTANCES = (400.0,)
+ENEMY_LOD_DISTANCES = (250.0,)
+LOD_HYSTERESIS = 0.1
 
 MAX_AUDIO_DISTANCE = 500.0
 SPEED_OF_SOUND = 343.0
@@ -32,6 +51,9 @@ SPEED_OF_SOUND = 343.0
 TITLE = "Aftershock"
 BASE_FOV = 45.0
 BOOST_FOV = 60.0
+CAMERA_FAR_DISTANCE = 1000.0  # rlgl's default far clip plane, buildings beyond it are culled before drawing
+BULLET_TRAIL_SEGMENTS = 3  # simulation steps of past positions a bullet trail reaches back
+BULLET_TRAIL_WIDTH = 0.12
 ALTITUDE_WARNING_Y = 12.0
 CAMERA_SHAKE_INTENSITY = 0.8
 PLAYER_MAX_HEALTH = 200.0
@@ -44,10 +66,20 @@ CITY_RADIUS = 450.0
 BUILDING_COUNT = 100
 MIN_DISTANCE_FROM_CENTER = 5.0
 MIN_BUILDING_DISTANCE = 35.0
+CITY_SEED = None  # fixed seed for the city layout, None picks one per session
+CITY_CACHE_DIR = "city_cache"  # laid out cities, memory-mapped back when the same seed comes up again
+CITY_CHUNK_SIZE = 500.0  # the city is laid out, loaded and drawn in squares of this size
+CITY_STREAM_RADIUS = 1000.0  # chunks closer than this to the player are loaded
+CITY_EVICT_RADIUS = 1400.0  # and dropped again once farther than this
+CITY_CHUNK_LOADS_PER_STEP = 2
 
 SCREEN_WIDTH, SCREEN_HEIGHT = 1900, 980
 MOUSE_SENSITIVITY = 0.003
-FPS = 60
+FPS = 60  # render rate, the simulation below runs on its own fixed clock
+SIM_HZ = 60
+SIM_DT = 1.0 / SIM_HZ
+MAX_CATCH_UP_STEPS = 5  # simulation steps allowed per rendered frame before the backlog is dropped
+PROFILE_TRACE_PATH = "profile_trace.json"
 FONT_SIZE = 60
 FONT_PADDING = 20
 
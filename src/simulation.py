@@ -0,0 +1,443 @@
+from settings import *
+
+import random
+from time import perf_counter
+from player import Player, PlayerControls
+from enemy import EnemyManager
+from bullet import BulletManager, BULLET_MAX_DISTANCE
+from vfx_manager import VFXManager
+from building_manager import BuildingManager
+from spatial_grid import DynamicSpatialHash
+from custom_timer import sim_timers
+from profiler import profiler
+
+
+def spend_frame_time(accumulator, frame_time, step, max_steps=MAX_CATCH_UP_STEPS):
+    """
+    Banks a rendered frame's time and runs step() once for every whole SIM_DT in the bank, at
+    most max_steps times; step() returns False to stop early, e.g. when the game ends.
+
+    Returns (accumulator, steps run, render alpha), alpha being how far the frame sits between
+    the last two steps.
+    """
+    accumulator += frame_time
+    steps = 0
+    while accumulator >= SIM_DT and steps < max_steps:
+        keep_going = step()
+        accumulator -= SIM_DT
+        steps += 1
+        if not keep_going:
+            break
+
+    # too far behind to catch up: drop the backlog instead of spiralling into longer frames
+    if accumulator >= SIM_DT:
+        accumulator %= SIM_DT
+    return accumulator, steps, accumulator / SIM_DT
+
+
+class Simulation:
+    """
+    The gameplay world: player, enemies, bullets, buildings, collisions and scoring.
+
+    Game runs it under its window, audio and renderer. Built with headless=True it loads no
+    shaders, meshes, textures or sounds, so a scripted session can run for any number of ticks
+    on a machine without a display. Gameplay timers always follow the simulation clock: step()
+    advances sim_timers, which restarts from zero with every Simulation.
+    """
+
+    def __init__(self, models=None, headless=False):
+        self.headless = headless
+        self.sim_time = 0.0
+        sim_timers.reset(self.sim_time)
+
+        self.models = models if models is not None else {}
+        self.audio_manager = None
+
+        self.score = 0
+        self.player_lives = PLAYER_LIVES
+        self.enemies_defeated = 0
+        self.is_game_over = False
+
+        self.show_altitude_warning = False
+        self.show_boundary_warning = False
+        self.building_count = BUILDING_COUNT
+        self.city_radius = CITY_RADIUS
+        # one seed per session, so restarts rebuild the same city straight from the city cache
+        self.city_seed = CITY_SEED if CITY_SEED is not None else random.getrandbits(32)
+
+        self.player = Player(self.models.get("player"))
+
+        self.bullet_manager = BulletManager(headless=headless)
+        self.player_hash = DynamicSpatialHash(AIRCRAFT_GRID_CELL_SIZE)
+        self.building_manager = BuildingManager(self.models, headless=headless)
+        self.vfx_manager = VFXManager(headless=headless)
+        self.enemy_manager = EnemyManager(self.models, self.vfx_manager, headless=headless)
+
+        self.current_bullet_type = "normal"
+        self.shoot_cooldown = Timer(0.02)
+        self.is_shooting = False
+        self.weapon_heat = 0.0
+        self.max_weapon_heat = 8.0
+        self.heat_increase_rate = 1.0
+        self.heat_decrease_rate = 2.0
+        self.is_overheated = False
+        self.overheat_message_timer = Timer(2.0)
+        self.show_overheat_message = False
+
+
+    def reset_game(self):
+        print("[*] Resetting game state for a new game...")
+        self.score = 0
+        self.player_lives = PLAYER_LIVES
+        self.enemies_defeated = 0
+        self.is_game_over = False
+
+        self.player.reset()
+        self.bullet_manager.clear_all()
+        self.enemy_manager.clear_all()
+        self.vfx_manager.animations.clear()
+
+        self.weapon_heat = 0.0
+        self.is_overheated = False
+
+        # the play area follows the city, however large
+        self.enemy_manager.city_radius = self.city_radius
+        self.bullet_manager.max_distance = BULLET_MAX_DISTANCE + max(self.city_radius - CITY_RADIUS, 0.0)
+        self.building_manager.generate_city(self.building_count, self.city_radius, self.city_seed, self.player.position)
+
+        self.enemy_manager.spawn_enemy(Vector3(200, 60, 200), "fighter")
+        self.enemy_manager.spawn_enemy(Vector3(-150, 80, -180), "interceptor")
+        self.enemy_manager.spawn_enemy(Vector3(0, 90, -250), "bomber")
+        print(f"[*] Initial enemies spawned. Active count: {self.enemy_manager.get_enemy_count()}")
+
+
+    @property
+    def world_boundary(self):
+        """Distance from the centre past which the player takes boundary damage."""
+        return self.city_radius + 50.0
+
+
+    def play_sound_3d(self, sound_name, position, velocity, **kwargs):
+        if self.audio_manager:
+            self.audio_manager.play_sound_3d(sound_name, position, velocity, **kwargs)
+
+
+    def on_player_hit(self):
+        """Called whenever the player takes a hit, Game shakes the camera."""
+
+
+    def on_game_over(self):
+        """Called once the last life is lost."""
+
+
+    def shoot(self, position, forward_vector):
+        if self.shoot_cooldown:
+            return
+
+        shoot_direction = vector3_normalize(forward_vector)
+        offset = vector3_scale(shoot_direction, 2.5)
+        shoot_position = vector3_add(position, offset)
+
+        self.bullet_manager.add_bullet(shoot_position, shoot_direction, self.current_bullet_type, shooter=self.player)
+        self.shoot_cooldown.activate()
+
+        self.play_sound_3d(
+            'shooting',
+            self.player.position,
+            self.player.velocity,
+            base_volume=0.8,
+            pitch_variation=0.05
+        )
+
+
+    def start_overheat_message(self):
+        self.show_overheat_message = True
+        self.overheat_message_timer.activate()
+
+
+    def end_overheat_message(self):
+        self.show_overheat_message = False
+        self.overheat_message_timer.deactivate()
+
+
+    def update_overheat_message(self):
+        if not self.show_overheat_message:
+            return
+
+        if not self.overheat_message_timer:
+            self.end_overheat_message()
+
+
+    def handle_shooting(self, controls):
+        self.is_shooting = controls.shooting
+
+        if self.is_shooting and not self.shoot_cooldown and not self.is_overheated:
+            self.shoot(self.player.position, controls.forward)
+
+
+    def step(self, dt, controls):
+        """Advances the gameplay by one fixed step of `dt` seconds with the given player controls."""
+        self.sim_time += dt
+        sim_timers.advance(self.sim_time)
+
+        if not self.player.is_dying:
+            self.handle_shooting(controls)
+
+            if self.is_shooting and not self.is_overheated:
+                self.weapon_heat += self.heat_increase_rate * dt
+                if self.weapon_heat >= self.max_weapon_heat:
+                    self.weapon_heat = self.max_weapon_heat
+                    self.is_overheated = True
+                    if not self.show_overheat_message:
+                        self.start_overheat_message()
+            else:
+                self.weapon_heat -= self.heat_decrease_rate * dt
+                if self.weapon_heat < 0:
+                    self.weapon_heat = 0
+                if self.is_overheated and self.weapon_heat <= 0:
+                    self.is_overheated = False
+
+            with profiler.scope("player"):
+                self.player.update(dt, controls)
+
+        with profiler.scope("city_streaming"):
+            self.building_manager.update_streaming(self.player.position)
+
+        spatial_grid = self.building_manager.get_spatial_grid()
+        with profiler.scope("bullets"):
+            self.bullet_manager.update(dt, spatial_grid)
+        with profiler.scope("vfx"):
+            self.vfx_manager.update(dt)
+
+        with profiler.scope("enemies"):
+            score_gain, enemies_killed, defeated_info = self.enemy_manager.update(dt, self.player.position, self.building_manager.get_nav_field(), self.bullet_manager, self.audio_manager)
+        self.score += score_gain
+        self.enemies_defeated += enemies_killed
+
+        for info in defeated_info:
+            self.play_sound_3d('enemy_explosions', info['position'], info['velocity'])
+
+        with profiler.scope("collisions"):
+            self.check_player_bullet_collisions()
+            self.check_collisions()
+        self.check_player_bounds(dt)
+
+        altitude_warning_active = self.player.position.y <= ALTITUDE_WARNING_Y and not self.player.is_invulnerable and not self.player.is_dying
+        self.show_altitude_warning = altitude_warning_active
+
+
+    def check_collisions(self):
+        if self.player.is_dying:
+            return False
+
+        player_box = self.player.get_world_bounding_box()
+        if player_box is None:
+            return False
+
+        # only buildings whose footprint overlaps the player box are narrow-phase tested
+        nearby_buildings = self.building_manager.get_spatial_grid().query_aabb(player_box.min, player_box.max)
+        for obj in nearby_buildings:
+            if self.player.check_collision_with(obj, my_box=player_box):
+                self.handle_collision(obj)
+                return True
+
+        for enemy in self.enemy_manager.get_enemies():
+            if self.player.check_collision_with(enemy, my_box=player_box):
+                self.handle_enemy_collision(enemy)
+                return True
+
+        return False
+
+
+    def check_player_bullet_collisions(self):
+        if self.player.is_invulnerable or self.player.is_dying:
+            return
+
+        player_box = self.player.get_world_bounding_box()
+        if player_box is None:
+            return
+
+        self.player_hash.rebuild([(player_box.min.x, player_box.min.y, player_box.min.z)],
+                                 [(player_box.max.x, player_box.max.y, player_box.max.z)], [self.player.serial])
+        bullet_indices, _, impacts = self.bullet_manager.sweep_hits(self.player_hash)
+        # the player takes one hit per frame, the earliest one along the bullet paths
+        if len(bullet_indices):
+            x, y, z = impacts[0].tolist()
+            damage_dealt = self.bullet_manager.on_hit(int(bullet_indices[0]), self.player)
+            self.player.take_damage(damage_dealt, on_death=self.player_death_callback)
+            self.on_player_hit()
+            self.vfx_manager.create_explosion(Vector3(x, y, z), "explosion_air01", scale=3.0)
+
+
+    def handle_collision(self, collided_object):
+        if self.player.is_invulnerable:
+            return
+
+        self.vfx_manager.create_explosion(self.player.position, "explosion_air01")
+        self.on_player_hit()
+        self.play_sound_3d('player_explosion', self.player.position, self.player.velocity, base_volume=0.9)
+
+        is_fatal = (self.player.health - 25) <= 0
+        self.player.take_damage(25, on_death=self.player_death_callback)
+
+        if not is_fatal:
+            if hasattr(collided_object, 'has_multiple_collision_boxes') and collided_object.has_multiple_collision_boxes:
+                collision_part = self.identify_collision_part(collided_object)
+                collision_reason = f"building collision - {collision_part}"
+            else:
+                collision_reason = "building collision"
+
+            self.player.start_invulnerability(collision_reason)
+
+
+    def handle_enemy_collision(self, enemy):
+        if self.player.is_invulnerable:
+            return
+
+        player_damage = 40
+        enemy_damage = 60
+
+        self.vfx_manager.create_explosion(self.player.position, "explosion_air02")
+        self.on_player_hit()
+        self.play_sound_3d('player_explosion', self.player.position, self.player.velocity, base_volume=1.0)
+
+        is_fatal = (self.player.health - player_damage) <= 0
+        self.player.take_damage(player_damage, on_death=self.player_death_callback)
+        enemy.take_damage(enemy_damage)
+
+        if not is_fatal:
+            self.player.start_invulnerability("enemy collision")
+
+
+    def player_death_callback(self):
+        self.player_lives -= 1
+        self.play_sound_3d('player_explosion', self.player.position, self.player.velocity, base_volume=1.2)
+        if self.player_lives > 0:
+            self.vfx_manager.create_explosion(
+                self.player.position,
+                "explosion_air01",
+                on_finish=self.player.respawn
+            )
+        else:
+            self.vfx_manager.create_explosion(self.player.position, "explosion_air01")
+            self.is_game_over = True
+            self.on_game_over()
+
+
+    def identify_collision_part(self, building):
+        if not hasattr(building, 'get_world_bounding_boxes'):
+            return "building"
+
+        player_box = self.player.get_world_bounding_box()
+        if not player_box:
+            return "building"
+
+        boxes = building.get_world_bounding_boxes()
+        parts = ["BASE (Y: -5 to 67.6)", "SECOND FLOOR (Y: 67.6 to 94.0)", "ANTENNA (Y: 94.0 to 128.9)"]
+
+        for i, box in enumerate(boxes):
+            if check_collision_boxes(player_box, box):
+                return parts[i] if i < len(parts) else f"part {i + 1}"
+
+        return "building"
+
+
+    def check_player_bounds(self, dt):
+        distance_from_center = sqrt(self.player.position.x ** 2 + self.player.position.z ** 2)
+
+        if distance_from_center > self.world_boundary:
+            self.show_boundary_warning = True
+
+            distance_out = distance_from_center - self.world_boundary
+            damage_per_second = BOUNDARY_DAMAGE_START + (distance_out * BOUNDARY_DAMAGE_SCALING)
+            damage_to_apply = damage_per_second * dt
+
+            self.player.take_damage(damage_to_apply, on_death=self.player_death_callback)
+        else:
+            self.show_boundary_warning = False
+
+
+class ScriptedPilot:
+    """
+    Stand-in for the player's hands in headless runs: flies at the nearest enemy, firing in
+    bursts and boosting now and then, or circles the city at half its radius, over the rooftops,
+    when the sky is empty. With hunt=False it ignores the enemies and only circles, touring the city.
+    """
+
+    def __init__(self, burst_ticks=30, pause_ticks=20, boost_every=300, break_off_distance=60.0, hunt=True,
+                 cruise_altitude=150.0):
+        self.hunt = hunt
+        self.cruise_altitude = cruise_altitude
+        self.break_off_distance = break_off_distance
+        self.burst_ticks = burst_ticks
+        self.pause_ticks = pause_ticks
+        self.boost_every = boost_every
+
+    def controls(self, tick, simulation):
+        player = simulation.player
+        enemies = simulation.enemy_manager.get_enemies() if self.hunt else []
+
+        if enemies:
+            target = min(enemies, key=lambda enemy: vector3_distance(player.position, enemy.position)).position
+            forward = vector3_normalize(vector3_subtract(target, player.position))
+            # break off before ramming it
+            if vector3_distance(player.position, target) < self.break_off_distance:
+                forward = vector3_normalize(Vector3(-forward.x, 0.6, -forward.z))
+        else:
+            # head for a point on the orbit a little ahead of the player's bearing
+            orbit = simulation.city_radius / 2
+            angle = atan2(player.position.z, player.position.x) + 0.3
+            heading = vector3_normalize(Vector3(cos(angle) * orbit - player.position.x, 0.0,
+                                                sin(angle) * orbit - player.position.z))
+            climb = min(max((self.cruise_altitude - player.position.y) / 30.0, -0.5), 1.0)
+            forward = vector3_normalize(Vector3(heading.x, climb, heading.z))
+
+        # stay out of the fog and inside the battlefield
+        if player.position.y < ALTITUDE_WARNING_Y * 2:
+            forward = vector3_normalize(Vector3(forward.x, 0.5, forward.z))
+        if sqrt(player.position.x ** 2 + player.position.z ** 2) > simulation.city_radius:
+            forward = vector3_normalize(Vector3(-player.position.x, 0.0, -player.position.z))
+
+        shooting = tick % (self.burst_ticks + self.pause_ticks) < self.burst_ticks
+        boost = tick % self.boost_every < self.boost_every // 5
+        return PlayerControls(forward, thrust=1, boost=boost, shooting=shooting, turn=0.0)
+
+
+def run_headless(ticks, seed=40, dt=SIM_DT, pilot=None):
+    """Builds a headless world and runs it for `ticks` fixed steps, stopping early on game over."""
+    random.seed(seed)
+    simulation = Simulation(headless=True)
+    simulation.reset_game()
+    pilot = pilot or ScriptedPilot()
+
+    start = perf_counter()
+    tick = 0
+    while tick < ticks and not simulation.is_game_over:
+        simulation.step(dt, pilot.controls(tick, simulation))
+        tick += 1
+    elapsed = perf_counter() - start
+
+    return {
+        "ticks": tick,
+        "sim_seconds": tick * dt,
+        "wall_seconds": elapsed,
+        "speedup": tick * dt / elapsed if elapsed > 0 else 0.0,
+        "score": simulation.score,
+        "enemies_defeated": simulation.enemies_defeated,
+        "lives": simulation.player_lives,
+        "enemies": simulation.enemy_manager.get_enemy_count(),
+        "bullets": simulation.bullet_manager.get_bullet_count(),
+        "enemy_pool": simulation.enemy_manager.get_pool_stats(),
+        "game_over": simulation.is_game_over,
+    }
+
+
+if __name__ == '__main__':
+    from argparse import ArgumentParser
+
+    parser = ArgumentParser(description="Run the game simulation without a window, audio or rendering.")
+    parser.add_argument("--ticks", type=int, default=SIM_HZ * 60, help="fixed steps to simulate")
+    parser.add_argument("--seed", type=int, default=40)
+    args = parser.parse_args()
+
+    print(json.dumps(run_headless(args.ticks, seed=args.seed), indent=2))
@@ -1,19 +1,29 @@
 from settings import *
 from collections import defaultdict
+import numpy as np
+
+
+# key of boxes that belong to no aircraft: no bullet carries it, as the player's are -1 and unowned bullets 0
+NO_KEY = -2
 
 
 class SpatialGrid:
     """
     Manages a 2D spatial grid on the XZ plane for efficient collision detection.
-    
+
     Objects are placed into grid cells based on their world position. When checking for collisions,
     we only need to test against objects within the same grid cell, drastically reducing
     the number of checks required per frame.
+
+    Range queries (radius and AABB) visit every cell the query area touches and return each
+    object once, filtered against the XZ footprint stored when the object was added.
     """
 
     def __init__(self, cell_size):
         self.cell_size = cell_size
         self.grid = defaultdict(list)
+        self.footprints = {}  # id(obj) -> (min_x, min_z, max_x, max_z)
+        self.cell_boxes = {}  # cell -> packed world boxes, built on first use
 
     def _get_cell_coords(self, position):
         return (
@@ -21,6 +31,12 @@ class SpatialGrid:
             int(position.z // self.cell_size)
         )
 
+    def _get_cell_range(self, min_x, min_z, max_x, max_z):
+        return (
+            int(min_x // self.cell_size), int(min_z // self.cell_size),
+            int(max_x // self.cell_size), int(max_z // self.cell_size)
+        )
+
     def add_object(self, obj):
         aabb = obj.get_world_bounding_box()
         if not aabb:
@@ -32,10 +48,203 @@ class SpatialGrid:
         for x in range(min_coords[0], max_coords[0] + 1):
             for z in range(min_coords[1], max_coords[1] + 1):
                 self.grid[(x, z)].append(obj)
+                self.cell_boxes.pop((x, z), None)
+
+        self.footprints[id(obj)] = (aabb.min.x, aabb.min.z, aabb.max.x, aabb.max.z)
+
+    def remove_object(self, obj):
+        """Takes an object out of every cell it was added to, e.g. when its city chunk is evicted."""
+        footprint = self.footprints.pop(id(obj), None)
+        if footprint is None:
+            return
+
+        cell_min_x, cell_min_z, cell_max_x, cell_max_z = self._get_cell_range(*footprint)
+        for x in range(cell_min_x, cell_max_x + 1):
+            for z in range(cell_min_z, cell_max_z + 1):
+                cell = self.grid.get((x, z))
+                if cell is None:
+                    continue
+
+                cell.remove(obj)
+                if not cell:
+                    del self.grid[(x, z)]
+                self.cell_boxes.pop((x, z), None)
 
     def get_potential_colliders(self, position):
         cell_coords = self._get_cell_coords(position)
-        return self.grid[cell_coords]
+        return self.grid.get(cell_coords, [])
+
+    def get_cell_boxes(self, cell):
+        """
+        Returns (objects, box_mins, box_maxs, owners) for a cell, or None when it is empty.
+
+        Every world box of every object in the cell is packed into (N, 3) arrays so batches of
+        points can be tested against the whole cell at once; owners[i] indexes into objects.
+        """
+        cached = self.cell_boxes.get(cell)
+        if cached is not None:
+            return cached
+
+        objects = self.grid.get(cell)
+        if not objects:
+            return None
+
+        mins, maxs, owners = [], [], []
+        for i, obj in enumerate(objects):
+            if getattr(obj, 'has_multiple_collision_boxes', False):
+                boxes = obj.get_world_bounding_boxes()
+            else:
+                boxes = [obj.get_world_bounding_box()]
+
+            for box in boxes:
+                mins.append((box.min.x, box.min.y, box.min.z))
+                maxs.append((box.max.x, box.max.y, box.max.z))
+                owners.append(i)
+
+        cached = (objects, np.array(mins, dtype=np.float32), np.array(maxs, dtype=np.float32),
+                  np.array(owners, dtype=np.int32))
+        self.cell_boxes[cell] = cached
+        return cached
+
+    def _collect(self, min_x, min_z, max_x, max_z, accept):
+        """Gathers unique objects from every cell in the range whose footprint passes `accept`."""
+        cell_min_x, cell_min_z, cell_max_x, cell_max_z = self._get_cell_range(min_x, min_z, max_x, max_z)
+
+        results = []
+        seen = set()
+        for x in range(cell_min_x, cell_max_x + 1):
+            for z in range(cell_min_z, cell_max_z + 1):
+                cell = self.grid.get((x, z))
+                if not cell:
+                    continue
+
+                for obj in cell:
+                    key = id(obj)
+                    if key in seen:
+                        continue
+                    seen.add(key)
+
+                    if accept(self.footprints[key]):
+                        results.append(obj)
+
+        return results
+
+    def query_aabb(self, min_point, max_point):
+        """Returns every object whose XZ footprint overlaps the box, each one only once."""
+        min_x, min_z = min_point.x, min_point.z
+        max_x, max_z = max_point.x, max_point.z
+
+        def overlaps(footprint):
+            return (footprint[0] <= max_x and footprint[2] >= min_x and
+                    footprint[1] <= max_z and footprint[3] >= min_z)
+
+        return self._collect(min_x, min_z, max_x, max_z, overlaps)
+
+    def query_radius(self, position, radius):
+        """Returns every object whose XZ footprint lies within `radius` of the position."""
+        px, pz = position.x, position.z
+        radius_sqr = radius * radius
+
+        def in_range(footprint):
+            # closest point of the footprint rectangle to the query centre
+            dx = max(footprint[0] - px, 0.0, px - footprint[2])
+            dz = max(footprint[1] - pz, 0.0, pz - footprint[3])
+            return dx * dx + dz * dz <= radius_sqr
+
+        return self._collect(px - radius, pz - radius, px + radius, pz + radius, in_range)
 
     def clear(self):
-        self.grid.clear()
\ No newline at end of file
+        self.grid.clear()
+        self.footprints.clear()
+        self.cell_boxes.clear()
+
+
+class DynamicSpatialHash:
+    """
+    Uniform hash of moving boxes on the XZ plane, rebuilt from scratch once per frame.
+
+    Every box is registered in each cell it overlaps as an (int64 cell key, box index) entry
+    sorted by key, so a whole batch of query boxes can be matched against it with one
+    searchsorted instead of testing every query against every box.
+
+    Each box can carry an int64 key, such as the serial of the aircraft it belongs to; boxes
+    rebuilt without keys get NO_KEY.
+    """
+
+    def __init__(self, cell_size):
+        self.cell_size = cell_size
+        self.box_mins = np.zeros((0, 3), dtype=np.float32)
+        self.box_maxs = np.zeros((0, 3), dtype=np.float32)
+        self.keys = np.zeros(0, dtype=np.int64)
+        self.entry_keys = np.zeros(0, dtype=np.int64)
+        self.entry_boxes = np.zeros(0, dtype=np.int64)
+
+    def _cell_coords(self, points):
+        return np.floor(points[:, [0, 2]] / self.cell_size).astype(np.int64)
+
+    @staticmethod
+    def _cell_keys(cells_x, cells_z):
+        return (cells_x << 32) + cells_z
+
+    def _expand_cells(self, lows, highs):
+        """Returns (owners, keys) with one entry for every cell each box in the batch covers."""
+        low_cells = self._cell_coords(lows)
+        spans = self._cell_coords(highs) - low_cells
+        if len(spans) == 0:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+
+        # boxes are small next to the cells, so this is one or two passes per axis
+        owners, keys = [], []
+        for offset_x in range(int(spans[:, 0].max()) + 1):
+            for offset_z in range(int(spans[:, 1].max()) + 1):
+                covered = np.flatnonzero((spans[:, 0] >= offset_x) & (spans[:, 1] >= offset_z))
+                owners.append(covered)
+                keys.append(self._cell_keys(low_cells[covered, 0] + offset_x, low_cells[covered, 1] + offset_z))
+
+        return np.concatenate(owners), np.concatenate(keys)
+
+    def rebuild(self, box_mins, box_maxs, keys=None):
+        self.box_mins = np.asarray(box_mins, dtype=np.float32).reshape(-1, 3)
+        self.box_maxs = np.asarray(box_maxs, dtype=np.float32).reshape(-1, 3)
+        if keys is None:
+            self.keys = np.full(len(self.box_mins), NO_KEY, dtype=np.int64)
+        else:
+            self.keys = np.asarray(keys, dtype=np.int64)
+
+        owners, keys = self._expand_cells(self.box_mins, self.box_maxs)
+        order = np.argsort(keys, kind='stable')
+        self.entry_keys = keys[order]
+        self.entry_boxes = owners[order]
+
+    def query_pairs(self, lows, highs):
+        """
+        Matches a batch of N query boxes against the hashed boxes.
+
+        Returns (query_indices, box_indices) for every pair whose boxes overlap, each pair once.
+        """
+        empty = np.zeros(0, dtype=np.int64)
+        if len(self.entry_keys) == 0 or len(lows) == 0:
+            return empty, empty
+
+        owners, keys = self._expand_cells(lows, highs)
+        first = np.searchsorted(self.entry_keys, keys, side='left')
+        last = np.searchsorted(self.entry_keys, keys, side='right')
+        counts = last - first
+        total = int(counts.sum())
+        if total == 0:
+            return empty, empty
+
+        # flatten the [first, last) entry ranges of every query cell into one pair list
+        rows = np.repeat(owners, counts)
+        range_starts = np.repeat(first - (np.cumsum(counts) - counts), counts)
+        cols = self.entry_boxes[np.arange(total) + range_starts]
+
+        # a pair sharing several cells shows up once per shared cell
+        pair_keys = np.unique(rows * len(self.box_mins) + cols)
+        rows, cols = np.divmod(pair_keys, len(self.box_mins))
+
+        overlap = np.all((lows[rows] <= self.box_maxs[cols]) & (highs[rows] >= self.box_mins[cols]), axis=1)
+        return rows[overlap], cols[overlap]
+
+    def __len__(self):
+        return len(self.box_mins)
@@ -40,9 +40,10 @@ class Animation:
 class VFXManager:
     """Manages all visual effects, such as explosion animations."""
 
-    def __init__(self):
+    def __init__(self, headless=False):
         self.animations = []
         self.animation_frames = defaultdict(list)
+        self.headless = headless
         self.load_animations()
 
     def load_animations(self):
@@ -60,7 +61,8 @@ class VFXManager:
             try:
                 files = sorted([f for f in listdir(path) if f.endswith('.png')])
                 for filename in files:
-                    texture = load_texture(join(path, filename))
+                    # headless runs keep one empty frame per file, so animations last as long as in game
+                    texture = None if self.headless else load_texture(join(path, filename))
                     self.animation_frames[name].append(texture)
                 print(f"[*] Loaded {len(self.animation_frames[name])} frames for '{name}'")
             except Exception as e:
@@ -106,4 +108,5 @@ class VFXManager:
         print("[*] Unloading VFX textures...")
         for frame_list in self.animation_frames.values():
             for texture in frame_list:
-                unload_texture(texture)
\ No newline at end of file
+                if texture is not None:
+                    unload_texture(texture)
\ No newline at end of file
@@ -0,0 +1,65 @@
+from settings import *
+from building_manager import BuildingManager
+import numpy as np
+
+
+SEED = 40
+COUNT, RADIUS = 400, 900.0
+
+# Matrix fields in memory order, as packed into the instance buffers
+MATRIX_FIELDS = [f"m{column * 4 + row}" for row in range(4) for column in range(4)]
+
+
+def generate(center=Vector3(0, 0, 0), stream_radius=CITY_STREAM_RADIUS, evict_radius=CITY_EVICT_RADIUS):
+    building_manager = BuildingManager({}, headless=True)
+    building_manager.stream_radius, building_manager.evict_radius = stream_radius, evict_radius
+    building_manager.generate_city(COUNT, RADIUS, SEED, center)
+    return building_manager
+
+
+def test_chunk_loads_are_counted_once_by_source(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+
+    cold = generate()
+    stats = cold.get_chunk_stats()
+    assert not cold.city_cached
+    assert stats["generated"] == stats["loaded"] and stats["cached"] == 0
+
+    warm = generate()
+    stats = warm.get_chunk_stats()
+    assert warm.city_cached
+    assert stats["cached"] == stats["loaded"] and stats["generated"] == 0
+
+
+def test_eviction_drops_only_the_evicted_chunks_buildings(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    building_manager = generate(Vector3(-RADIUS, 0, -RADIUS), stream_radius=400.0, evict_radius=600.0)
+    near_corner = set(building_manager.chunks)
+
+    building_manager.update_streaming(Vector3(RADIUS, 0, RADIUS), max_loads=None)
+    assert building_manager.get_chunk_stats()["evicted"] >= len(near_corner)
+    assert not near_corner & set(building_manager.chunks)
+
+    kept = building_manager.get_collision_objects()
+    assert building_manager.get_building_count() == len(kept)
+    grid = building_manager.get_spatial_grid()
+    found = grid.query_aabb(Vector3(-RADIUS, -50, -RADIUS), Vector3(RADIUS, 500, RADIUS))
+    assert {id(obj) for obj in found} == {id(obj) for obj in kept}
+
+
+def test_packed_instance_matrices_match_each_buildings_transform(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    building_manager = generate()
+    checked = 0
+    for chunk in building_manager.chunks.values():
+        # headless managers never instance, so pack the way a windowed one does on load
+        chunk.pack_transforms()
+        for building_type, buildings in chunk.building_data.items():
+            assert len(chunk.matrices[building_type]) == len(buildings)
+            for packed, building in zip(chunk.matrices[building_type], buildings):
+                position = building.position
+                expected = matrix_multiply(matrix_rotate_y(radians(building.rotation_angle)),
+                                           matrix_translate(position.x, position.y, position.z))
+                assert np.allclose(packed, [getattr(expected, field) for field in MATRIX_FIELDS], atol=1e-3)
+                checked += 1
+    assert checked == building_manager.get_building_count()
@@ -0,0 +1,65 @@
+from settings import *
+from bullet import BulletManager, BULLET_TYPE_NAMES, BULLET_TYPE_INDEX
+from spatial_grid import DynamicSpatialHash
+import numpy as np
+
+
+def fill(bullet_manager):
+    return [bullet_manager.add_bullet(Vector3(0, 50, 0), Vector3(1, 0, 0)) for _ in range(bullet_manager.max_bullets)]
+
+
+def test_hit_bullet_slot_is_reused_at_the_cap():
+    bullet_manager = BulletManager(max_bullets=4, headless=True)
+    slots = fill(bullet_manager)
+
+    bullet_manager.on_hit(slots[2], None)
+    assert bullet_manager.add_bullet(Vector3(0, 50, 0), Vector3(1, 0, 0)) == slots[2]
+    assert bullet_manager.evictions == 0
+
+
+def test_expired_bullet_slot_is_freed_by_update():
+    bullet_manager = BulletManager(max_bullets=4, headless=True)
+    slots = fill(bullet_manager)
+    bullet_manager.lifetimes[slots[1]] = SIM_DT / 2
+
+    bullet_manager.update(SIM_DT)
+    assert bullet_manager.get_bullet_count() == 3
+    assert bullet_manager.add_bullet(Vector3(0, 50, 0), Vector3(1, 0, 0)) == slots[1]
+    assert bullet_manager.evictions == 0
+
+
+def test_full_pool_of_live_bullets_evicts_the_oldest():
+    bullet_manager = BulletManager(max_bullets=4, headless=True)
+    slots = fill(bullet_manager)
+
+    assert bullet_manager.add_bullet(Vector3(0, 50, 0), Vector3(1, 0, 0)) == slots[0]
+    assert bullet_manager.evictions == 1
+
+
+def test_unowned_bullet_hits_a_box_rebuilt_without_keys():
+    bullet_manager = BulletManager(max_bullets=4, headless=True)
+    bullet_manager.add_bullet(Vector3(0, 50, 0), Vector3(1, 0, 0))
+    bullet_manager.update(SIM_DT)
+
+    spatial_hash = DynamicSpatialHash(50.0)
+    spatial_hash.rebuild([(0.5, 45, -5)], [(1.0, 55, 5)])
+    bullets, targets, _ = bullet_manager.sweep_hits(spatial_hash)
+    assert bullets.tolist() == [0] and targets.tolist() == [0]
+
+
+def test_removed_bullets_leave_the_others_untouched():
+    bullet_manager = BulletManager(max_bullets=8, headless=True)
+    directions = [Vector3(1, 0, 0), Vector3(0, 0, 1), Vector3(-1, 0, 0), Vector3(0, 0, -1)]
+    slots = [bullet_manager.add_bullet(Vector3(0, 50, 0), direction, bullet_type)
+             for direction, bullet_type in zip(directions, BULLET_TYPE_NAMES * 2)]
+    bullet_manager.lifetimes[slots[0]] = SIM_DT / 2
+    bullet_manager.on_hit(slots[2], None)
+
+    bullet_manager.update(SIM_DT)
+    assert bullet_manager.get_bullet_count() == 2
+    for i in (1, 3):
+        slot, direction = slots[i], directions[i]
+        assert bullet_manager.active[slot]
+        assert bullet_manager.types[slot] == BULLET_TYPE_INDEX[(BULLET_TYPE_NAMES * 2)[i]]
+        expected = np.array([0, 50, 0]) + np.array([direction.x, direction.y, direction.z]) * bullet_manager.speeds[slot] * SIM_DT
+        assert np.allclose(bullet_manager.positions[slot], expected)
@@ -0,0 +1,54 @@
+from settings import *
+import bullet
+from bullet import BulletManager, BULLET_TYPE_NAMES
+import numpy as np
+
+
+class FakeShader:
+    locs = {SHADER_LOC_VECTOR_VIEW: 0}
+
+
+def instanced_bullets(monkeypatch, failing_type):
+    """A headless pool set up for the instanced path, whose draw of `failing_type` fails like a broken driver."""
+    bullet_manager = BulletManager(max_bullets=8, headless=True)
+    for i in range(6):
+        bullet_manager.add_bullet(Vector3(i, 50, 0), Vector3(1, 0, 0), BULLET_TYPE_NAMES[i % 2])
+
+    bullet_manager.render_path = "instanced"
+    # patched, so the pool is back to no shader and no mesh before __del__ unloads them
+    monkeypatch.setattr(bullet_manager, "shader", FakeShader())
+    bullet_manager.materials = {name: name for name in BULLET_TYPE_NAMES}
+    bullet_manager.camera_position = ffi.new('float[3]')
+    bullet_manager.instance_buffer = ffi.new('Matrix[]', bullet_manager.max_bullets)
+    bullet_manager.instance_matrices = np.frombuffer(ffi.buffer(bullet_manager.instance_buffer),
+                                                     dtype=np.float32).reshape(-1, 16)
+
+    drawn = {"instanced": [], "batched": []}
+
+    def draw_mesh_instanced(mesh, material, transforms, count):
+        if material == failing_type:
+            raise RuntimeError("instancing unsupported")
+        drawn["instanced"].append((material, count))
+
+    monkeypatch.setattr(bullet, "draw_mesh_instanced", draw_mesh_instanced)
+    monkeypatch.setattr(bullet, "set_shader_value", lambda *args: None)
+    monkeypatch.setattr(bullet_manager, "bullet_mesh", None, raising=False)
+    monkeypatch.setattr(bullet_manager, "draw_trails", lambda *args: None)
+    monkeypatch.setattr(bullet_manager, "draw_batched", lambda camera, indices, positions:
+                        drawn["batched"].append(sorted(indices.tolist())))
+    return bullet_manager, drawn
+
+
+def test_failed_instanced_draw_falls_back_to_batched_for_good(monkeypatch):
+    camera = Camera3D(Vector3(0, 60, 30), Vector3(0, 50, 0), Vector3(0, 1, 0), 60, CAMERA_PERSPECTIVE)
+    bullet_manager, drawn = instanced_bullets(monkeypatch, failing_type=BULLET_TYPE_NAMES[1])
+
+    bullet_manager.draw(camera)
+    assert drawn["instanced"] == [(BULLET_TYPE_NAMES[0], 3)]
+    # the bullets the failed call would have drawn still reach the screen this frame
+    assert drawn["batched"] == [[1, 3, 5]]
+    assert bullet_manager.get_render_stats()["path"] == "batched"
+
+    bullet_manager.draw(camera)
+    assert len(drawn["instanced"]) == 1
+    assert drawn["batched"][-1] == list(range(6))
@@ -0,0 +1,50 @@
+from settings import *
+from bullet import BulletManager
+from spatial_grid import SpatialGrid, DynamicSpatialHash
+import numpy as np
+
+
+class Wall:
+    def __init__(self, low, high):
+        self.box = BoundingBox(Vector3(*low), Vector3(*high))
+
+    def get_world_bounding_box(self):
+        return self.box
+
+
+def fast_bullet(spatial_grid=None):
+    """One bullet fired along +X at 6000 m/s, so a single step carries it 100 m past thin boxes."""
+    bullet_manager = BulletManager(max_bullets=4, headless=True)
+    slot = bullet_manager.add_bullet(Vector3(0, 50, 0), Vector3(1, 0, 0))
+    bullet_manager.speeds[slot] = 100.0 / SIM_DT
+    bullet_manager.update(SIM_DT, spatial_grid)
+    return bullet_manager, slot
+
+
+def thin_boxes(xs):
+    spatial_hash = DynamicSpatialHash(AIRCRAFT_GRID_CELL_SIZE)
+    spatial_hash.rebuild([(x, 45, -5) for x in xs], [(x + 0.5, 55, 5) for x in xs], np.arange(1, len(xs) + 1))
+    return spatial_hash
+
+
+def test_fast_bullet_hits_the_first_thin_box_on_its_path():
+    bullet_manager, slot = fast_bullet()
+    assert bullet_manager.positions[slot][0] > 99.0
+
+    bullets, targets, impacts = bullet_manager.sweep_hits(thin_boxes([70.0, 30.0]))
+    assert bullets.tolist() == [slot] and targets.tolist() == [1]
+    half_extent = bullet_manager.get_half_extents(np.array([slot]))[0]
+    assert abs(impacts[0][0] - (30.0 - half_extent)) < 1e-3
+
+
+def test_wall_stops_the_sweep_only_behind_it():
+    grid = SpatialGrid(GRID_CELL_SIZE)
+    grid.add_object(Wall((60, 0, -20), (61, 100, 20)))
+    bullet_manager, slot = fast_bullet(grid)
+    assert not bullet_manager.active[slot]
+
+    bullets, _, _ = bullet_manager.sweep_hits(thin_boxes([80.0]))
+    assert len(bullets) == 0
+
+    bullets, _, _ = bullet_manager.sweep_hits(thin_boxes([30.0]))
+    assert bullets.tolist() == [slot]
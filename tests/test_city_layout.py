@@ -0,0 +1,77 @@
+from settings import *
+import city_layout
+from city_layout import generate_chunk_layout, chunk_bounds, load_chunk_layout, chunk_cache_path
+import numpy as np
+
+
+SEED = 40
+# far more buildings than fit, so every chunk is packed as tightly as the sampler can
+COUNT, RADIUS = 20000, 1000.0
+CHUNKS = [(-1, -1), (-1, 0), (0, -1), (0, 0)]
+
+
+def sites(chunk):
+    return generate_chunk_layout(chunk, COUNT, RADIUS, SEED)["position"][:, [0, 2]].astype(np.float64)
+
+
+def min_pair_distance(points):
+    gaps = np.linalg.norm(points[:, None, :] - points[None, :, :], axis=2)
+    np.fill_diagonal(gaps, np.inf)
+    return gaps.min()
+
+
+def test_sites_keep_min_building_distance_within_a_chunk():
+    for chunk in CHUNKS:
+        points = sites(chunk)
+        assert len(points) > 100
+        assert min_pair_distance(points) >= MIN_BUILDING_DISTANCE - 1e-3
+
+
+def test_chunk_edges_are_built_up_like_the_rest_of_the_city():
+    points = np.concatenate([sites(chunk) for chunk in CHUNKS])
+    # the four chunks meet along x = 0 and z = 0, which must not be left as empty streets
+    for axis in (0, 1):
+        along_edge = np.abs(points[:, axis]) < MIN_BUILDING_DISTANCE / 2
+        assert np.count_nonzero(along_edge) > 10
+
+
+def test_neighbouring_chunks_keep_min_building_distance():
+    points = np.concatenate([sites(chunk) for chunk in CHUNKS])
+    assert min_pair_distance(points) >= MIN_BUILDING_DISTANCE - 1e-3
+    assert np.all(np.hypot(points[:, 0], points[:, 1]) >= MIN_DISTANCE_FROM_CENTER - 1e-3)
+
+
+def test_same_seed_gives_the_same_layout():
+    layout = generate_chunk_layout((0, 0), COUNT, RADIUS, SEED)
+    # laid out again from scratch, as after a restart, and after its neighbours
+    city_layout.sample_chunk_sites.cache_clear()
+    for chunk in CHUNKS:
+        generate_chunk_layout(chunk, COUNT, RADIUS, SEED)
+    assert np.array_equal(layout, generate_chunk_layout((0, 0), COUNT, RADIUS, SEED))
+
+
+def test_cached_layout_round_trips(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    generated, cached = load_chunk_layout((0, 0), 400, RADIUS, SEED)
+    assert not cached
+
+    loaded, cached = load_chunk_layout((0, 0), 400, RADIUS, SEED)
+    assert cached
+    assert loaded.dtype == generated.dtype
+    assert loaded.tobytes() == generated.tobytes()
+
+
+def test_layout_version_or_record_change_invalidates_the_cache(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    load_chunk_layout((0, 0), 400, RADIUS, SEED)
+
+    monkeypatch.setattr(city_layout, "CITY_LAYOUT_VERSION", city_layout.CITY_LAYOUT_VERSION + 1)
+    _, cached = load_chunk_layout((0, 0), 400, RADIUS, SEED)
+    assert not cached
+
+    # a cache written with another record layout under the current name is regenerated
+    np.save(chunk_cache_path((0, -1), 400, RADIUS, SEED), np.zeros(3, dtype=np.float32))
+    records, cached = load_chunk_layout((0, -1), 400, RADIUS, SEED)
+    assert not cached and records.dtype == city_layout.CITY_RECORD
+    _, cached = load_chunk_layout((0, -1), 400, RADIUS, SEED)
+    assert cached
@@ -0,0 +1,45 @@
+from settings import *
+from custom_timer import Timer, TimerScheduler
+
+
+def test_callback_fires_for_timer_started_at_zero():
+    scheduler = TimerScheduler()
+    calls = []
+    timer = Timer(0.5, autostart=True, func=lambda: calls.append(scheduler.time), scheduler=scheduler)
+
+    scheduler.advance(0.25)
+    assert timer and not calls
+
+    scheduler.advance(0.5)
+    assert not timer
+    assert calls == [0.5]
+
+
+def test_restarted_timer_fires_once_at_its_new_deadline():
+    scheduler = TimerScheduler()
+    calls = []
+    timer = Timer(1.0, autostart=True, func=lambda: calls.append(scheduler.time), scheduler=scheduler)
+
+    scheduler.advance(0.5)
+    timer.activate()
+    scheduler.advance(1.0)
+    assert timer and not calls
+
+    scheduler.advance(1.5)
+    assert calls == [1.5]
+
+
+def test_reset_stops_scheduled_timers():
+    scheduler = TimerScheduler()
+    calls = []
+    timer = Timer(1.0, autostart=True, func=lambda: calls.append(scheduler.time), scheduler=scheduler)
+    repeating = Timer(0.5, repeat=True, autostart=True, scheduler=scheduler)
+
+    scheduler.reset()
+    assert not timer and not repeating
+    scheduler.advance(2.0)
+    assert not calls
+
+    timer.activate()
+    scheduler.advance(3.0)
+    assert calls == [3.0]
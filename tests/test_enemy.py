@@ -0,0 +1,155 @@
+from settings import *
+from bullet import BulletManager
+from enemy import EnemyManager, AI_LOD_TIERS
+from vfx_manager import VFXManager
+import numpy as np
+
+
+def make_enemy_manager():
+    return EnemyManager({}, VFXManager(headless=True), headless=True)
+
+
+def test_recycled_enemy_is_hit_by_bullets_of_its_previous_life():
+    enemy_manager = make_enemy_manager()
+    bullet_manager = BulletManager(headless=True)
+    enemy = enemy_manager.spawn_enemy(Vector3(0, 50, 0), "fighter")
+    first_serial = enemy.serial
+    bullet_manager.add_bullet(Vector3(-1, 50, 0), Vector3(1, 0, 0), shooter=enemy)
+
+    enemy_manager.remove_enemy(enemy)
+    recycled = enemy_manager.spawn_enemy(Vector3(0, 50, 0), "fighter")
+    assert recycled is enemy
+    assert recycled.serial != first_serial
+    assert enemy_manager.arrays.keys[recycled.row] == recycled.serial
+
+    health = recycled.health
+    bullet_manager.update(SIM_DT)
+    enemy_manager.check_bullet_collisions(bullet_manager)
+    assert recycled.health < health
+
+
+def test_enemy_is_not_hit_by_its_own_bullets():
+    enemy_manager = make_enemy_manager()
+    bullet_manager = BulletManager(headless=True)
+    enemy = enemy_manager.spawn_enemy(Vector3(0, 50, 0), "fighter")
+    bullet_manager.add_bullet(Vector3(-1, 50, 0), Vector3(1, 0, 0), shooter=enemy)
+
+    health = enemy.health
+    bullet_manager.update(SIM_DT)
+    enemy_manager.check_bullet_collisions(bullet_manager)
+    assert enemy.health == health
+
+
+def spawn_at_distances(enemy_manager, distances):
+    return [enemy_manager.spawn_enemy(Vector3(distance, 50, 0), "fighter") for distance in distances]
+
+
+def test_lod_tiers_follow_player_distance():
+    enemy_manager = make_enemy_manager()
+    spawn_at_distances(enemy_manager, [100, 200, 450, 900])
+
+    enemy_manager.update_flight(SIM_DT, Vector3(0, 50, 0))
+    stats = enemy_manager.get_lod_stats()
+    assert (stats["near"], stats["mid"], stats["far"]) == (2, 1, 1)
+
+
+def test_lod_tier_holds_within_hysteresis():
+    enemy_manager = make_enemy_manager()
+    enemy, = spawn_at_distances(enemy_manager, [300])
+    boundary = AI_LOD_DISTANCES[0]
+    band = boundary * LOD_HYSTERESIS
+    tiers = []
+    for distance in (boundary + band / 2, boundary + 2 * band, boundary - band / 2, boundary - 2 * band):
+        enemy_manager.arrays.positions[enemy.row] = (distance, 50, 0)
+        enemy_manager.update_flight(SIM_DT, Vector3(0, 50, 0))
+        tiers.append(AI_LOD_TIERS[enemy_manager.arrays.lod_tiers[enemy.row]])
+
+    assert tiers == ["near", "mid", "mid", "near"]
+
+
+def test_deferred_decisions_run_first_on_the_next_step():
+    enemy_manager = make_enemy_manager()
+    enemy_manager.decisions_per_step = 2
+    enemies = spawn_at_distances(enemy_manager, [100, 120, 140, 160, 180])
+    arrays = enemy_manager.arrays
+    arrays.decision_times[:5] = [-0.5, -0.1, -0.4, -0.2, -0.3]
+    player = Vector3(0, 50, 0)
+
+    decided = []
+    for step in range(3):
+        time = step * SIM_DT
+        due = {enemy.row for enemy in enemies if arrays.decision_times[enemy.row] <= time}
+        enemy_manager.run_due_decisions(player, SIM_DT, time)
+        decided.append(sorted(row for row in due if arrays.decision_times[row] > time))
+
+    assert decided == [[0, 2], [3, 4], [1]]
+    assert enemy_manager.get_lod_stats()["decisions_deferred"] == 0
+
+
+def test_spawn_ring_and_boundary_follow_the_city_radius():
+    enemy_manager = make_enemy_manager()
+    enemy_manager.city_radius = 3000.0
+    enemy_manager.max_enemies = 10
+    enemies = [enemy_manager.spawn_enemy() for _ in range(10)]
+
+    distances = [sqrt(enemy.position.x ** 2 + enemy.position.z ** 2) for enemy in enemies]
+    assert all(2100.0 <= distance <= 2700.0 for distance in distances)
+
+    arrays = enemy_manager.arrays
+    arrays.positions[:2] = [(1000.0, 60.0, 0.0), (3200.0, 60.0, 0.0)]
+    corrections = enemy_manager.get_boundary_corrections(np.arange(2))
+    assert corrections[0, 0] == 0.0
+    assert corrections[1, 0] < 0.0
+
+
+def test_removed_enemies_leave_the_others_rows_intact():
+    enemy_manager = make_enemy_manager()
+    enemies = spawn_at_distances(enemy_manager, [0, 100, 200, 300])
+    for enemy, health in zip(enemies, [10, 20, 30, 40]):
+        enemy.health = health
+
+    enemy_manager.remove_enemy(enemies[1])
+    enemy_manager.remove_enemy(enemies[3])
+    survivors = [enemies[0], enemies[2]]
+
+    arrays = enemy_manager.arrays
+    assert arrays.count == len(enemy_manager.enemies) == 2
+    assert sorted(enemy.row for enemy in survivors) == [0, 1]
+    for enemy, x, health in zip(survivors, [0, 200], [10, 30]):
+        assert enemy_manager.enemies[enemy.row] is enemy
+        assert arrays.positions[enemy.row].tolist() == [x, 50, 0]
+        assert arrays.keys[enemy.row] == enemy.serial
+        assert enemy.health == health
+
+
+def test_interpolated_transforms_pack_the_row_matrices():
+    enemy_manager = make_enemy_manager()
+    spawn_at_distances(enemy_manager, [100, 300, 600])
+    for _ in range(20):
+        enemy_manager.update_flight(SIM_DT, Vector3(0, 50, 0))
+
+    arrays = enemy_manager.arrays
+    fields = [f"m{column * 4 + row}" for row in range(4) for column in range(4)]
+    for alpha, previous in ((1.0, False), (0.0, True)):
+        packed = arrays.interpolated_transforms(alpha)
+        for row in range(arrays.count):
+            expected = arrays.get_transform(row, previous=previous)
+            assert np.allclose(packed[row], [getattr(expected, field) for field in fields], atol=1e-4)
+
+
+def test_failed_recycle_puts_the_enemy_back_in_the_pool(monkeypatch):
+    enemy_manager = make_enemy_manager()
+    enemy, survivor = spawn_at_distances(enemy_manager, [100, 200])
+    enemy_manager.remove_enemy(enemy)
+
+    def broken_reset(*args):
+        raise ValueError("bad config")
+
+    monkeypatch.setattr(enemy, "reset", broken_reset)
+    assert enemy_manager.spawn_enemy(Vector3(0, 50, 0), "fighter") is None
+    assert enemy_manager.pool == [enemy]
+    assert enemy_manager.arrays.count == len(enemy_manager.enemies) == 1
+    assert enemy_manager.enemies[survivor.row] is survivor
+
+    monkeypatch.undo()
+    assert enemy_manager.spawn_enemy(Vector3(0, 50, 0), "fighter") is enemy
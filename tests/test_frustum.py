@@ -0,0 +1,38 @@
+from settings import *
+from frustum import frustum_planes, boxes_in_frustum
+import numpy as np
+
+
+def cube_at(centres, half=5.0):
+    centres = np.array(centres, dtype=np.float64)
+    return centres - half, centres + half
+
+
+def test_boxes_outside_each_plane_are_rejected():
+    # looking down -Z from 50 m up with a 60 degree vertical field of view
+    camera = Camera3D(Vector3(0, 50, 0), Vector3(0, 50, -10), Vector3(0, 1, 0), 60, CAMERA_PERSPECTIVE)
+    planes = frustum_planes(camera, aspect=16 / 9, far=1000.0)
+
+    mins, maxs = cube_at([
+        (0, 50, -100),  # straight ahead
+        (0, 50, 100),  # behind the camera
+        (0, 50, -1200),  # past the far plane
+        (-400, 50, -100),  # off to the left
+        (400, 50, -100),  # off to the right
+        (0, 300, -100),  # above the top
+        (0, -200, -100),  # below the bottom
+    ])
+    visible, contained = boxes_in_frustum(planes, mins, maxs)
+    assert visible.tolist() == [True, False, False, False, False, False, False]
+    assert contained.tolist() == [True, False, False, False, False, False, False]
+
+
+def test_box_across_a_plane_is_visible_but_not_contained():
+    camera = Camera3D(Vector3(0, 50, 0), Vector3(0, 50, -10), Vector3(0, 1, 0), 60, CAMERA_PERSPECTIVE)
+    planes = frustum_planes(camera, aspect=1.0, far=1000.0)
+
+    # the frustum's left edge is 57.7 m off-axis at 100 m ahead
+    mins, maxs = cube_at([(-57.7, 50, -100), (0, 50, -1000)], half=10.0)
+    visible, contained = boxes_in_frustum(planes, mins, maxs)
+    assert visible.tolist() == [True, True]
+    assert contained.tolist() == [False, False]
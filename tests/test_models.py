@@ -0,0 +1,43 @@
+from settings import *
+from models import SkyscraperSimple, SkycraperMultipleLayer
+
+
+def box_tuple(box):
+    return (round(box.min.x, 3), round(box.min.y, 3), round(box.min.z, 3),
+            round(box.max.x, 3), round(box.max.y, 3), round(box.max.z, 3))
+
+
+def assert_cache_is_fresh(building):
+    assert box_tuple(building.get_world_bounding_box()) == box_tuple(building.compute_world_bounding_box())
+
+
+def test_cached_world_box_follows_move_rotate_and_resize():
+    building = SkyscraperSimple(None, Vector3(100, 0, -40))
+    building.cache_world_bounds()
+    placed = box_tuple(building.get_world_bounding_box())
+
+    building.position.x += 30
+    assert_cache_is_fresh(building)
+    assert box_tuple(building.get_world_bounding_box())[0] == round(placed[0] + 30, 3)
+
+    building.rotation_angle = 90
+    assert_cache_is_fresh(building)
+    # a quarter turn swaps the footprint's width and depth
+    box = building.get_world_bounding_box()
+    assert round(box.max.x - box.min.x, 3) == round(placed[5] - placed[2], 3)
+
+    building.size = 2
+    assert_cache_is_fresh(building)
+    assert round(building.get_world_bounding_box().max.y, 3) == round(2 * placed[4], 3)
+
+
+def test_cached_layer_boxes_follow_a_move():
+    building = SkycraperMultipleLayer(None, Vector3(0, 0, 0))
+    building.cache_world_bounds()
+    before = [box_tuple(box) for box in building.get_world_bounding_boxes()]
+
+    building.position.z -= 50
+    after = [box_tuple(box) for box in building.get_world_bounding_boxes()]
+    assert after == [box_tuple(box) for box in building.compute_world_bounding_boxes()]
+    assert [b[2] for b in after] == [round(b[2] - 50, 3) for b in before]
+    assert_cache_is_fresh(building)
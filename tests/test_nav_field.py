@@ -0,0 +1,74 @@
+from settings import *
+from nav_field import NavigationField, ChunkedNavigationField
+import numpy as np
+
+
+BOX_MIN = np.array([43.0, 0.0, 61.0])
+BOX_MAX = np.array([71.0, 50.0, 88.0])
+
+
+def bake_one_box():
+    return NavigationField.bake(BOX_MIN[None], BOX_MAX[None], (0.0, 0.0, 200.0, 200.0))
+
+
+def cell_centres(field, y):
+    _, depth, width = field.clearance.shape
+    cells_z, cells_x = np.meshgrid(np.arange(depth), np.arange(width), indexing='ij')
+    x = (cells_x.ravel() + 0.5) * field.cell_size + field.origin[0]
+    z = (cells_z.ravel() + 0.5) * field.cell_size + field.origin[1]
+    return np.column_stack([x, np.full(len(x), y), z]).astype(np.float32)
+
+
+def test_clearance_matches_exact_distance_within_one_cell():
+    field = bake_one_box()
+    positions = cell_centres(field, 20.0)
+    away, clearance = field.sample(positions)
+
+    nearest = np.clip(positions, BOX_MIN, BOX_MAX)
+    offsets = positions - nearest
+    offsets[:, 1] = 0.0
+    exact = np.linalg.norm(offsets, axis=1)
+
+    reached = np.isfinite(clearance)
+    assert np.all(np.abs(clearance[reached] - exact[reached]) <= field.cell_size)
+    assert np.all(reached[exact <= field.reach - field.cell_size])
+    assert not np.any(reached[exact > field.reach + field.cell_size])
+
+    outside = reached & (exact > field.cell_size)
+    assert np.all(np.einsum('ij,ij->i', away[outside], offsets[outside]) > 0)
+
+
+def test_inside_the_box_points_up_and_above_it_is_clear():
+    field = bake_one_box()
+    centre = (BOX_MIN + BOX_MAX) / 2
+    away, clearance = field.sample(np.array([centre, (centre[0], BOX_MAX[1] + 2 * field.layer_height, centre[2])],
+                                            dtype=np.float32))
+
+    assert clearance[0] == 0.0
+    assert away[0].tolist() == [0.0, 1.0, 0.0]
+    assert clearance[1] == np.inf
+
+
+def test_chunks_bake_only_when_first_sampled():
+    bakes = []
+
+    def bake():
+        bakes.append(1)
+        return bake_one_box()
+
+    chunked = ChunkedNavigationField(200.0)
+    chunked.add_chunk((0, 0), bake)
+    chunked.add_chunk((1, 0), bake)
+    assert chunked.get_stats()["unbaked"] == 2
+
+    _, clearance = chunked.sample(np.array([[50.0, 20.0, 50.0], [50.0, 20.0, 70.0]], dtype=np.float32))
+    assert len(bakes) == 1
+    assert np.isfinite(clearance).all()
+    assert chunked.get_stats()["chunks"] == 1 and chunked.get_stats()["unbaked"] == 1
+
+    chunked.sample(np.array([[60.0, 20.0, 60.0]], dtype=np.float32))
+    assert len(bakes) == 1
+
+    chunked.remove_chunk((1, 0))
+    chunked.sample(np.array([[250.0, 20.0, 50.0]], dtype=np.float32))
+    assert len(bakes) == 1
@@ -0,0 +1,32 @@
+from settings import *
+from render_lod import select_lod_tiers, FULL, IMPOSTOR
+import numpy as np
+
+
+BOUNDARY = BUILDING_LOD_DISTANCES[0]
+BAND = BOUNDARY * LOD_HYSTERESIS
+
+
+def test_building_tiers_switch_only_past_the_hysteresis_band():
+    distances = np.array([BOUNDARY - BAND - 1, BOUNDARY - BAND + 1, BOUNDARY, BOUNDARY + BAND - 1, BOUNDARY + BAND + 1])
+
+    from_full = select_lod_tiers(distances, np.full(len(distances), FULL, dtype=np.int8), BUILDING_LOD_DISTANCES)
+    assert from_full.tolist() == [FULL, FULL, FULL, FULL, IMPOSTOR]
+
+    from_impostor = select_lod_tiers(distances, np.full(len(distances), IMPOSTOR, dtype=np.int8), BUILDING_LOD_DISTANCES)
+    assert from_impostor.tolist() == [FULL, IMPOSTOR, IMPOSTOR, IMPOSTOR, IMPOSTOR]
+
+
+def test_building_hovering_at_the_boundary_keeps_its_tier():
+    walk = [BOUNDARY + BAND + 5, BOUNDARY - 5, BOUNDARY + 5, BOUNDARY - BAND / 2, BOUNDARY - BAND - 5]
+    tiers, seen = np.array([FULL], dtype=np.int8), []
+    for distance in walk:
+        tiers = select_lod_tiers(np.array([distance]), tiers, BUILDING_LOD_DISTANCES)
+        seen.append(int(tiers[0]))
+    assert seen == [IMPOSTOR, IMPOSTOR, IMPOSTOR, IMPOSTOR, FULL]
+
+
+def test_far_jump_skips_straight_to_the_right_tier():
+    thresholds = (100.0, 200.0)
+    tiers = select_lod_tiers(np.array([500.0, 10.0]), np.array([0, 2], dtype=np.int8), thresholds)
+    assert tiers.tolist() == [2, 0]
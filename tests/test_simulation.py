@@ -0,0 +1,39 @@
+from settings import *
+from simulation import spend_frame_time
+
+
+def count_steps(frame_times, step=lambda: True):
+    accumulator, counts, alphas = 0.0, [], []
+    for frame_time in frame_times:
+        accumulator, steps, alpha = spend_frame_time(accumulator, frame_time, step)
+        counts.append(steps)
+        alphas.append(alpha)
+    return accumulator, counts, alphas
+
+
+def test_short_frames_bank_time_until_a_whole_step():
+    accumulator, counts, alphas = count_steps([SIM_DT * 0.4] * 5)
+    assert counts == [0, 0, 1, 0, 1]
+    assert [round(alpha, 6) for alpha in alphas] == [0.4, 0.8, 0.2, 0.6, 0.0]
+    assert all(0.0 <= alpha < 1.0 for alpha in alphas)
+
+
+def test_slow_frame_catches_up_then_drops_the_backlog():
+    accumulator, counts, alphas = count_steps([SIM_DT * 2.5])
+    assert counts == [2] and abs(alphas[0] - 0.5) < 1e-6
+
+    accumulator, counts, alphas = count_steps([SIM_DT * (MAX_CATCH_UP_STEPS + 3.25)])
+    assert counts == [MAX_CATCH_UP_STEPS]
+    assert 0.0 <= accumulator < SIM_DT and abs(alphas[0] - 0.25) < 1e-6
+
+
+def test_step_can_stop_the_catch_up():
+    calls = []
+
+    def step():
+        calls.append(1)
+        return len(calls) < 2
+
+    accumulator, counts, _ = count_steps([SIM_DT * 4.5], step)
+    assert counts == [2] and len(calls) == 2
+    assert abs(accumulator - SIM_DT * 0.5) < 1e-9
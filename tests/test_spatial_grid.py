@@ -0,0 +1,49 @@
+from settings import *
+from spatial_grid import SpatialGrid
+import numpy as np
+
+
+class Box:
+    def __init__(self, low, high):
+        self.box = BoundingBox(Vector3(*low), Vector3(*high))
+
+    def get_world_bounding_box(self):
+        return self.box
+
+
+def scattered_grid(seed=3):
+    rng = np.random.default_rng(seed)
+    lows = rng.uniform(-200, 200, (300, 3)).astype(np.float32)
+    # many footprints span several 25 m cells, so they are registered more than once
+    highs = lows + rng.uniform(1, 60, (300, 3)).astype(np.float32)
+    grid = SpatialGrid(25.0)
+    boxes = [Box(low, high) for low, high in zip(lows.tolist(), highs.tolist())]
+    for box in boxes:
+        grid.add_object(box)
+    return grid, boxes, lows, highs
+
+
+def test_query_radius_matches_brute_force_once_each():
+    grid, boxes, lows, highs = scattered_grid()
+    for x, z, radius in [(0, 0, 40), (-150, 90, 75), (180, -180, 10), (33, -7, 0.5)]:
+        found = grid.query_radius(Vector3(x, 0, z), radius)
+
+        dx = np.maximum.reduce([lows[:, 0] - x, np.zeros(len(lows)), x - highs[:, 0]])
+        dz = np.maximum.reduce([lows[:, 2] - z, np.zeros(len(lows)), z - highs[:, 2]])
+        expected = {id(boxes[i]) for i in np.flatnonzero(dx * dx + dz * dz <= radius * radius)}
+
+        assert len(found) == len({id(obj) for obj in found})
+        assert {id(obj) for obj in found} == expected
+
+
+def test_query_aabb_matches_brute_force_once_each():
+    grid, boxes, lows, highs = scattered_grid()
+    for low, high in [((-50, 0, -50), (50, 0, 50)), ((120, 0, -30), (121, 0, 200)), ((-300, 0, -300), (300, 0, 300))]:
+        found = grid.query_aabb(Vector3(*low), Vector3(*high))
+
+        overlap = ((lows[:, 0] <= high[0]) & (highs[:, 0] >= low[0]) &
+                   (lows[:, 2] <= high[2]) & (highs[:, 2] >= low[2]))
+        expected = {id(boxes[i]) for i in np.flatnonzero(overlap)}
+
+        assert len(found) == len({id(obj) for obj in found})
+        assert {id(obj) for obj in found} == expected